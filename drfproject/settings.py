@@ -13,6 +13,7 @@ import os
 from dotenv import load_dotenv
 from pathlib import Path
 from celery.schedules import crontab
+from django.core.exceptions import ImproperlyConfigured
 
 # Load .env file
 load_dotenv()
@@ -50,6 +51,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django_prometheus.middleware.PrometheusBeforeMiddleware",
+    "home.instrumentation.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -83,12 +85,93 @@ WSGI_APPLICATION = "drfproject.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "data" / "db.sqlite3",
+# DATABASE_PROFILE selects the backend:
+#  - "sqlite" (default): WAL journal so readers never block the writer,
+#    synchronous=NORMAL (durable at checkpoints, safe in WAL mode), a memory
+#    mapped read path, and a busy timeout so concurrent web and Celery writers
+#    wait for the lock instead of failing with "database is locked".
+#    Transactions start IMMEDIATE: a deferred transaction that upgrades to a
+#    write lock fails at once, without waiting for the busy timeout.
+#  - "postgres": persistent connections, or a psycopg connection pool per
+#    process with POSTGRES_POOL=true (pooling requires CONN_MAX_AGE=0).
+DATABASE_PROFILE = os.getenv("DATABASE_PROFILE", "sqlite")
+CONN_MAX_AGE = int(os.getenv("DB_CONN_MAX_AGE", "60"))  # seconds, 0 closes after each request
+
+SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))  # milliseconds
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))  # bytes
+
+if DATABASE_PROFILE == "postgres":
+    POSTGRES_POOL = os.getenv("POSTGRES_POOL", "False").lower() in ["true", "1", "yes"]
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.getenv("POSTGRES_DB", "drfproject"),
+            "USER": os.getenv("POSTGRES_USER", "postgres"),
+            "PASSWORD": os.getenv("POSTGRES_PASSWORD", ""),
+            "HOST": os.getenv("POSTGRES_HOST", "localhost"),
+            "PORT": os.getenv("POSTGRES_PORT", "5432"),
+            "CONN_MAX_AGE": 0 if POSTGRES_POOL else CONN_MAX_AGE,
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {
+                "pool": {
+                    "min_size": int(os.getenv("POSTGRES_POOL_MIN", "2")),
+                    "max_size": int(os.getenv("POSTGRES_POOL_MAX", "10")),
+                    "timeout": 10,
+                },
+            } if POSTGRES_POOL else {},
+        }
+    }
+elif DATABASE_PROFILE == "sqlite":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.getenv("SQLITE_PATH", BASE_DIR / "data" / "db.sqlite3"),
+            "CONN_MAX_AGE": CONN_MAX_AGE,
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {
+                "init_command": (
+                    "PRAGMA journal_mode=WAL;"
+                    "PRAGMA synchronous=NORMAL;"
+                    f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT};"
+                    f"PRAGMA mmap_size={SQLITE_MMAP_SIZE};"
+                    "PRAGMA temp_store=MEMORY;"
+                ),
+                "transaction_mode": "IMMEDIATE",
+                # sqlite3's own busy handler, in seconds; kept in line with busy_timeout
+                "timeout": SQLITE_BUSY_TIMEOUT / 1000,
+            },
+        }
+    }
+else:
+    raise ImproperlyConfigured(f"Unknown DATABASE_PROFILE {DATABASE_PROFILE!r}: use 'sqlite' or 'postgres'")
+
+
+# Cache
+# A shared cache (e.g. CACHE_URL=redis://redis:6379/1) is required as soon as
+# more than one process serves the API: owner versions, cached responses and
+# throttling state must be visible to every web process and Celery worker.
+CACHE_URL = os.getenv("CACHE_URL")
+
+if CACHE_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
     }
-}
+
+# Seconds a cached list response is kept (it is invalidated earlier by any write)
+OWNER_CACHE_TIMEOUT = int(os.getenv("OWNER_CACHE_TIMEOUT", "300"))
+
+# Serialized todos (with their timings) kept in each process in front of the
+# shared cache, for the todo detail routes; 0 turns the in-process tier off
+OBJECT_CACHE_LOCAL_ENTRIES = int(os.getenv("OBJECT_CACHE_LOCAL_ENTRIES", "1024"))
 
 
 # Password validation
@@ -180,8 +263,9 @@ REST_FRAMEWORK = {
         'rest_framework.filters.OrderingFilter',
     ],
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.UserRateThrottle',
-        'rest_framework.throttling.AnonRateThrottle'
+        # Token buckets in the shared cache (home/throttling.py)
+        'home.throttling.UserTokenBucketThrottle',
+        'home.throttling.AnonTokenBucketThrottle'
     ],
     'DEFAULT_THROTTLE_RATES': {
         'user': '1000/day',
@@ -193,9 +277,39 @@ REST_FRAMEWORK = {
     'VERSION_PARAM': 'version',
 }
 
+# Maximum number of items accepted by the /bulk/ endpoints
+BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", "500"))
+
+# Render list responses from values() rows with precompiled field converters
+# (home/fast_serializers.py) instead of DRF's per-instance serializer machinery
+FAST_LIST_SERIALIZATION = os.getenv("FAST_LIST_SERIALIZATION", "True").lower() in ["true", "1", "yes"]
+
+# Rows read (and serialized) per database round trip by the streaming export;
+# the export's memory use is bounded by this, not by the owner's data
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "500"))
+
+# Sampled cProfile of sync requests (home/instrumentation.py): the share of requests
+# profiled, and the slowest profiles over the threshold kept in REQUEST_PROFILING_DIR
+REQUEST_PROFILING_SAMPLE_RATE = float(os.getenv("REQUEST_PROFILING_SAMPLE_RATE", "0"))
+REQUEST_PROFILING_MIN_SECONDS = float(os.getenv("REQUEST_PROFILING_MIN_SECONDS", "0.5"))
+REQUEST_PROFILING_DIR = os.getenv("REQUEST_PROFILING_DIR", BASE_DIR / "profiles")
+REQUEST_PROFILING_KEEP = int(os.getenv("REQUEST_PROFILING_KEEP", "20"))
+
 # Optional: Make sessions expire when the browser closes (for anonymous users)
 SESSION_EXPIRE_AT_BROWSER_CLOSE = True
 
+# Anonymous clients only get a session (and a django_session row) on their first
+# write; reads without a session return empty results without touching the DB.
+LAZY_ANONYMOUS_SESSIONS = os.getenv("LAZY_ANONYMOUS_SESSIONS", "True").lower() in ["true", "1", "yes"]
+
+# Session storage: "db" (default), "cached_db" (DB write-through, cached reads)
+# or "cache" (no DB at all; needs a shared CACHE_URL with more than one process)
+SESSION_ENGINE = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "cache": "django.contrib.sessions.backends.cache",
+}[os.getenv("SESSION_BACKEND", "db")]
+
 CELERY_BROKER_URL = 'redis://localhost:6379/0'  # Redis as broker
 CELERY_RESULT_BACKEND = 'redis://localhost:6379/0'
 CELERY_ACCEPT_CONTENT = ['json']
@@ -203,9 +317,55 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'UTC'
 
+# Reminder batching: buffer up to REMINDER_BATCH_SIZE creation reminders (or
+# REMINDER_BATCH_WINDOW seconds) per Celery task. 1 keeps one task per todo.
+REMINDER_BATCH_SIZE = int(os.getenv("REMINDER_BATCH_SIZE", "1"))
+REMINDER_BATCH_WINDOW = float(os.getenv("REMINDER_BATCH_WINDOW", "1.0"))
+
+# Reminder delivery (home/delivery.py): deliver_reminders leases batches of
+# REMINDER_DELIVERY_BATCH_SIZE unsent reminders for REMINDER_DELIVERY_LEASE
+# seconds and sends them with REMINDER_DELIVERY_CONCURRENCY threads through
+# REMINDER_DELIVERY_BACKEND (home.delivery.LogBackend or home.delivery.FileBackend,
+# which appends JSON lines to REMINDER_DELIVERY_FILE). A failed reminder is
+# retried after REMINDER_DELIVERY_RETRY_DELAY seconds, up to
+# REMINDER_DELIVERY_MAX_ATTEMPTS attempts.
+REMINDER_DELIVERY_BACKEND = os.getenv("REMINDER_DELIVERY_BACKEND", "home.delivery.LogBackend")
+REMINDER_DELIVERY_FILE = os.getenv("REMINDER_DELIVERY_FILE", BASE_DIR / "reminders.ndjson")
+REMINDER_DELIVERY_BATCH_SIZE = int(os.getenv("REMINDER_DELIVERY_BATCH_SIZE", "500"))
+REMINDER_DELIVERY_CONCURRENCY = int(os.getenv("REMINDER_DELIVERY_CONCURRENCY", "8"))
+REMINDER_DELIVERY_LEASE = int(os.getenv("REMINDER_DELIVERY_LEASE", "60"))
+REMINDER_DELIVERY_RETRY_DELAY = int(os.getenv("REMINDER_DELIVERY_RETRY_DELAY", "60"))
+REMINDER_DELIVERY_MAX_ATTEMPTS = int(os.getenv("REMINDER_DELIVERY_MAX_ATTEMPTS", "5"))
+
+# Reminder retention (home/retention.py): archive_reminders moves sent reminders
+# REMINDER_RETENTION_SENT_DAYS days after delivery, and any reminder
+# REMINDER_RETENTION_MAX_DAYS days after its creation, to gzip NDJSON segments in
+# REMINDER_ARCHIVE_DIR, REMINDER_RETENTION_BATCH_SIZE rows per transaction with
+# REMINDER_RETENTION_PAUSE seconds between them. 0 days turns a policy off.
+REMINDER_ARCHIVE_DIR = os.getenv("REMINDER_ARCHIVE_DIR", BASE_DIR / "archive")
+REMINDER_RETENTION_SENT_DAYS = int(os.getenv("REMINDER_RETENTION_SENT_DAYS", "7"))
+REMINDER_RETENTION_MAX_DAYS = int(os.getenv("REMINDER_RETENTION_MAX_DAYS", "90"))
+REMINDER_RETENTION_BATCH_SIZE = int(os.getenv("REMINDER_RETENTION_BATCH_SIZE", "1000"))
+REMINDER_RETENTION_PAUSE = float(os.getenv("REMINDER_RETENTION_PAUSE", "0"))
+
 CELERY_BEAT_SCHEDULE = {
-    'check-due-todos-every-5-min': {
+    # Due reminders are scheduled when timings are written (home/scheduling.py)
+    'fire-due-reminders-every-minute': {
+        'task': 'home.tasks.fire_due_reminders',
+        'schedule': crontab(),  # every minute
+    },
+    # Safety net for timings written outside the API: as often as the reminder
+    # lead, so every timing is seen once before it is due
+    'check-due-todos-every-15-min': {
         'task': 'home.tasks.mark_due_todos',
-        'schedule': crontab(minute='*/5'),  # every 5 minutes
+        'schedule': crontab(minute='*/15'),
+    },
+    'deliver-reminders-every-15-s': {
+        'task': 'home.tasks.deliver_reminders',
+        'schedule': 15.0,
+    },
+    'archive-reminders-daily': {
+        'task': 'home.tasks.archive_reminders',
+        'schedule': crontab(hour=3, minute=30),
     },
 }
\ No newline at end of file
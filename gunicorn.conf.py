@@ -0,0 +1,63 @@
+"""
+Gunicorn configuration for the production web server.
+
+    gunicorn -c gunicorn.conf.py
+
+Every setting can be overridden from the environment. The default is the
+WSGI application with sync workers; for the async read endpoints run the
+ASGI application with uvicorn workers instead:
+
+    GUNICORN_APP=drfproject.asgi:application GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker
+
+Prometheus metrics are collected in multiprocess mode: each worker writes its
+samples to PROMETHEUS_MULTIPROC_DIR and /metrics (django_prometheus) merges
+the files of all workers, so any worker answers with the aggregated numbers.
+"""
+import multiprocessing
+import os
+import shutil
+
+wsgi_app = os.getenv("GUNICORN_APP", "drfproject.wsgi:application")
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "sync")
+threads = int(os.getenv("GUNICORN_THREADS", "1"))
+
+# Load Django once in the master and fork the workers from it: faster boots,
+# shared memory pages, and import errors fail the deploy instead of each worker.
+preload_app = os.getenv("GUNICORN_PRELOAD", "True").lower() in ["true", "1", "yes"]
+
+# Behind a proxy (nginx / load balancer) reusing upstream connections
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+
+# Recycle workers now and then to bound memory growth; jitter avoids all of them restarting together
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "100"))
+
+# Development only: reloading needs each worker to import the code itself
+reload = os.getenv("GUNICORN_RELOAD", "False").lower() in ["true", "1", "yes"]
+if reload:
+    preload_app = False
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def on_starting(server):
+    """Start from an empty metrics directory: files left by a previous run would be merged in."""
+    path = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    """Drop the live gauges of a dead (or recycled) worker; its counters stay in the totals."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -1,6 +1,19 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def _repair_search_indexes(using, **_kwargs):
+    from django.db import connections
+    from .search import repair_search_indexes
+
+    # Table rebuilds during migrations drop the FTS triggers; put them back.
+    repair_search_indexes(connections[using])
 
 
 class HomeConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "home"
+
+    def ready(self):
+        from . import instrumentation, signals  # noqa: F401
+        post_migrate.connect(_repair_search_indexes, sender=self)
@@ -0,0 +1,151 @@
+"""
+Async versions of the hot read endpoints, served natively under ASGI.
+
+Each view reuses its viewset for everything that does not touch the database
+(owner scoping, filters, ordering, pagination, serializers, permissions) and
+runs the queries through the async ORM, so under an ASGI server a request
+waiting on the database does not hold a worker thread.
+
+Unlike the viewsets' ``list``, these views do not use the per-owner response
+cache: they are the uncached read path.
+"""
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.http import Http404, HttpResponse
+from django.utils.translation import gettext_lazy as _
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.views import exception_handler
+from .instrumentation import measure
+from .models import Reminder
+from .serializers import ReminderSerializer
+from .views import TodoModelViewSet, TimingsModelViewSet
+
+
+async def authenticate(request):
+    """
+    (user, token) for the request, like TokenAuthentication followed by
+    SessionAuthentication, with the lookups made through the async ORM.
+    """
+    auth = request.headers.get('Authorization', '').split()
+    if auth and auth[0].lower() == 'token':
+        if len(auth) == 1:
+            raise exceptions.AuthenticationFailed(_('Invalid token header. No credentials provided.'))
+        if len(auth) > 2:
+            raise exceptions.AuthenticationFailed(_('Invalid token header. Token string should not contain spaces.'))
+        token = await Token.objects.select_related('user').filter(key=auth[1]).afirst()
+        if token is None:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+        return token.user, token
+    return await request.auser(), None
+
+
+def render(data, status_code=200, headers=None):
+    with measure('render'):
+        content = JSONRenderer().render(data)
+    response = HttpResponse(content, status=status_code, content_type='application/json')
+    for name, value in (headers or {}).items():
+        response[name] = value
+    return response
+
+
+class AsyncViewSetView(View):
+    """
+    GET-only async view over one action of ``viewset_class``.
+
+    Subclasses implement ``respond(viewset, queryset)`` and return the
+    response data; errors are rendered by DRF's exception handler.
+    """
+    viewset_class = None
+    action = None
+    detail = False
+
+    async def get(self, request, *args, **kwargs):
+        viewset = None
+        try:
+            user, token = await authenticate(request)
+            drf_request = Request(request)
+            drf_request.user, drf_request.auth = user, token
+            viewset = self.viewset_class(
+                request=drf_request, args=args, kwargs=kwargs, headers={},
+                action=self.action, detail=self.detail, format_kwarg=None,
+            )
+            # Permissions, throttles and queryset construction only read the cache and the request
+            queryset = await sync_to_async(self.prepare)(viewset)
+            return render(await self.respond(viewset, queryset))
+        except Exception as exc:
+            if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+                exc.auth_header = 'Token'
+            response = exception_handler(exc, {'view': viewset, 'args': args, 'kwargs': kwargs})
+            if response is None:
+                raise
+            return render(response.data, response.status_code, response.headers)
+
+    def prepare(self, viewset):
+        viewset.check_permissions(viewset.request)
+        viewset.check_throttles(viewset.request)
+        return viewset.filter_queryset(viewset.get_queryset())
+
+    async def respond(self, viewset, queryset):
+        raise NotImplementedError
+
+    async def get_object(self, viewset, queryset):
+        """The viewset's get_object(), with the lookup made through the async ORM."""
+        value = viewset.kwargs[viewset.lookup_url_kwarg or viewset.lookup_field]
+        try:
+            if hasattr(viewset, 'filter_lookup'):
+                obj = await viewset.filter_lookup(queryset, value).afirst()
+            else:
+                obj = await queryset.filter(**{viewset.lookup_field: value}).afirst()
+        except (TypeError, ValueError, ValidationError):
+            raise Http404
+        if obj is None:
+            raise Http404(f"No {queryset.model._meta.object_name} matches the given query.")
+        await sync_to_async(viewset.check_object_permissions)(viewset.request, obj)
+        return obj
+
+
+class AsyncListView(AsyncViewSetView):
+    action = 'list'
+
+    async def respond(self, viewset, queryset):
+        paginator = viewset.paginator
+        page = await paginator.apaginate_queryset(queryset, viewset.request, view=viewset)
+        if page is None:
+            return viewset.get_serializer([obj async for obj in queryset], many=True).data
+        return paginator.get_paginated_response(viewset.get_serializer(page, many=True).data).data
+
+
+class AsyncRetrieveView(AsyncViewSetView):
+    action = 'retrieve'
+    detail = True
+
+    async def respond(self, viewset, queryset):
+        return viewset.get_serializer(await self.get_object(viewset, queryset)).data
+
+
+class AsyncRemindersView(AsyncViewSetView):
+    action = 'list_reminders'
+    detail = True
+
+    async def respond(self, viewset, queryset):
+        obj = await self.get_object(viewset, queryset)
+        todo_id = getattr(obj, 'todo_id', obj.pk)
+        reminders = Reminder.objects.filter(todo_id=todo_id).order_by('created_at', 'uid')
+        paginator = viewset.paginator
+        page = await paginator.apaginate_queryset(reminders, viewset.request, view=viewset)
+        if page is None:
+            return ReminderSerializer([reminder async for reminder in reminders], many=True).data
+        return paginator.get_paginated_response(ReminderSerializer(page, many=True).data).data
+
+
+todo_list = AsyncListView.as_view(viewset_class=TodoModelViewSet)
+todo_detail = AsyncRetrieveView.as_view(viewset_class=TodoModelViewSet)
+todo_reminders = AsyncRemindersView.as_view(viewset_class=TodoModelViewSet)
+timing_list = AsyncListView.as_view(viewset_class=TimingsModelViewSet)
+timing_reminders = AsyncRemindersView.as_view(viewset_class=TimingsModelViewSet)
@@ -0,0 +1,57 @@
+import atexit
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class ReminderBatcher:
+    """
+    Buffers reminder requests in the producing process and hands them to the
+    worker as a single batch task, flushed once ``max_size`` requests are
+    buffered or ``max_wait`` seconds after the first buffered request.
+
+    Buffered requests live in memory: they are flushed at interpreter exit,
+    but a killed process loses at most one window of reminders.
+    """
+
+    def __init__(self, send, max_size, max_wait):
+        self.send = send
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self._buffer = []
+        self._timer = None
+        self._lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def add(self, todo_uid):
+        batch = None
+        with self._lock:
+            self._buffer.append(str(todo_uid))
+            if len(self._buffer) >= self.max_size:
+                batch = self._drain()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.max_wait, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if batch:
+            self._send(batch)
+
+    def flush(self):
+        with self._lock:
+            batch = self._drain()
+        if batch:
+            self._send(batch)
+
+    def _drain(self):
+        batch, self._buffer = self._buffer, []
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return batch
+
+    def _send(self, batch):
+        try:
+            self.send(batch)
+        except Exception as e:
+            logger.error(f"Failed to enqueue reminder batch of {len(batch)}: {e}")
@@ -0,0 +1,210 @@
+"""
+Per-owner version counters and the conditional/cached list responses built on them.
+
+Every owner (a user or an anonymous session) has a version number in the
+shared cache that is bumped on any write to its todos or timings: by the
+viewsets, by the models' save() and delete(), and by their querysets' bulk
+writes (home/models.py). List responses are keyed by that version, so a bump
+invalidates all of them at once without having to know which pages or query
+strings were cached. Serialized objects are cached the same way, in two tiers
+(TwoTierCache).
+
+Reminders appear in no cached response, so writing them bumps nothing unless
+the caller does.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.http import http_date, parse_http_date_safe, parse_etags
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+from rest_framework import status
+from prometheus_client import Counter
+
+OBJECT_CACHE_HITS = Counter(
+    "object_cache_hits_total", "Object cache lookups answered by a tier", ["cache", "tier"]
+)
+OBJECT_CACHE_MISSES = Counter(
+    "object_cache_misses_total", "Object cache lookups answered by neither tier", ["cache"]
+)
+OBJECT_CACHE_EVICTIONS = Counter(
+    "object_cache_evictions_total", "Entries evicted from the in-process tier of an object cache", ["cache"]
+)
+
+
+def owner_key(user_id=None, session_key=None):
+    if user_id is not None:
+        return f"user:{user_id}"
+    if session_key:
+        return f"session:{session_key}"
+    return None
+
+
+def request_owner_key(request):
+    if request.user.is_authenticated:
+        return owner_key(user_id=request.user.pk)
+    return owner_key(session_key=request.session.session_key)
+
+
+def _version_key(owner):
+    return f"owner-version:{owner}"
+
+
+def _modified_key(owner):
+    return f"owner-modified:{owner}"
+
+
+def get_owner_version(owner):
+    """
+    Current version of ``owner``. A missing counter (never written, or evicted)
+    starts from the clock, so it can never fall back to a value handed out before.
+    """
+    version = cache.get(_version_key(owner))
+    if version is None:
+        cache.add(_version_key(owner), time.time_ns(), timeout=None)
+        version = cache.get(_version_key(owner))
+    return version
+
+
+def get_owner_modified(owner):
+    return cache.get(_modified_key(owner))
+
+
+def bump_owner_versions(owners):
+    now = int(time.time())
+    for owner in set(owners):
+        if owner is None:
+            continue
+        try:
+            cache.incr(_version_key(owner))
+        except ValueError:
+            cache.set(_version_key(owner), time.time_ns(), timeout=None)
+        # Last-Modified has one-second resolution: keep it strictly increasing so
+        # two writes within the same second never yield the same value.
+        previous = cache.get(_modified_key(owner))
+        modified = now if previous is None else max(now, previous + 1)
+        cache.set(_modified_key(owner), modified, timeout=None)
+
+
+def bump_for_rows(rows, user_field='user_id', session_field='session_key'):
+    """Bump the owners of ``rows``, dicts carrying the owner's user id and session key."""
+    bump_owner_versions(owner_key(row[user_field], row[session_field]) for row in rows)
+
+
+class TwoTierCache:
+    """
+    Read-through cache of serialized objects: a per-process LRU of
+    OBJECT_CACHE_LOCAL_ENTRIES entries in front of the shared cache.
+
+    Keys must embed the owner's version. A write bumps the version in the shared
+    cache, so every process stops reading the old entries at once, in both
+    tiers; the local ones are then pushed out by newer entries. Values are
+    shared between requests and must not be modified.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.local = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get_or_set(self, key, compute):
+        """The value cached under ``key``, or ``compute()``, stored unless it is None."""
+        with self.lock:
+            value = self.local.get(key)
+            if value is not None:
+                self.local.move_to_end(key)
+        if value is not None:
+            OBJECT_CACHE_HITS.labels(cache=self.name, tier='local').inc()
+            return value
+
+        key_in_cache = f"object:{self.name}:{key}"
+        value = cache.get(key_in_cache)
+        if value is not None:
+            OBJECT_CACHE_HITS.labels(cache=self.name, tier='shared').inc()
+        else:
+            OBJECT_CACHE_MISSES.labels(cache=self.name).inc()
+            value = compute()
+            if value is None:
+                return None
+            cache.set(key_in_cache, value, settings.OWNER_CACHE_TIMEOUT)
+        self.remember(key, value)
+        return value
+
+    def remember(self, key, value):
+        max_entries = settings.OBJECT_CACHE_LOCAL_ENTRIES
+        if max_entries <= 0:
+            return
+        evicted = 0
+        with self.lock:
+            self.local[key] = value
+            self.local.move_to_end(key)
+            while len(self.local) > max_entries:
+                self.local.popitem(last=False)
+                evicted += 1
+        if evicted:
+            OBJECT_CACHE_EVICTIONS.labels(cache=self.name).inc(evicted)
+
+
+class VersionedListCacheMixin:
+    """
+    Conditional GET and response caching for ``list``.
+
+    The strong ETag combines the owner's version with a digest of the request
+    (host, path, query string, negotiated format), so a matching If-None-Match
+    is answered with 304 before touching the database, and a miss on ETag can
+    still be served from the response cache. Any successful unsafe request made
+    through the viewset bumps the owner's version.
+    """
+    list_cache_timeout = None  # defaults to settings.OWNER_CACHE_TIMEOUT
+
+    def list(self, request, *args, **kwargs):
+        owner = request_owner_key(request)
+        if owner is None:
+            return super().list(request, *args, **kwargs)
+
+        version = get_owner_version(owner)
+        digest = hashlib.sha1("\n".join([
+            owner,
+            request.get_host(),
+            request.get_full_path(),
+            request.accepted_media_type or '',
+            str(request.version),
+        ]).encode()).hexdigest()
+        etag = f'"{version}-{digest[:20]}"'
+        modified = get_owner_modified(owner)
+
+        if self.is_not_modified(request, etag, modified):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            key = f"owner-response:{digest}:{version}"
+            data = cache.get(key)
+            if data is not None:
+                response = Response(data)
+            else:
+                response = super().list(request, *args, **kwargs)
+                if response.status_code == status.HTTP_200_OK:
+                    timeout = self.list_cache_timeout or settings.OWNER_CACHE_TIMEOUT
+                    cache.set(key, response.data, timeout)
+
+        response['ETag'] = etag
+        if modified is not None:
+            response['Last-Modified'] = http_date(modified)
+        response['Cache-Control'] = 'private, no-cache'
+        response['Vary'] = 'Accept, Authorization, Cookie'
+        return response
+
+    def is_not_modified(self, request, etag, modified):
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match:
+            return etag in parse_etags(if_none_match) or if_none_match.strip() == '*'
+        since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+        return since is not None and modified is not None and modified <= since
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            bump_owner_versions([request_owner_key(request)])
+        return response
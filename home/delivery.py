@@ -0,0 +1,176 @@
+"""
+Delivery of the reminders created by the tasks.
+
+ReminderDispatcher drains the unsent reminders in batches. A batch is claimed
+by writing a lease (a random token and an expiry) on up to ``batch_size``
+claimable rows: unsent, under REMINDER_DELIVERY_MAX_ATTEMPTS attempts, and not
+leased or with an expired lease. The UPDATE re-checks the lease, so two
+dispatchers never hold the same row, and where the database can skip locked
+rows (PostgreSQL) concurrent claims do not even wait for each other. A
+dispatcher that dies leaves leases that expire after REMINDER_DELIVERY_LEASE
+seconds, and its reminders are claimed again: delivery is at least once.
+
+The claimed reminders are sent concurrently through the backend on a thread
+pool, then marked with one UPDATE per outcome, restricted to the rows still
+under this batch's lease: sent ones get ``is_sent`` and ``sent_at``, failed
+ones wait REMINDER_DELIVERY_RETRY_DELAY seconds under their lease before being
+claimed again, or get ``failed_at`` on their last attempt, which takes them
+out of the delivery queue (and its index) for good.
+
+Backends are classes named by REMINDER_DELIVERY_BACKEND with a ``send(reminder)``
+method taking a dict of Reminder values and raising on failure.
+"""
+import json
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import Case, DateTimeField, F, Q, Value, When
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from prometheus_client import Counter, Histogram
+from .models import Reminder
+
+logger = logging.getLogger(__name__)
+
+REMINDER_FIELDS = ('uid', 'todo_id', 'timing_id', 'user_id', 'session_key', 'message', 'due_at', 'created_at')
+
+reminders_delivered_total = Counter(
+    "todo_reminders_delivered_total",
+    "Reminders handed to the delivery backend, by outcome",
+    ["backend", "outcome"],
+)
+reminder_delivery_lag = Histogram(
+    "todo_reminder_delivery_lag_seconds",
+    "Time from the creation of a reminder to its delivery",
+    buckets=(0.5, 1, 2.5, 5, 10, 15, 30, 60, 120, 300, 600, 1800, 3600, 21600),
+)
+reminder_delivery_batch_time = Histogram(
+    "todo_reminder_delivery_batch_seconds",
+    "Time to claim, send and mark one batch of reminders",
+)
+
+
+class LogBackend:
+    """Writes each reminder to the ``home.delivery`` log."""
+
+    def send(self, reminder):
+        logger.info(f"Reminder {reminder['uid']} for todo {reminder['todo_id']}: {reminder['message']}")
+
+
+class FileBackend:
+    """Appends each reminder as one JSON line to REMINDER_DELIVERY_FILE."""
+
+    def __init__(self, path=None):
+        self.path = path or settings.REMINDER_DELIVERY_FILE
+        self.lock = threading.Lock()
+
+    def send(self, reminder):
+        line = json.dumps(reminder, cls=DjangoJSONEncoder) + "\n"
+        with self.lock, open(self.path, "a", encoding="utf-8") as file:
+            file.write(line)
+
+
+def get_backend():
+    return import_string(settings.REMINDER_DELIVERY_BACKEND)()
+
+
+class ReminderDispatcher:
+    def __init__(self, backend=None, batch_size=None, concurrency=None):
+        self.backend = backend or get_backend()
+        self.backend_name = type(self.backend).__name__
+        self.batch_size = batch_size or settings.REMINDER_DELIVERY_BATCH_SIZE
+        self.concurrency = concurrency or settings.REMINDER_DELIVERY_CONCURRENCY
+
+    def claim(self):
+        """The lease token and the values of the reminders leased to this call, oldest first."""
+        now = timezone.now()
+        token = uuid.uuid4().hex
+        claimable = Reminder.objects.filter(
+            Q(lease_until__isnull=True) | Q(lease_until__lt=now),
+            is_sent=False,
+            failed_at__isnull=True,
+            attempts__lt=settings.REMINDER_DELIVERY_MAX_ATTEMPTS,
+        )
+        with transaction.atomic():
+            candidates = claimable.order_by('created_at')
+            if connection.features.has_select_for_update_skip_locked:
+                candidates = candidates.select_for_update(skip_locked=True)
+            pks = list(candidates.values_list('pk', flat=True)[:self.batch_size])
+            if not pks:
+                return token, []
+            # Without row locks (SQLite) another dispatcher may have leased some since
+            claimable.filter(pk__in=pks).update(
+                lease_token=token, lease_until=now + timedelta(seconds=settings.REMINDER_DELIVERY_LEASE)
+            )
+        return token, list(Reminder.objects.filter(pk__in=pks, lease_token=token).order_by('created_at')
+                           .values(*REMINDER_FIELDS))
+
+    def send(self, pool, reminders):
+        """(pks of the sent reminders, pks of the failed ones)."""
+        def send_one(reminder):
+            try:
+                self.backend.send(reminder)
+                return True
+            except Exception:
+                logger.exception(f"Delivery of reminder {reminder['uid']} failed")
+                return False
+
+        sent, failed = [], []
+        for reminder, ok in zip(reminders, pool.map(send_one, reminders)):
+            (sent if ok else failed).append(reminder['uid'])
+        return sent, failed
+
+    def mark(self, token, reminders, sent, failed):
+        """
+        Record the outcomes of the reminders leased under ``token``. A lease
+        that expired meanwhile may have been claimed by another dispatcher,
+        whose lease is left alone.
+        """
+        now = timezone.now()
+        leased = Reminder.objects.filter(lease_token=token)
+        if sent:
+            leased.filter(pk__in=sent).update(
+                is_sent=True, sent_at=now, attempts=F('attempts') + 1, lease_token=None, lease_until=None
+            )
+        if failed:
+            last_attempt = Q(attempts__gte=settings.REMINDER_DELIVERY_MAX_ATTEMPTS - 1)
+            retry_at = now + timedelta(seconds=settings.REMINDER_DELIVERY_RETRY_DELAY)
+            leased.filter(pk__in=failed).update(
+                attempts=F('attempts') + 1, lease_token=None,
+                lease_until=Case(When(last_attempt, then=None), default=Value(retry_at), output_field=DateTimeField()),
+                failed_at=Case(When(last_attempt, then=Value(now)), default=None, output_field=DateTimeField()),
+            )
+        sent_pks = set(sent)
+        for reminder in reminders:
+            if reminder['uid'] in sent_pks:
+                reminder_delivery_lag.observe((now - reminder['created_at']).total_seconds())
+        reminders_delivered_total.labels(backend=self.backend_name, outcome='sent').inc(len(sent))
+        reminders_delivered_total.labels(backend=self.backend_name, outcome='failed').inc(len(failed))
+
+    def drain(self, max_batches=None):
+        """
+        Deliver batches until one comes back short of ``batch_size`` (or after
+        ``max_batches``); returns the counts of sent and failed reminders.
+        """
+        totals = {'batches': 0, 'sent': 0, 'failed': 0}
+        with ThreadPoolExecutor(self.concurrency, thread_name_prefix='reminder-delivery') as pool:
+            while max_batches is None or totals['batches'] < max_batches:
+                start = time.perf_counter()
+                token, reminders = self.claim()
+                if not reminders:
+                    break
+                sent, failed = self.send(pool, reminders)
+                self.mark(token, reminders, sent, failed)
+                reminder_delivery_batch_time.observe(time.perf_counter() - start)
+                totals['batches'] += 1
+                totals['sent'] += len(sent)
+                totals['failed'] += len(failed)
+                if len(reminders) < self.batch_size:
+                    break
+        return totals
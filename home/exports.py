@@ -0,0 +1,49 @@
+"""
+Streaming exports of an owner's data.
+
+Rows are read with ``values().iterator(chunk_size)`` and rendered one chunk at
+a time by the fast serializers, nested relations included, so memory depends
+on the chunk size and not on how much the owner has.
+"""
+import csv
+from itertools import islice
+from rest_framework.renderers import JSONRenderer
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def serialized_chunks(fast, queryset, chunk_size, nested=True):
+    """Serialized items of ``queryset``, one list per chunk of rows."""
+    rows = fast.values(queryset).iterator(chunk_size=chunk_size)
+    for chunk in chunked(rows, chunk_size):
+        yield fast.serialize(chunk) if nested else fast.build(chunk, {})
+
+
+def ndjson_lines(fast, queryset, chunk_size):
+    """One JSON document per item, encoded like the API's JSON responses."""
+    renderer = JSONRenderer()
+    for items in serialized_chunks(fast, queryset, chunk_size):
+        yield b"".join(renderer.render(item) + b"\n" for item in items)
+
+
+class Echo:
+    """File-like object handing back what csv.writer writes to it."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(fast, queryset, chunk_size):
+    """A header line, then one CSV line per item; nested relations are left out."""
+    columns = [name for name, kind, *_ in fast.plan if kind != 'nested']
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns)
+    for items in serialized_chunks(fast, queryset, chunk_size, nested=False):
+        yield "".join(
+            writer.writerow(['' if item[name] is None else item[name] for name in columns])
+            for item in items
+        )
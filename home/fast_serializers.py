@@ -0,0 +1,173 @@
+"""
+Read-only fast path for list responses.
+
+DRF renders every row through its field machinery (get_attribute, PKOnlyObject,
+per-field to_representation dispatch) on full model instances. For lists the
+same output can be built from values() rows with one converter per field,
+compiled once per serializer class.
+"""
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import ISO_8601, serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from .instrumentation import measure
+
+
+def _identity(value):
+    return value
+
+
+def _isoformat(value):
+    return value.isoformat()
+
+
+def field_converter(field):
+    """
+    A function turning a non-null column value into what ``field.to_representation``
+    returns for it, or the bound to_representation itself when there is no shortcut.
+    """
+    if isinstance(field, serializers.PrimaryKeyRelatedField) and field.pk_field is None:
+        return _identity  # the FK column already holds the pk
+    if isinstance(field, serializers.UUIDField) and field.uuid_format == 'hex_verbose':
+        return str
+    if isinstance(field, serializers.CharField):
+        return str
+    if isinstance(field, serializers.BooleanField):
+        return bool
+    for field_class, default in [
+        (serializers.DateTimeField, None),  # timezone handling stays with DRF
+        (serializers.DateField, api_settings.DATE_FORMAT),
+        (serializers.TimeField, api_settings.TIME_FORMAT),
+    ]:
+        if isinstance(field, field_class):
+            output_format = getattr(field, 'format', default)
+            if default is not None and isinstance(output_format, str) and output_format.lower() == ISO_8601:
+                return _isoformat
+            break
+    return field.to_representation
+
+
+class FastSerializer:
+    """
+    Renders ``serializer_class`` read-only from values() rows, with the same
+    result as ``serializer_class(instances, many=True).data``.
+
+    Plain fields map to a column and a converter. A SerializerMethodField is
+    computed by the method of the same name on this class, which receives the
+    row (list the columns it reads in ``method_columns``). Nested many=True
+    serializers of reverse relations are rendered by the FastSerializer given
+    in ``nested``, from one query per page like prefetch_related would.
+    """
+    serializer_class = None
+    nested = {}
+    method_columns = ()
+
+    def __init__(self, context=None):
+        self.context = context or {}
+        self.plan, self.columns = self.compile()
+
+    @classmethod
+    def compile(cls):
+        if '_compiled' not in cls.__dict__:
+            cls._compiled = cls._compile()
+        return cls._compiled
+
+    @classmethod
+    def _compile(cls):
+        serializer = cls.serializer_class()
+        model = serializer.Meta.model
+        plan, columns = [], [model._meta.pk.attname, *cls.method_columns]
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, serializers.SerializerMethodField):
+                if not hasattr(cls, field.method_name):
+                    raise ImproperlyConfigured(f"{cls.__name__} must implement {field.method_name}(row)")
+                plan.append((name, 'method', field.method_name, None))
+            elif isinstance(field, serializers.ListSerializer):
+                relation = model._meta.get_field(field.source)
+                if not relation.one_to_many or name not in cls.nested:
+                    raise ImproperlyConfigured(f"{cls.__name__} cannot render the nested field {name!r}")
+                plan.append((name, 'nested', relation, cls.nested[name]))
+            elif isinstance(field, serializers.BaseSerializer) or '.' in field.source or field.source == '*':
+                raise ImproperlyConfigured(f"{cls.__name__} cannot render the field {name!r}")
+            else:
+                column = model._meta.get_field(field.source).attname
+                plan.append((name, 'column', column, field_converter(field)))
+                columns.append(column)
+        return plan, tuple(dict.fromkeys(columns))
+
+    def values(self, queryset, *extra_columns):
+        """The rows to pass to serialize(): ``queryset`` as values() of the needed columns."""
+        return queryset.prefetch_related(None).values(*dict.fromkeys(self.columns + extra_columns))
+
+    def serialize(self, rows):
+        rows = list(rows)
+        with measure('serializer'):
+            return self.build(rows, self.fetch_related(rows))
+
+    def fetch_related(self, rows):
+        """
+        The rows of every nested relation of ``rows``, one query per relation:
+        {name: (fast serializer, fk column, related rows, their own related rows)}.
+        """
+        related = {}
+        for name, kind, relation, fast_class in self.plan:
+            if kind != 'nested':
+                continue
+            fast = fast_class(self.context)
+            fk = relation.field.attname
+            queryset = relation.related_model._default_manager.filter(
+                **{f'{relation.field.name}__in': [row[relation.field.target_field.attname] for row in rows]}
+            )
+            related_rows = list(fast.values(queryset, fk)) if rows else []
+            related[name] = (fast, fk, related_rows, fast.fetch_related(related_rows))
+        return related
+
+    def build(self, rows, related):
+        """
+        The serialized items of ``rows``, from already fetched related rows;
+        nested fields missing from ``related`` are left out of the items.
+        """
+        nested = {}
+        for name, (fast, fk, related_rows, their_related) in related.items():
+            grouped = nested[name] = {}
+            for row, item in zip(related_rows, fast.build(related_rows, their_related)):
+                grouped.setdefault(row[fk], []).append(item)
+
+        pk = self.serializer_class.Meta.model._meta.pk.attname
+        data = []
+        for row in rows:
+            item = {}
+            for name, kind, source, converter in self.plan:
+                if kind == 'column':
+                    value = row[source]
+                    item[name] = None if value is None else converter(value)
+                elif kind == 'method':
+                    item[name] = getattr(self, source)(row)
+                elif name in nested:
+                    item[name] = nested[name].get(row[pk], [])
+            data.append(item)
+        return data
+
+
+class FastListMixin:
+    """
+    Serves ``list`` through ``fast_serializer_class`` when FAST_LIST_SERIALIZATION
+    is on. Filtering, ordering and pagination are unchanged; the page is fetched
+    as values() rows, including the keyset pagination's ordering columns.
+    """
+    fast_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        if self.fast_serializer_class is None or not settings.FAST_LIST_SERIALIZATION:
+            return super().list(request, *args, **kwargs)
+
+        fast = self.fast_serializer_class(context=self.get_serializer_context())
+        keyset = getattr(self.paginator, 'keyset_class', None)
+        queryset = fast.values(self.filter_queryset(self.get_queryset()), *(keyset.ordering if keyset else ()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(fast.serialize(page))
+        return Response(fast.serialize(queryset))
@@ -0,0 +1,87 @@
+"""
+Bulk import of todos, with their timings, from NDJSON.
+
+Every line is validated by TodoImportSerializer, so imported rows follow the
+API's field rules (validate_todo_title included), and valid rows are written
+with bulk_create, one transaction per batch. Unlike the API, the importer
+does not request a reminder per todo: the uids of each batch are handed to
+create_todo_reminders once the batch is committed.
+"""
+import json
+from django.db import transaction
+from rest_framework import serializers
+from .caching import bump_owner_versions, owner_key
+from .exports import chunked
+from .models import Todo, TimingTodo
+from .scheduling import schedule_timings
+from .serializers import TodoImportSerializer
+from .tasks import BULK_BATCH_SIZE, create_todo_reminders
+
+
+class TodoImporter:
+    """
+    Imports lines for one owner (``user`` or ``session_key``).
+
+    Invalid lines are skipped and counted in ``rejected``; the first
+    ``max_errors`` of them are kept in ``errors`` as (line number, errors).
+    With ``reminders``, the create_todo_reminders tasks sent are counted in
+    ``reminder_tasks``.
+    """
+
+    def __init__(self, user=None, session_key=None, batch_size=1000, max_errors=100, reminders=True):
+        self.owner = {'user': user} if user is not None else {'session_key': session_key}
+        self.owner_key = owner_key(user.pk if user is not None else None, session_key)
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self.validator = TodoImportSerializer()
+        self.reminders = reminders
+        self.todos = self.timings = self.rejected = self.reminder_tasks = 0
+        self.errors = []
+
+    def run(self, lines):
+        """Import ``lines`` (str or bytes, one JSON object each); blank lines are ignored."""
+        batch = []
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                batch.append(self.validate(line))
+            except serializers.ValidationError as exc:
+                self.reject(number, exc.detail)
+                continue
+            if len(batch) >= self.batch_size:
+                self.write(batch)
+                batch = []
+        if batch:
+            self.write(batch)
+
+    def validate(self, line):
+        try:
+            item = json.loads(line)
+        except ValueError:
+            raise serializers.ValidationError({'non_field_errors': ['Invalid JSON.']})
+        return self.validator.run_validation(item)
+
+    def reject(self, number, detail):
+        self.rejected += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append((number, detail))
+
+    def write(self, batch):
+        todos, timings = [], []
+        for attrs in batch:
+            nested = attrs.pop('timingtodos', [])
+            todo = Todo(**attrs, **self.owner)
+            todos.append(todo)
+            timings.extend(TimingTodo(todo=todo, **timing) for timing in nested)
+        tasks = list(chunked([str(todo.uid) for todo in todos], BULK_BATCH_SIZE)) if self.reminders else []
+        with transaction.atomic():
+            Todo.objects.bulk_create(todos)
+            TimingTodo.objects.bulk_create(timings)
+            schedule_timings(timings)
+            for uids in tasks:
+                transaction.on_commit(lambda uids=uids: create_todo_reminders.delay(uids))
+        bump_owner_versions([self.owner_key])
+        self.todos += len(todos)
+        self.timings += len(timings)
+        self.reminder_tasks += len(tasks)
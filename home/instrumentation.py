@@ -0,0 +1,209 @@
+"""
+Per-request breakdown of where API time goes: SQL, serialization, rendering.
+
+RequestMetricsMiddleware gives every request a RequestTimings, reachable from
+any code running for it (threads from sync_to_async included) through a
+context variable. SQL queries are counted and timed by a wrapper installed on
+every database connection, serializer ``.data`` and the fast serializers are
+timed with ``measure('serializer')``, and rendering is timed around
+``response.render()``. Serializer and render time exclude the queries run
+meanwhile, such as a lazy queryset evaluated by a serializer, so the stages do
+not overlap. The totals are observed as histograms labeled by view and action.
+
+With REQUEST_PROFILING_SAMPLE_RATE above 0 a sample of sync requests also runs
+under cProfile, and the profiles of the slowest ones are written to
+REQUEST_PROFILING_DIR as .prof files (pstats, snakeviz, flameprof).
+"""
+import cProfile
+import os
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from prometheus_client import Histogram
+
+REQUEST_DB_QUERIES = Histogram(
+    "api_request_db_queries", "SQL queries per API request", ["view", "action"],
+    buckets=(0, 1, 2, 3, 4, 5, 7, 10, 15, 25, 50, 100),
+)
+REQUEST_DB_TIME = Histogram(
+    "api_request_db_seconds", "Time spent in SQL queries per API request", ["view", "action"]
+)
+REQUEST_SERIALIZER_TIME = Histogram(
+    "api_request_serializer_seconds", "Time spent building serializer data per API request, queries excluded",
+    ["view", "action"],
+)
+REQUEST_RENDER_TIME = Histogram(
+    "api_request_render_seconds", "Time spent rendering the response per API request, queries excluded",
+    ["view", "action"],
+)
+
+_current = ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    def __init__(self):
+        self.view = None
+        self.action = None
+        self.queries = 0
+        self.db = 0.0
+        self.serializer = 0.0
+        self.render = 0.0
+        self.measuring = False
+
+
+@contextmanager
+def measure(stage):
+    """
+    Add the block's time, less the queries it ran, to ``stage`` of the current
+    request. Blocks nested in a measured block are part of the outer one.
+    """
+    timings = _current.get()
+    if timings is None or timings.measuring:
+        yield
+        return
+    timings.measuring = True
+    db, start = timings.db, time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.measuring = False
+        elapsed = time.perf_counter() - start - (timings.db - db)
+        setattr(timings, stage, getattr(timings, stage) + elapsed)
+
+
+class TimedDataMixin:
+    """Serializer mixin counting the time spent building ``.data`` as serializer time."""
+
+    @property
+    def data(self):
+        with measure('serializer'):
+            return super().data
+
+
+def _record_query(execute, sql, params, many, context):
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db += time.perf_counter() - start
+        timings.queries += 1
+
+
+@receiver(connection_created)
+def _install_query_recorder(sender, connection, **_kwargs):
+    # At the front: execute_wrapper() blocks open around the connection pop from the end
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _record_query)
+
+
+def view_labels(request, view_func):
+    """(view, action) labels of the view handling ``request``."""
+    method = request.method.lower()
+    actions = getattr(view_func, 'actions', None)
+    if actions is not None:  # a viewset route
+        return view_func.cls.__name__, actions.get(method, method)
+    view_class = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+    if view_class is None:
+        return view_func.__name__, method
+    viewset_class = getattr(view_func, 'view_initkwargs', {}).get('viewset_class')
+    if viewset_class is not None:  # home.async_views
+        return viewset_class.__name__, f"async_{view_class.action}"
+    return view_class.__name__, method
+
+
+class RequestMetricsMiddleware:
+    """
+    Observes the timings of every request routed to a view; see the module
+    docstring. Place it first so the queries of the other middleware count.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        timings = RequestTimings()
+        token = _current.set(timings)
+        profiler = None
+        if settings.REQUEST_PROFILING_SAMPLE_RATE and random.random() < settings.REQUEST_PROFILING_SAMPLE_RATE:
+            profiler = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            if profiler is None:
+                response = self.get_response(request)
+            else:
+                response = profiler.runcall(self.get_response, request)
+        finally:
+            _current.reset(token)
+        self.observe(timings)
+        if profiler is not None:
+            save_profile(profiler, timings, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        token = _current.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.observe(timings)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timings = _current.get()
+        if timings is not None:
+            timings.view, timings.action = view_labels(request, view_func)
+        return None
+
+    def process_template_response(self, request, response):
+        # The last template hook before response.render(), which ends with the post-render callbacks
+        timings = _current.get()
+        if timings is not None:
+            db, start = timings.db, time.perf_counter()
+
+            def rendered(response):
+                timings.render += time.perf_counter() - start - (timings.db - db)
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    def observe(self, timings):
+        if timings.view is None:  # not routed to a view
+            return
+        labels = {'view': timings.view, 'action': timings.action}
+        REQUEST_DB_QUERIES.labels(**labels).observe(timings.queries)
+        REQUEST_DB_TIME.labels(**labels).observe(timings.db)
+        REQUEST_SERIALIZER_TIME.labels(**labels).observe(timings.serializer)
+        REQUEST_RENDER_TIME.labels(**labels).observe(timings.render)
+
+
+def save_profile(profiler, timings, elapsed):
+    """
+    Write the profile of a sampled request slower than REQUEST_PROFILING_MIN_SECONDS,
+    keeping the REQUEST_PROFILING_KEEP slowest profiles in REQUEST_PROFILING_DIR.
+    """
+    if elapsed < settings.REQUEST_PROFILING_MIN_SECONDS:
+        return
+    directory = Path(settings.REQUEST_PROFILING_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    # Zero-padded milliseconds first: sorting the names sorts by duration
+    name = f"{int(elapsed * 1000):07d}ms-{timings.view}-{timings.action}-{os.getpid()}-{time.time_ns()}.prof"
+    profiler.dump_stats(directory / name)
+    for path in sorted(directory.glob("*.prof"))[:-settings.REQUEST_PROFILING_KEEP or None]:
+        path.unlink(missing_ok=True)
@@ -0,0 +1,57 @@
+import logging
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+
+class BenchmarkCommand(BaseCommand):
+    """
+    Base class for benchmark commands.
+
+    The benchmark runs against a throwaway test database (created with the
+    project's migrations and destroyed afterwards), so it never touches real data.
+    Set ``file_database`` for benchmarks that need several connections to see
+    the same data: on SQLite the test database is then a temporary file instead
+    of an in-memory database.
+    """
+    file_database = False
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keepdb', action='store_true', help="Reuse and keep the benchmark database")
+
+    def handle(self, *args, **options):
+        # Per-row INFO logs from tasks would dominate the timings
+        for name in ('home', 'celery'):
+            logging.getLogger(name).setLevel(logging.WARNING)
+        old_name = connection.settings_dict['NAME']
+        tmpdir = None
+        if self.file_database and connection.vendor == 'sqlite' and not connection.settings_dict['TEST']['NAME']:
+            tmpdir = tempfile.mkdtemp()
+            connection.settings_dict['TEST']['NAME'] = os.path.join(tmpdir, 'benchmark.sqlite3')
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False, keepdb=options['keepdb'])
+        try:
+            self.run_benchmark(**options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+            if tmpdir and not options['keepdb']:
+                shutil.rmtree(tmpdir, ignore_errors=True)
+
+    def run_benchmark(self, **options):
+        raise NotImplementedError
+
+    @contextmanager
+    def timed(self, label, rows=None):
+        """Time the block and report it, with a rows/s rate when ``rows`` is given."""
+        result = {}
+        start = time.perf_counter()
+        yield result
+        elapsed = time.perf_counter() - start
+        result['elapsed'] = elapsed
+        rows = result.get('rows', rows)
+        rate = f" ({rows / elapsed:,.0f} rows/s)" if rows and elapsed else ""
+        count = f"{rows:>9,} rows" if rows is not None else " " * 14
+        self.stdout.write(f"{label:<40} {count} {elapsed:9.3f}s{rate}")
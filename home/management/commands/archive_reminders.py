@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from home.retention import ReminderArchiver
+
+
+class Command(BaseCommand):
+    help = (
+        "Move the reminders past their retention (sent, or old) to gzip NDJSON archive "
+        "segments, in chunks deleted one short transaction at a time"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', help="Archive directory (default: REMINDER_ARCHIVE_DIR)")
+        parser.add_argument('--batch-size', type=int, help="Reminders per transaction")
+        parser.add_argument('--sent-days', type=int, help="Archive sent reminders this many days after delivery, 0: never")
+        parser.add_argument('--max-days', type=int, help="Archive any reminder this many days after creation, 0: never")
+        parser.add_argument('--pause', type=float, help="Seconds to wait between chunks")
+
+    def handle(self, dir, batch_size, sent_days, max_days, pause, **options):
+        archiver = ReminderArchiver(directory=dir, batch_size=batch_size, sent_days=sent_days,
+                                    max_days=max_days, pause=pause)
+        result = archiver.run()
+        if result['segment'] is None:
+            self.stdout.write("No reminders to archive.")
+            return
+        self.stdout.write(
+            f"Archived {result['archived']:,} reminders to {result['segment']} in {result['seconds']:.2f}s "
+            f"({result['rows_per_second']:,.0f} rows/s)"
+        )
@@ -0,0 +1,91 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.contrib.auth.models import User
+from django.test import AsyncClient, Client, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from home.models import Todo, TimingTodo, Reminder
+from ._benchmark import BenchmarkCommand
+
+
+class Command(BenchmarkCommand):
+    help = "Compare latency and throughput of the read endpoints under WSGI, ASGI, and ASGI with the async views"
+    file_database = True
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--requests', type=int, default=2000, help="Requests per serving mode")
+        parser.add_argument('--concurrency', type=int, default=64, help="Concurrent clients")
+        parser.add_argument('--todos', type=int, default=200, help="Todos owned by the benchmark user")
+
+    def run_benchmark(self, requests, concurrency, todos, **options):
+        user = User.objects.create_user(username="bench", password="bench")
+        token = Token.objects.create(user=user)
+        rows = Todo.objects.bulk_create(
+            [Todo(user=user, todo_title=f"Bench todo {i}", todo_description="bench") for i in range(todos)]
+        )
+        TimingTodo.objects.bulk_create(
+            [TimingTodo(todo=todo, schedule_date=timezone.localdate(), start_time=f"{hour:02}:00")
+             for todo in rows for hour in range(3)]
+        )
+        Reminder.objects.bulk_create([Reminder(todo=todo, message="bench") for todo in rows])
+
+        paths = [
+            "todos/?limit=20",
+            f"todos/{rows[0].uid}/",
+            "timings/?limit=20",
+            f"todos/{rows[1].uid}/reminders/",
+        ]
+        headers = {"Authorization": f"Token {token.key}", "Accept": "application/json"}
+        self.stdout.write(f"{requests:,} requests over {len(paths)} endpoints, {concurrency} concurrent clients")
+
+        # Every request does the full work: no response cache, no throttling
+        dummy = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+        with override_settings(CACHES=dummy, ALLOWED_HOSTS=['testserver']):
+            self.report("WSGI, sync views", self.run_wsgi([f"/api/v1/{p}" for p in paths], headers, requests, concurrency))
+            self.report("ASGI, sync views", self.run_asgi([f"/api/v1/{p}" for p in paths], headers, requests, concurrency))
+            self.report("ASGI, async views", self.run_asgi([f"/api/v1/async/{p}" for p in paths], headers, requests, concurrency))
+
+    def run_wsgi(self, urls, headers, requests, concurrency):
+        local = threading.local()
+
+        def request(i):
+            client = getattr(local, 'client', None) or Client()
+            local.client = client
+            start = time.perf_counter()
+            response = client.get(urls[i % len(urls)], headers=headers)
+            assert response.status_code == 200, response.content
+            return time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as pool:
+            latencies = list(pool.map(request, range(requests)))
+        return latencies, time.perf_counter() - start
+
+    def run_asgi(self, urls, headers, requests, concurrency):
+        async def main():
+            client = AsyncClient()
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def request(i):
+                async with semaphore:
+                    start = time.perf_counter()
+                    response = await client.get(urls[i % len(urls)], headers=headers)
+                    assert response.status_code == 200, response.content
+                    return time.perf_counter() - start
+
+            start = time.perf_counter()
+            latencies = await asyncio.gather(*(request(i) for i in range(requests)))
+            return latencies, time.perf_counter() - start
+
+        return asyncio.run(main())
+
+    def report(self, label, result):
+        latencies, elapsed = result
+        latencies = sorted(latencies)
+        p50, p95 = (latencies[int(len(latencies) * q)] * 1000 for q in (0.5, 0.95))
+        self.stdout.write(
+            f"{label:<20} {len(latencies) / elapsed:8,.0f} req/s   p50 {p50:7.1f} ms   p95 {p95:7.1f} ms"
+        )
@@ -0,0 +1,97 @@
+import datetime
+import threading
+import time
+from django.db import OperationalError, close_old_connections, connection, transaction
+from django.utils import timezone
+from home.models import Todo, TimingTodo
+from home.tasks import create_todo_reminders, mark_due_todos
+from ._benchmark import BenchmarkCommand
+
+
+class Command(BenchmarkCommand):
+    help = "Run web-style and worker-style writes in parallel threads and report throughput and lock errors"
+    file_database = True
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--web', type=int, default=8, help="Web threads")
+        parser.add_argument('--workers', type=int, default=2, help="Worker threads")
+        parser.add_argument('--duration', type=float, default=5.0, help="Seconds per profile")
+
+    def run_benchmark(self, web, workers, duration, **options):
+        settings_dict = connection.settings_dict
+        configured = (settings_dict['CONN_MAX_AGE'], dict(settings_dict['OPTIONS']))
+        profiles = {'configured': configured}
+        if connection.vendor == 'sqlite':
+            # Django's defaults: rollback journal, deferred transactions, a new connection per request.
+            # Run first: the WAL journal mode is persistent once set on the file.
+            profiles = {'default': (0, {'init_command': 'PRAGMA journal_mode=DELETE'}), **profiles}
+
+        try:
+            for name, (max_age, opts) in profiles.items():
+                connection.close()
+                settings_dict['CONN_MAX_AGE'], settings_dict['OPTIONS'] = max_age, opts
+                self.measure(name, web, workers, duration)
+        finally:
+            settings_dict['CONN_MAX_AGE'], settings_dict['OPTIONS'] = configured
+
+    def measure(self, label, web, workers, duration):
+        stats = {'web': [], 'worker': [], 'errors': 0, 'connects': 0}
+        lock = threading.Lock()
+        deadline = time.monotonic() + duration
+
+        def run(role, operation):
+            try:
+                while time.monotonic() < deadline:
+                    # What Django does around each request (and Celery around each task)
+                    close_old_connections()
+                    if connection.connection is None:
+                        with lock:
+                            stats['connects'] += 1
+                    start = time.perf_counter()
+                    try:
+                        operation()
+                    except OperationalError:
+                        with lock:
+                            stats['errors'] += 1
+                        continue
+                    finally:
+                        close_old_connections()
+                    with lock:
+                        stats[role].append(time.perf_counter() - start)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=run, args=('web', self.web_request)) for _ in range(web)]
+        threads += [threading.Thread(target=run, args=('worker', self.worker_task)) for _ in range(workers)]
+        with self.timed(label) as result:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            result['rows'] = len(stats['web']) + len(stats['worker'])
+
+        for role in ('web', 'worker'):
+            latencies = sorted(stats[role])
+            if latencies:
+                p95 = latencies[int(len(latencies) * 0.95)] * 1000
+                self.stdout.write(f"  {role:<7} {len(latencies):>7,} ops  p95 {p95:8.1f} ms")
+        self.stdout.write(f"  connections opened {stats['connects']:,}, 'database is locked' errors {stats['errors']:,}")
+
+    def web_request(self):
+        """A todo created with a timing, then a read of the owner's list."""
+        session_key = f"bench-{threading.get_ident() % 1000}"
+        with transaction.atomic():
+            todo = Todo.objects.create(session_key=session_key, todo_title="Concurrent", todo_description="bench")
+            TimingTodo.objects.create(
+                todo=todo,
+                schedule_date=timezone.localdate(),
+                start_time=(timezone.localtime() + datetime.timedelta(minutes=5)).time(),
+            )
+        list(Todo.objects.filter(session_key=session_key).order_by('-created_at')[:5])
+
+    def worker_task(self):
+        """A batch of creation reminders followed by a due-reminder sweep."""
+        uids = list(Todo.objects.order_by('-created_at').values_list('uid', flat=True)[:20])
+        create_todo_reminders.apply(args=[[str(uid) for uid in uids]]).get()
+        mark_due_todos.apply().get()
@@ -0,0 +1,66 @@
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from django.db import connection
+from home.delivery import ReminderDispatcher
+from home.models import Todo, Reminder
+from ._benchmark import BenchmarkCommand
+
+
+class LatencyBackend:
+    """Stand-in for a remote service: each send takes ``latency`` seconds."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.sent = Counter()
+        self.lock = threading.Lock()
+
+    def send(self, reminder):
+        time.sleep(self.latency)
+        with self.lock:
+            self.sent[reminder['uid']] += 1
+
+
+class Command(BenchmarkCommand):
+    help = "Benchmark draining unsent reminders with several concurrent dispatchers"
+    file_database = True
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--reminders', type=int, default=20_000, help="Unsent reminders")
+        parser.add_argument('--dispatchers', type=int, default=4, help="Concurrent dispatchers (workers)")
+        parser.add_argument('--concurrency', type=int, default=8, help="Send threads per dispatcher")
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--latency', type=float, default=0.002, help="Seconds per send")
+
+    def run_benchmark(self, reminders, dispatchers, concurrency, batch_size, latency, **options):
+        with self.timed("seed reminders", reminders):
+            todos = Todo.objects.bulk_create(
+                [Todo(session_key=f"bench-{i}", todo_title=f"Bench todo {i}", todo_description="bench")
+                 for i in range(reminders // 10 + 1)],
+                batch_size=1000,
+            )
+            Reminder.objects.bulk_create(
+                [Reminder(todo=todos[i // 10], message=f"Reminder {i}") for i in range(reminders)],
+                batch_size=1000,
+            )
+
+        backend = LatencyBackend(latency)
+
+        def drain(_):
+            try:
+                return ReminderDispatcher(backend, batch_size=batch_size, concurrency=concurrency).drain()
+            finally:
+                connection.close()
+
+        with self.timed(f"drain ({dispatchers} dispatchers x {concurrency} threads)", reminders):
+            with ThreadPoolExecutor(dispatchers) as pool:
+                totals = list(pool.map(drain, range(dispatchers)))
+
+        duplicates = sum(count - 1 for count in backend.sent.values())
+        self.stdout.write(
+            f"  sent {sum(t['sent'] for t in totals):,} in {sum(t['batches'] for t in totals):,} batches, "
+            f"{duplicates:,} sent twice, {Reminder.objects.filter(is_sent=False).count():,} left unsent"
+        )
+        self.stdout.write(f"  a serial loop would take {reminders * latency:.1f}s in sends alone")
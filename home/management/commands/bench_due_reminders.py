@@ -0,0 +1,61 @@
+import datetime
+from django.utils import timezone
+from home.models import Todo, TimingTodo, Reminder
+from home.exports import chunked
+from home.scheduling import schedule_timings
+from home.tasks import fire_due_reminders, mark_due_todos
+from ._benchmark import BenchmarkCommand
+
+
+class Command(BenchmarkCommand):
+    help = "Benchmark mark_due_todos and the due index (fire_due_reminders) against a table of due timings"
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--timings', type=int, default=100_000, help="Number of due timings")
+        parser.add_argument('--per-todo', type=int, default=10, help="Timings per todo")
+        parser.add_argument('--noise', type=int, default=100_000, help="Timings outside the due window")
+
+    def run_benchmark(self, timings, per_todo, noise, **options):
+        now = timezone.localtime()
+        todos_needed = (timings + noise) // per_todo + 1
+        with self.timed("seed todos", todos_needed):
+            todos = Todo.objects.bulk_create(
+                [Todo(session_key=f"bench-{i % 1000}", todo_title=f"Bench todo {i}", todo_description="bench")
+                 for i in range(todos_needed)],
+                batch_size=1000,
+            )
+
+        def timing(i, when):
+            return TimingTodo(todo=todos[i // per_todo], schedule_date=when.date(), start_time=when.time())
+
+        with self.timed("seed timings", timings + noise):
+            rows = [timing(i, now + datetime.timedelta(seconds=60 + i % 780)) for i in range(timings)]
+            rows += [timing(timings + i, now + datetime.timedelta(hours=1 + i % 200)) for i in range(noise)]
+            TimingTodo.objects.bulk_create(rows, batch_size=1000)
+
+        with self.timed("mark_due_todos (cold)") as result:
+            outcome = mark_due_todos.apply().get()
+            result['rows'] = outcome['new_reminders_count']
+        self.stdout.write(f"  checked {outcome['checked_count']:,}, created {outcome['new_reminders_count']:,}")
+
+        with self.timed("mark_due_todos (all deduplicated)") as result:
+            outcome = mark_due_todos.apply().get()
+            result['rows'] = outcome['checked_count']
+        self.stdout.write(f"  checked {outcome['checked_count']:,}, created {outcome['new_reminders_count']:,}")
+        self.stdout.write(f"reminders in table: {Reminder.objects.count():,}")
+
+        Reminder.objects.all().delete()
+        with self.timed("schedule_timings (index every timing)", timings + noise):
+            for chunk in chunked(rows, 1000):
+                schedule_timings(chunk)
+        del rows
+
+        with self.timed("fire_due_reminders (due buckets)") as result:
+            outcome = fire_due_reminders.apply().get()
+            result['rows'] = outcome['new_reminders_count']
+        self.stdout.write(f"  fired {outcome['fired_count']:,}, created {outcome['new_reminders_count']:,}")
+
+        with self.timed("fire_due_reminders (nothing due)"):
+            outcome = fire_due_reminders.apply().get()
+        self.stdout.write(f"  fired {outcome['fired_count']:,}")
@@ -0,0 +1,47 @@
+import datetime
+import tracemalloc
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import Client, override_settings
+from django.utils import timezone
+from home.models import Todo, TimingTodo, Reminder
+from ._benchmark import BenchmarkCommand
+
+
+class Command(BenchmarkCommand):
+    help = "Measure the time and peak memory of streaming a todo export as the owner grows"
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000], help="Todos per owner")
+        parser.add_argument('--timings', type=int, default=2, help="Timings (each with a reminder) per todo")
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def run_benchmark(self, sizes, timings, chunk_size, **options):
+        client = Client()
+        with override_settings(
+            EXPORT_CHUNK_SIZE=chunk_size, ALLOWED_HOSTS=['testserver'],
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+        ):
+            for size in sizes:
+                user = User.objects.create_user(username=f"export{size}")
+                todos = Todo.objects.bulk_create(
+                    [Todo(user=user, todo_title=f"Export todo {i}", todo_description="bench") for i in range(size)]
+                )
+                created = TimingTodo.objects.bulk_create(
+                    [TimingTodo(todo=todo, schedule_date=timezone.localdate(), start_time=datetime.time(hour))
+                     for todo in todos for hour in range(timings)]
+                )
+                Reminder.objects.bulk_create(
+                    [Reminder(todo_id=timing.todo_id, timing=timing, message="bench") for timing in created]
+                )
+                client.force_login(user)
+                for export_format in ('ndjson', 'csv'):
+                    cache.clear()
+                    tracemalloc.start()
+                    with self.timed(f"{size} todos, {export_format}", size):
+                        response = client.get(f"/api/v1/todos/export/?export_format={export_format}")
+                        written = sum(len(part) for part in response.streaming_content)
+                    _, peak = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                    self.stdout.write(f"{'':<40} {written:>9,} bytes, peak {peak / 2 ** 20:.1f} MiB")
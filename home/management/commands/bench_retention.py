@@ -0,0 +1,70 @@
+import datetime
+import tempfile
+import threading
+import time
+from pathlib import Path
+from django.db import connection
+from django.utils import timezone
+from home.models import Todo, Reminder
+from home.retention import ReminderArchiver
+from ._benchmark import BenchmarkCommand
+
+
+class Command(BenchmarkCommand):
+    help = "Benchmark archiving reminders, with a concurrent writer measuring how long it waits"
+    file_database = True
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--reminders', type=int, default=100_000, help="Reminders past their retention")
+        parser.add_argument('--kept', type=int, default=100_000, help="Reminders kept")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def run_benchmark(self, reminders, kept, batch_size, **options):
+        now = timezone.now()
+        with self.timed("seed reminders", reminders + kept):
+            todos = Todo.objects.bulk_create(
+                [Todo(session_key=f"bench-{i}", todo_title=f"Bench todo {i}", todo_description="bench")
+                 for i in range((reminders + kept) // 10 + 1)],
+                batch_size=1000,
+            )
+            Reminder.objects.bulk_create(
+                [Reminder(todo=todos[i // 10], message=f"Reminder {i}", is_sent=i < reminders,
+                          sent_at=now - datetime.timedelta(days=30) if i < reminders else None)
+                 for i in range(reminders + kept)],
+                batch_size=1000,
+            )
+
+        stop = threading.Event()
+        waits = []
+
+        def writer():
+            try:
+                while not stop.is_set():
+                    start = time.perf_counter()
+                    Reminder.objects.create(todo=todos[0], message="written meanwhile")
+                    waits.append(time.perf_counter() - start)
+                    time.sleep(0.005)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=writer)
+        with tempfile.TemporaryDirectory() as directory:
+            thread.start()
+            try:
+                with self.timed(f"archive (batches of {batch_size})") as result:
+                    outcome = ReminderArchiver(directory, batch_size=batch_size, sent_days=7, max_days=0).run()
+                    result['rows'] = outcome['archived']
+            finally:
+                stop.set()
+                thread.join()
+            size = sum(path.stat().st_size for path in Path(directory).iterdir())
+        waits.sort()
+        self.stdout.write(
+            f"  archive: {size / 2**20:.1f} MiB gzip, {size / max(outcome['archived'], 1):.0f} bytes per reminder"
+        )
+        self.stdout.write(
+            f"  concurrent writer: {len(waits):,} inserts, p50 {waits[len(waits) // 2] * 1000:.1f} ms, "
+            f"max {waits[-1] * 1000:.1f} ms"
+        )
+        self.stdout.write(f"reminders left: {Reminder.objects.count():,}")
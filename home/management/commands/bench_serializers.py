@@ -0,0 +1,64 @@
+import datetime
+from django.db import reset_queries
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from home.models import Todo, TimingTodo
+from home.serializers import TodoSerializer, FastTodoSerializer
+from ._benchmark import BenchmarkCommand
+
+
+class Command(BenchmarkCommand):
+    help = "Compare DRF and fast serialization of todo list pages with nested timings"
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--page-size', type=int, default=100, help="Todos per page")
+        parser.add_argument('--timings', type=int, default=3, help="Timings per todo")
+        parser.add_argument('--pages', type=int, default=200, help="Pages rendered per path")
+
+    def run_benchmark(self, page_size, timings, pages, **options):
+        todos = Todo.objects.bulk_create(
+            [Todo(session_key="bench", todo_title=f"Bench todo number {i}", todo_description="bench")
+             for i in range(page_size)]
+        )
+        TimingTodo.objects.bulk_create(
+            [TimingTodo(todo=todo, schedule_date=timezone.localdate(), start_time=datetime.time(hour), note="note")
+             for todo in todos for hour in range(timings)]
+        )
+        queryset = Todo.objects.filter(session_key="bench").order_by('created_at', 'uid')
+        renderer = JSONRenderer()
+        rows = page_size * pages
+
+        def drf_page():
+            return TodoSerializer(list(queryset.prefetch_related('timingtodos')), many=True).data
+
+        fast = FastTodoSerializer()
+
+        def fast_page():
+            return fast.serialize(fast.values(queryset))
+
+        drf_json, fast_json = renderer.render(drf_page()), renderer.render(fast_page())
+        if drf_json != fast_json:
+            raise AssertionError("fast serializer output differs from TodoSerializer")
+        self.stdout.write(f"{page_size} todos x {timings} timings per page, {len(drf_json):,} bytes, outputs identical")
+
+        # Serialization only, from already fetched data
+        instances = list(queryset.prefetch_related('timingtodos'))
+        values = list(fast.values(queryset))
+        related = fast.fetch_related(values)
+        with self.timed("DRF serializer (objects in memory)", rows):
+            for _ in range(pages):
+                TodoSerializer(instances, many=True).data
+        with self.timed("fast serializer (rows in memory)", rows):
+            for _ in range(pages):
+                fast.build(values, related)
+
+        # Fetch + serialize + render, as a list request does
+        with self.timed("DRF: fetch, serialize, render", rows):
+            for _ in range(pages):
+                renderer.render(drf_page())
+                reset_queries()
+        with self.timed("fast: fetch, serialize, render", rows):
+            for _ in range(pages):
+                renderer.render(fast_page())
+                reset_queries()
@@ -0,0 +1,47 @@
+from unittest import mock
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.views import APIView
+from home.models import Todo
+from ._benchmark import BenchmarkCommand
+
+SESSION_ENGINES = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "cache": "django.contrib.sessions.backends.cache",
+}
+
+
+class Command(BenchmarkCommand):
+    help = "Measure database writes caused by cookieless anonymous reads, with eager and lazy sessions"
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--requests', type=int, default=1000, help="Cookieless GETs per configuration")
+
+    def run_benchmark(self, requests, **options):
+        Todo.objects.bulk_create(
+            [Todo(session_key=f"bench-{i % 100}", todo_title=f"Bench todo {i}", todo_description="bench")
+             for i in range(1000)]
+        )
+        urls = ["/api/v1/todos/", "/api/v1/timings/"]
+
+        # Every request comes from a new client: the anonymous throttle would reject most of them
+        with mock.patch.object(APIView, 'throttle_classes', []):
+            for lazy in (False, True):
+                for engine, path in SESSION_ENGINES.items():
+                    with override_settings(LAZY_ANONYMOUS_SESSIONS=lazy, SESSION_ENGINE=path):
+                        self.measure(f"{'lazy' if lazy else 'eager'} sessions, {engine}", urls, requests)
+
+    def measure(self, label, urls, requests):
+        client = Client(SERVER_NAME="localhost")
+        with self.timed(label, requests), CaptureQueriesContext(connection) as ctx:
+            for i in range(requests):
+                client.cookies.clear()
+                client.get(urls[i % len(urls)])
+        writes = sum(q["sql"].startswith(("INSERT", "UPDATE", "DELETE")) for q in ctx.captured_queries)
+        self.stdout.write(
+            f"  {len(ctx.captured_queries) / requests:.2f} queries/request, "
+            f"{writes / requests:.2f} writes/request ({writes:,} total)"
+        )
@@ -0,0 +1,42 @@
+import pickle
+from unittest import mock
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework.throttling import AnonRateThrottle, SimpleRateThrottle
+from home.throttling import AnonTokenBucketThrottle
+from ._benchmark import BenchmarkCommand
+
+
+class Command(BenchmarkCommand):
+    help = "Measure the per-request cost and stored state of DRF's rate throttle and the token bucket throttle"
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--requests', type=int, default=20000, help="Throttle checks per throttle class")
+        parser.add_argument('--clients', type=int, default=10, help="Distinct client addresses")
+        parser.add_argument('--rate', default='100000/hour', help="Rate high enough not to reject anything")
+
+    def run_benchmark(self, requests, clients, rate, **options):
+        cache = caches['default']
+        factory = APIRequestFactory()
+        batch = []
+        for i in range(clients):
+            request = Request(factory.get('/api/v1/todos/', REMOTE_ADDR=f"10.0.0.{i}"))
+            request.user = AnonymousUser()
+            batch.append(request)
+        self.stdout.write(f"cache: {type(cache).__name__}, {requests:,} checks over {clients} clients at {rate}")
+
+        with mock.patch.object(SimpleRateThrottle, 'THROTTLE_RATES', {'anon': rate}):
+            for throttle_class in (AnonRateThrottle, AnonTokenBucketThrottle):
+                cache.clear()
+                with self.timed(throttle_class.__name__, requests) as result:
+                    for i in range(requests):
+                        throttle = throttle_class()
+                        if not throttle.allow_request(batch[i % clients], None):
+                            raise AssertionError("request throttled; raise --rate")
+                stored = len(pickle.dumps(cache.get(throttle.key)))
+                self.stdout.write(
+                    f"  {result['elapsed'] / requests * 1e6:.1f} µs/check, {stored:,} bytes of state per client"
+                )
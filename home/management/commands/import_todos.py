@@ -0,0 +1,51 @@
+import json
+import sys
+import time
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from home.imports import TodoImporter
+
+
+class Command(BaseCommand):
+    help = (
+        "Import todos, with nested timings, from an NDJSON file (one todo per line, "
+        "as written by /todos/export/) for one user or session"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="NDJSON file to import, or - for stdin")
+        owner = parser.add_mutually_exclusive_group(required=True)
+        owner.add_argument('--user', help="Username owning the imported todos")
+        owner.add_argument('--session-key', help="Session key owning the imported todos")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Todos written per transaction")
+        parser.add_argument('--max-errors', type=int, default=20, help="Rejected lines reported in detail")
+        parser.add_argument('--no-reminders', action='store_true', help="Do not request creation reminders")
+
+    def handle(self, path, user, session_key, batch_size, max_errors, no_reminders, **options):
+        if user is not None:
+            try:
+                user = User.objects.get(username=user)
+            except User.DoesNotExist:
+                raise CommandError(f"User {user!r} does not exist.")
+        importer = TodoImporter(user=user, session_key=session_key, batch_size=batch_size, max_errors=max_errors,
+                                reminders=not no_reminders)
+
+        start = time.perf_counter()
+        stream = sys.stdin.buffer if path == '-' else open(path, 'rb')
+        try:
+            importer.run(stream)
+        finally:
+            if stream is not sys.stdin.buffer:
+                stream.close()
+        elapsed = time.perf_counter() - start
+
+        for number, errors in importer.errors:
+            self.stderr.write(f"line {number}: {json.dumps(errors)}")
+        if importer.rejected > len(importer.errors):
+            self.stderr.write(f"... and {importer.rejected - len(importer.errors)} more rejected lines")
+        rate = importer.todos / elapsed if elapsed else 0
+        self.stdout.write(
+            f"Imported {importer.todos:,} todos and {importer.timings:,} timings in {elapsed:.2f}s "
+            f"({rate:,.0f} todos/s), rejected {importer.rejected:,} lines, "
+            f"sent {importer.reminder_tasks} reminder tasks"
+        )
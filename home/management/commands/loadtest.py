@@ -0,0 +1,211 @@
+import datetime
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from celery.signals import before_task_publish
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.sessions.backends.db import SessionStore
+from django.db import connection
+from django.test import Client, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.views import APIView
+from home.models import Todo, TimingTodo, Reminder
+from ._benchmark import BenchmarkCommand
+
+JSON = 'application/json'
+WORDS = ["groceries", "report", "gym", "dentist", "invoice", "garden", "meeting", "laundry", "travel", "budget"]
+
+# operation -> weight in the request mix
+MIX = {
+    'list todos': 25,
+    'list todos, ordered': 5,
+    'list todos, filtered': 5,
+    'search todos': 10,
+    'retrieve todo': 15,
+    'todo timings': 8,
+    'todo reminders': 5,
+    'list timings': 10,
+    'create todo': 6,
+    'update todo': 5,
+    'create timing': 3,
+    'update timing': 3,
+}
+
+
+def percentile(ordered, q):
+    return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BenchmarkCommand):
+    help = (
+        "Seed users and anonymous sessions with todos and timings, replay a mix of API "
+        "requests against them and report latency percentiles, throughput and queries per request"
+    )
+    file_database = True
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--users', type=int, default=10, help="Token-authenticated owners")
+        parser.add_argument('--sessions', type=int, default=10, help="Anonymous session owners")
+        parser.add_argument('--todos', type=int, default=100, help="Todos per owner")
+        parser.add_argument('--timings', type=int, default=3, help="Timings per todo")
+        parser.add_argument('--requests', type=int, default=5000, help="Requests replayed")
+        parser.add_argument('--concurrency', type=int, default=8, help="Concurrent clients")
+        parser.add_argument('--no-cache', action='store_true', help="Disable the response cache")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed for the data and the mix")
+
+    def run_benchmark(self, users, sessions, todos, timings, requests, concurrency, no_cache, seed, **options):
+        rng = random.Random(seed)
+        with self.timed("seed", (users + sessions) * todos * (timings + 2)):
+            owners = self.seed(rng, users, sessions, todos, timings)
+        operations = list(MIX)
+        plan = [
+            (rng.choice(owners), op, rng.random())
+            for op in rng.choices(operations, weights=[MIX[op] for op in operations], k=requests)
+        ]
+
+        # No Redis: tasks are published to kombu's in-memory transport and left there.
+        # Celery reads these variables before its configuration.
+        broker = {'CELERY_BROKER_URL': 'memory://localhost/', 'CELERY_RESULT_BACKEND': 'cache+memory://'}
+        published = []
+        before_task_publish.connect(lambda **kwargs: published.append(1), weak=False)
+
+        overrides = {'ALLOWED_HOSTS': ['testserver']}
+        if no_cache:
+            overrides['CACHES'] = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+        local = threading.local()
+
+        def run(step):
+            if not hasattr(local, 'clients'):
+                local.clients, local.counter = {}, QueryCounter()
+                connection.execute_wrappers.append(local.counter)  # for the life of the thread
+            owner, op, choice = step
+            client = local.clients.get(owner['name'])
+            if client is None:
+                client = local.clients[owner['name']] = self.client_for(owner)
+            before = local.counter.count
+            start = time.perf_counter()
+            response = self.request(client, owner, op, choice)
+            elapsed = time.perf_counter() - start
+            return op, elapsed, local.counter.count - before, response.status_code
+
+        self.stdout.write(
+            f"{len(owners)} owners x {todos} todos x {timings} timings; "
+            f"{requests:,} requests, {concurrency} concurrent clients"
+        )
+        # Throttling would cap the replay at the configured rates
+        with override_settings(**overrides), mock.patch.dict(os.environ, broker), \
+                mock.patch.object(APIView, 'throttle_classes', []):
+            start = time.perf_counter()
+            with ThreadPoolExecutor(concurrency) as pool:
+                results = list(pool.map(run, plan))
+            elapsed = time.perf_counter() - start
+        self.report(results, elapsed, len(published))
+
+    def seed(self, rng, users, sessions, todos, timings):
+        owners = []
+        for i in range(users):
+            user = User.objects.create_user(username=f"load{i}")
+            owners.append({'name': f"user{i}", 'token': Token.objects.create(user=user).key, 'fields': {'user': user}})
+        for i in range(sessions):
+            session = SessionStore()
+            session.create()
+            owners.append({'name': f"session{i}", 'session_key': session.session_key,
+                           'fields': {'session_key': session.session_key}})
+
+        today = timezone.localdate()
+        for owner in owners:
+            rows = Todo.objects.bulk_create([
+                Todo(todo_title=f"{' '.join(rng.sample(WORDS, 2))} {i}", todo_description=rng.choice(WORDS),
+                     is_done=rng.random() < 0.3, **owner['fields'])
+                for i in range(todos)
+            ])
+            timing_rows = TimingTodo.objects.bulk_create([
+                TimingTodo(todo=todo, schedule_date=today + datetime.timedelta(days=rng.randrange(30)),
+                           start_time=datetime.time(rng.randrange(24), rng.choice((0, 30))))
+                for todo in rows for _ in range(timings)
+            ])
+            Reminder.objects.bulk_create([Reminder(todo=todo, message="seeded") for todo in rows])
+            owner['todos'] = [str(todo.uid) for todo in rows]
+            owner['timings'] = [(str(timing.todo_id), str(timing.uid)) for timing in timing_rows]
+        return owners
+
+    def client_for(self, owner):
+        if 'token' in owner:
+            return Client(headers={'Authorization': f"Token {owner['token']}", 'Accept': 'application/json'})
+        client = Client(headers={'Accept': 'application/json'})
+        client.cookies[settings.SESSION_COOKIE_NAME] = owner['session_key']
+        return client
+
+    def request(self, client, owner, op, choice):
+        todo = owner['todos'][int(choice * len(owner['todos']))]
+        todo_uid, timing_uid = owner['timings'][int(choice * len(owner['timings']))] if owner['timings'] else (todo, None)
+        word = WORDS[int(choice * len(WORDS))]
+        if op == 'list todos':
+            return client.get("/api/v1/todos/?limit=20")
+        if op == 'list todos, ordered':
+            return client.get("/api/v1/todos/?ordering=-todo_title&limit=20")
+        if op == 'list todos, filtered':
+            return client.get("/api/v1/todos/?is_done=true&limit=20")
+        if op == 'search todos':
+            return client.get(f"/api/v1/todos/?search={word}&limit=20")
+        if op == 'retrieve todo':
+            return client.get(f"/api/v1/todos/{todo}/")
+        if op == 'todo timings':
+            return client.get(f"/api/v1/todos/{todo}/timings/")
+        if op == 'todo reminders':
+            return client.get(f"/api/v1/todos/{todo}/reminders/")
+        if op == 'list timings':
+            return client.get("/api/v1/timings/?limit=20")
+        if op == 'create todo':
+            return client.post("/api/v1/todos/", {'todo_title': f"new {word}", 'todo_description': word},
+                               content_type=JSON)
+        if op == 'update todo':
+            return client.patch(f"/api/v1/todos/{todo}/", {'is_done': choice < 0.5}, content_type=JSON)
+        if op == 'create timing':
+            return client.post(f"/api/v1/todos/{todo}/timings/",
+                               {'schedule_date': str(timezone.localdate()), 'start_time': "09:00"}, content_type=JSON)
+        if op == 'update timing':
+            return client.patch(f"/api/v1/todos/{todo_uid}/timings/{timing_uid}/", {'note': word}, content_type=JSON)
+        raise ValueError(op)
+
+    def report(self, results, elapsed, published):
+        by_op = defaultdict(list)
+        for op, latency, queries, status_code in results:
+            by_op[op].append((latency, queries, status_code))
+        by_op['all'] = [result[1:] for result in results]
+
+        self.stdout.write(
+            f"{'operation':<22} {'requests':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+            f"{'queries':>8} {'errors':>7}"
+        )
+        for op in [*MIX, 'all']:
+            rows = by_op.get(op)
+            if not rows:
+                continue
+            latencies = sorted(latency for latency, _, _ in rows)
+            p50, p95, p99 = (percentile(latencies, q) * 1000 for q in (0.5, 0.95, 0.99))
+            queries = sum(count for _, count, _ in rows) / len(rows)
+            errors = sum(status_code >= 400 for _, _, status_code in rows)
+            self.stdout.write(
+                f"{op:<22} {len(rows):>8,} {p50:>8.1f} {p95:>8.1f} {p99:>8.1f} {queries:>8.1f} {errors:>7,}"
+            )
+        self.stdout.write(
+            f"throughput: {len(results) / elapsed:,.0f} req/s over {elapsed:.2f}s; "
+            f"{published:,} Celery tasks published to the in-memory broker"
+        )
@@ -1,8 +1,14 @@
 import os
+import shutil
 import time
 import logging
-from prometheus_client import Counter, Histogram, start_http_server
-from celery.signals import worker_process_init, task_prerun, task_postrun, task_failure
+from contextlib import ExitStack
+from datetime import datetime
+from django.db import connection
+from prometheus_client import CollectorRegistry, Counter, Histogram, REGISTRY, multiprocess, start_http_server
+from celery.signals import (
+    before_task_publish, worker_init, worker_process_shutdown, task_prerun, task_postrun, task_failure,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -19,29 +25,125 @@ TASKS_FAILED = Counter(
 TASK_RUNTIME = Histogram(
     "celery_task_runtime_seconds", "Celery task runtime in seconds", ["task"]
 )
+TASK_QUEUE_WAIT = Histogram(
+    "celery_task_queue_wait_seconds", "Time from publishing (or ETA) to the start of a Celery task", ["task"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+)
+TASK_DB_TIME = Histogram(
+    "celery_task_db_seconds", "Time spent in database queries by a Celery task", ["task"]
+)
+TASK_DB_QUERIES = Histogram(
+    "celery_task_db_queries", "Database queries issued by a Celery task", ["task"],
+    buckets=(0, 1, 2, 5, 10, 25, 50, 100, 250, 1000),
+)
+
+# Set on every published message, read back in task_prerun
+ENQUEUED_AT_HEADER = "enqueued_at"
 
-# Keep per-task start times
-_runtime_cache = {}
 
-@worker_process_init.connect
+@worker_init.connect
 def _start_metrics_server(**_kwargs):
+    """
+    One metrics endpoint per worker, served by the main process.
+
+    With PROMETHEUS_MULTIPROC_DIR set, every pool process writes its samples
+    to that directory and the endpoint merges them, so prefork children are
+    aggregated; thread, gevent and solo pools run in the main process and
+    share its registry either way. The directory must not be shared with the
+    web server, and is emptied here so a previous run is not merged in.
+    """
+    path = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
     port = int(os.getenv("CELERY_METRICS_PORT", "9091"))
-    start_http_server(port, addr="0.0.0.0")
+    start_http_server(port, addr="0.0.0.0", registry=registry)
     logger.info(f"Prometheus metrics server started on port {port}")
 
+
+@worker_process_shutdown.connect
+def _mark_process_dead(pid=None, **_kwargs):
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid or os.getpid())
+
+
+@before_task_publish.connect
+def _stamp_enqueued_at(headers=None, **_kwargs):
+    if headers is not None:
+        headers.setdefault(ENQUEUED_AT_HEADER, time.time())
+
+
+def _header(request, name):
+    # Worker requests expose custom headers as attributes; eager ones keep them in .headers
+    value = getattr(request, name, None)
+    if value is None:
+        value = (getattr(request, "headers", None) or {}).get(name)
+    return value
+
+
+def _queue_wait(request, now):
+    enqueued_at = _header(request, ENQUEUED_AT_HEADER)
+    if enqueued_at is None:
+        return None
+    enqueued_at = float(enqueued_at)
+    eta = getattr(request, "eta", None)
+    if eta:
+        # A scheduled task is only due at its ETA: count the wait from there
+        if isinstance(eta, str):
+            eta = datetime.fromisoformat(eta)
+        enqueued_at = max(enqueued_at, eta.timestamp())
+    return max(now - enqueued_at, 0.0)
+
+
+class _QueryTimer:
+    """execute_wrapper accumulating the time and number of the queries it sees."""
+
+    def __init__(self):
+        self.elapsed = 0.0
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.elapsed += time.perf_counter() - start
+            self.count += 1
+
+
+# Per-execution state lives on task.request, which Celery discards with the
+# task, so revoked or crashed tasks cannot leak entries.
 @task_prerun.connect
-def _on_prerun(task_id=None, task=None, **_kwargs):
+def _on_prerun(task=None, **_kwargs):
     TASKS_STARTED.labels(task=task.name).inc()
-    _runtime_cache[task_id] = time.perf_counter()
+    wait = _queue_wait(task.request, time.time())
+    if wait is not None:
+        TASK_QUEUE_WAIT.labels(task=task.name).observe(wait)
+
+    timer = _QueryTimer()
+    stack = ExitStack()
+    stack.enter_context(connection.execute_wrapper(timer))
+    task.request.metrics = (time.perf_counter(), timer, stack)
+
 
 @task_postrun.connect
-def _on_postrun(task_id=None, task=None, **_kwargs):
-    start = _runtime_cache.pop(task_id, None)
-    if start is not None:
+def _on_postrun(task=None, state=None, **_kwargs):
+    metrics = getattr(task.request, "metrics", None)
+    if metrics is not None:
+        start, timer, stack = metrics
+        stack.close()
+        task.request.metrics = None
         TASK_RUNTIME.labels(task=task.name).observe(time.perf_counter() - start)
-    TASKS_SUCCEEDED.labels(task=task.name).inc()
+        TASK_DB_TIME.labels(task=task.name).observe(timer.elapsed)
+        TASK_DB_QUERIES.labels(task=task.name).observe(timer.count)
+    if state == "SUCCESS":
+        TASKS_SUCCEEDED.labels(task=task.name).inc()
+
 
 @task_failure.connect
-def _on_failure(task_id=None, exception=None, task=None, **_kwargs):
-    # Count failure; runtime (if any) will be captured in postrun if it fires
-    TASKS_FAILED.labels(task=task.name).inc()
\ No newline at end of file
+def _on_failure(task_id=None, exception=None, sender=None, **_kwargs):
+    TASKS_FAILED.labels(task=sender.name).inc()
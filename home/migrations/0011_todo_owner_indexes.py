@@ -0,0 +1,37 @@
+# Generated by Django 5.2.4 on 2026-10-18 17:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("home", "0010_reminder"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="timingtodo",
+            index=models.Index(
+                fields=["todo", "schedule_date"], name="timing_todo_schedule_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="timingtodo",
+            index=models.Index(fields=["start_time"], name="timing_start_time_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="todo",
+            index=models.Index(
+                fields=["user", "created_at"], name="todo_user_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="todo",
+            index=models.Index(
+                fields=["session_key", "created_at"], name="todo_session_created_idx"
+            ),
+        ),
+    ]
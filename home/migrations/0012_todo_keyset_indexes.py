@@ -0,0 +1,36 @@
+# Generated by Django 5.2.4 on 2026-10-18 17:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("home", "0011_todo_owner_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="todo",
+            name="todo_user_created_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="todo",
+            name="todo_session_created_idx",
+        ),
+        migrations.AddIndex(
+            model_name="todo",
+            index=models.Index(
+                fields=["user", "created_at", "uid"], name="todo_user_created_uid_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="todo",
+            index=models.Index(
+                fields=["session_key", "created_at", "uid"],
+                name="todo_session_created_uid_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,67 @@
+from django.db import migrations
+
+# The SQL is frozen here so this migration keeps doing what it did when it was
+# written; home.search describes the current layout, see 0023.
+INSTALL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS home_todo_fts USING fts5("
+    "todo_title, todo_description, content='home_todo', content_rowid='rowid', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER home_todo_fts_ai AFTER INSERT ON home_todo BEGIN "
+    "INSERT INTO home_todo_fts(rowid, todo_title, todo_description) "
+    "VALUES (new.rowid, new.todo_title, new.todo_description); END",
+    "CREATE TRIGGER home_todo_fts_ad AFTER DELETE ON home_todo BEGIN "
+    "INSERT INTO home_todo_fts(home_todo_fts, rowid, todo_title, todo_description) "
+    "VALUES ('delete', old.rowid, old.todo_title, old.todo_description); END",
+    "CREATE TRIGGER home_todo_fts_au AFTER UPDATE OF todo_title, todo_description ON home_todo BEGIN "
+    "INSERT INTO home_todo_fts(home_todo_fts, rowid, todo_title, todo_description) "
+    "VALUES ('delete', old.rowid, old.todo_title, old.todo_description); "
+    "INSERT INTO home_todo_fts(rowid, todo_title, todo_description) "
+    "VALUES (new.rowid, new.todo_title, new.todo_description); END",
+    "INSERT INTO home_todo_fts(home_todo_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0)')",
+    "INSERT INTO home_todo_fts(home_todo_fts) VALUES ('rebuild')",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS home_timingtodo_fts USING fts5("
+    "note, content='home_timingtodo', content_rowid='rowid', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER home_timingtodo_fts_ai AFTER INSERT ON home_timingtodo BEGIN "
+    "INSERT INTO home_timingtodo_fts(rowid, note) VALUES (new.rowid, new.note); END",
+    "CREATE TRIGGER home_timingtodo_fts_ad AFTER DELETE ON home_timingtodo BEGIN "
+    "INSERT INTO home_timingtodo_fts(home_timingtodo_fts, rowid, note) "
+    "VALUES ('delete', old.rowid, old.note); END",
+    "CREATE TRIGGER home_timingtodo_fts_au AFTER UPDATE OF note ON home_timingtodo BEGIN "
+    "INSERT INTO home_timingtodo_fts(home_timingtodo_fts, rowid, note) "
+    "VALUES ('delete', old.rowid, old.note); "
+    "INSERT INTO home_timingtodo_fts(rowid, note) VALUES (new.rowid, new.note); END",
+    "INSERT INTO home_timingtodo_fts(home_timingtodo_fts) VALUES ('rebuild')",
+]
+
+UNINSTALL = [
+    "DROP TRIGGER IF EXISTS home_todo_fts_ai",
+    "DROP TRIGGER IF EXISTS home_todo_fts_ad",
+    "DROP TRIGGER IF EXISTS home_todo_fts_au",
+    "DROP TABLE IF EXISTS home_todo_fts",
+    "DROP TRIGGER IF EXISTS home_timingtodo_fts_ai",
+    "DROP TRIGGER IF EXISTS home_timingtodo_fts_ad",
+    "DROP TRIGGER IF EXISTS home_timingtodo_fts_au",
+    "DROP TABLE IF EXISTS home_timingtodo_fts",
+]
+
+
+def run(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != "sqlite":
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("home", "0012_todo_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(run(INSTALL), run(UNINSTALL)),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.4 on 2026-10-18 17:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("home", "0013_search_indexes"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="timingtodo",
+            name="timing_start_time_idx",
+        ),
+        migrations.AddField(
+            model_name="reminder",
+            name="due_at",
+            field=models.DateTimeField(
+                blank=True, help_text="When the timing is due", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="reminder",
+            name="timing",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="Timing this due reminder was created for",
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="reminders",
+                to="home.timingtodo",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="timingtodo",
+            index=models.Index(
+                fields=["schedule_date", "start_time"], name="timing_due_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="reminder",
+            constraint=models.UniqueConstraint(
+                fields=("timing", "due_at"), name="reminder_timing_due_unique"
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-18 17:29
+
+import home.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("home", "0014_reminder_due_dedup"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="todo",
+            name="slug",
+            field=home.models.TitleSlugField(
+                blank=True, editable=False, max_length=120, populate_from="todo_title"
+            ),
+        ),
+    ]
@@ -0,0 +1,48 @@
+from django.db import migrations, models, transaction
+from django.utils.text import slugify
+
+BATCH_SIZE = 1000
+
+
+def backfill_slugs(apps, schema_editor):
+    """
+    Fill the slug of existing todos in chunks walked by primary key, each in
+    its own transaction, so large tables are never locked for the whole run.
+    """
+    Todo = apps.get_model("home", "Todo")
+    max_length = Todo._meta.get_field("slug").max_length
+    last = None
+    while True:
+        chunk = Todo.objects.order_by("uid").only("uid", "todo_title", "slug")
+        if last is not None:
+            chunk = chunk.filter(uid__gt=last)
+        todos = list(chunk[:BATCH_SIZE])
+        if not todos:
+            break
+        for todo in todos:
+            todo.slug = slugify(todo.todo_title)[:max_length].strip("-")
+        with transaction.atomic():
+            Todo.objects.bulk_update(todos, ["slug"])
+        last = todos[-1].uid
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("home", "0015_todo_slug"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_slugs, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="todo",
+            index=models.Index(fields=["user", "slug"], name="todo_user_slug_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="todo",
+            index=models.Index(
+                fields=["session_key", "slug"], name="todo_session_slug_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,68 @@
+from django.db import migrations, models, transaction
+from django.db.models import OuterRef, Subquery
+
+BATCH_SIZE = 1000
+
+
+def backfill_owners(apps, schema_editor):
+    """
+    Copy the owner of their todo onto existing timings and reminders, in chunks
+    walked by primary key, each updated by one statement in its own transaction.
+    """
+    Todo = apps.get_model("home", "Todo")
+    todo = Todo.objects.filter(uid=OuterRef("todo_id"))
+    for model_name in ("TimingTodo", "Reminder"):
+        model = apps.get_model("home", model_name)
+        last = None
+        while True:
+            chunk = model.objects.order_by("uid").values_list("uid", flat=True)
+            if last is not None:
+                chunk = chunk.filter(uid__gt=last)
+            uids = list(chunk[:BATCH_SIZE])
+            if not uids:
+                break
+            with transaction.atomic():
+                model.objects.filter(uid__in=uids).update(
+                    user_id=Subquery(todo.values("user_id")[:1]),
+                    session_key=Subquery(todo.values("session_key")[:1]),
+                )
+            last = uids[-1]
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("home", "0017_timing_reminder_owner"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_owners, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="reminder",
+            index=models.Index(
+                fields=["user", "created_at", "uid"],
+                name="reminder_user_created_uid_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="reminder",
+            index=models.Index(
+                fields=["session_key", "created_at", "uid"],
+                name="reminder_sess_created_uid_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="timingtodo",
+            index=models.Index(
+                fields=["user", "created_at", "uid"], name="timing_user_created_uid_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="timingtodo",
+            index=models.Index(
+                fields=["session_key", "created_at", "uid"],
+                name="timing_session_created_uid_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.4 on 2026-10-18 17:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("home", "0019_reminder_delivery"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DueTiming",
+            fields=[
+                (
+                    "timing",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="due_entry",
+                        serialize=False,
+                        to="home.timingtodo",
+                    ),
+                ),
+                ("due_at", models.DateTimeField()),
+                (
+                    "bucket",
+                    models.DateTimeField(
+                        help_text="Minute at which the due reminder is created"
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["bucket"], name="due_timing_bucket_idx")
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+import datetime
+from django.db import migrations, transaction
+from django.utils import timezone
+
+BATCH_SIZE = 1000
+# home.scheduling.REMINDER_LEAD when this migration was written
+REMINDER_LEAD = datetime.timedelta(minutes=15)
+
+
+def backfill_due_timings(apps, schema_editor):
+    """
+    Index the timings still to come, in chunks walked by primary key, each
+    inserted in its own transaction.
+    """
+    TimingTodo = apps.get_model("home", "TimingTodo")
+    DueTiming = apps.get_model("home", "DueTiming")
+    now = timezone.now()
+    tz = timezone.get_current_timezone()
+    timings = TimingTodo.objects.filter(
+        schedule_date__gte=timezone.localdate(now), start_time__isnull=False
+    ).order_by("uid")
+    last = None
+    while True:
+        chunk = timings if last is None else timings.filter(uid__gt=last)
+        rows = list(
+            chunk.values_list("uid", "schedule_date", "start_time")[:BATCH_SIZE]
+        )
+        if not rows:
+            break
+        entries = []
+        for uid, schedule_date, start_time in rows:
+            due = datetime.datetime.combine(schedule_date, start_time, tzinfo=tz)
+            if due >= now:
+                bucket = max(due - REMINDER_LEAD, now).replace(second=0, microsecond=0)
+                entries.append(DueTiming(timing_id=uid, due_at=due, bucket=bucket))
+        with transaction.atomic():
+            DueTiming.objects.bulk_create(entries, ignore_conflicts=True)
+        last = rows[-1][0]
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("home", "0020_due_timing"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_due_timings, migrations.RunPython.noop),
+    ]
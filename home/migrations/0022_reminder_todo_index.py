@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-18 17:59
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("home", "0021_backfill_due_timings"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="reminder",
+            index=models.Index(
+                fields=["todo", "created_at", "uid"],
+                name="reminder_todo_created_uid_idx",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="reminder",
+            name="todo",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="reminders",
+                to="home.todo",
+            ),
+        ),
+    ]
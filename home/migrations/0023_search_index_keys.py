@@ -0,0 +1,111 @@
+from django.db import migrations
+
+# Key the search indexes by a stable integer id instead of the implicit rowid
+# of the UUID-keyed tables, which VACUUM and table rebuilds may renumber. The
+# indexes store their own copy of the text. SQL frozen from home.search.
+KEYED = [
+    "CREATE TABLE home_todo_fts_keys (id INTEGER PRIMARY KEY, uid TEXT NOT NULL UNIQUE)",
+    "CREATE VIRTUAL TABLE home_todo_fts USING fts5("
+    "todo_title, todo_description, tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER home_todo_fts_ai AFTER INSERT ON home_todo BEGIN "
+    "INSERT INTO home_todo_fts_keys(uid) VALUES (new.uid); "
+    "INSERT INTO home_todo_fts(rowid, todo_title, todo_description) VALUES ("
+    "(SELECT id FROM home_todo_fts_keys WHERE uid = new.uid), new.todo_title, new.todo_description); END",
+    "CREATE TRIGGER home_todo_fts_ad AFTER DELETE ON home_todo BEGIN "
+    "DELETE FROM home_todo_fts WHERE rowid = (SELECT id FROM home_todo_fts_keys WHERE uid = old.uid); "
+    "DELETE FROM home_todo_fts_keys WHERE uid = old.uid; END",
+    "CREATE TRIGGER home_todo_fts_au AFTER UPDATE OF todo_title, todo_description ON home_todo BEGIN "
+    "UPDATE home_todo_fts SET todo_title = new.todo_title, todo_description = new.todo_description "
+    "WHERE rowid = (SELECT id FROM home_todo_fts_keys WHERE uid = new.uid); END",
+    "INSERT INTO home_todo_fts(home_todo_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0)')",
+    "INSERT INTO home_todo_fts_keys(uid) SELECT uid FROM home_todo",
+    "INSERT INTO home_todo_fts(rowid, todo_title, todo_description) "
+    "SELECT k.id, c.todo_title, c.todo_description FROM home_todo c JOIN home_todo_fts_keys k ON k.uid = c.uid",
+    "CREATE TABLE home_timingtodo_fts_keys (id INTEGER PRIMARY KEY, uid TEXT NOT NULL UNIQUE)",
+    "CREATE VIRTUAL TABLE home_timingtodo_fts USING fts5(note, tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER home_timingtodo_fts_ai AFTER INSERT ON home_timingtodo BEGIN "
+    "INSERT INTO home_timingtodo_fts_keys(uid) VALUES (new.uid); "
+    "INSERT INTO home_timingtodo_fts(rowid, note) VALUES ("
+    "(SELECT id FROM home_timingtodo_fts_keys WHERE uid = new.uid), new.note); END",
+    "CREATE TRIGGER home_timingtodo_fts_ad AFTER DELETE ON home_timingtodo BEGIN "
+    "DELETE FROM home_timingtodo_fts WHERE rowid = (SELECT id FROM home_timingtodo_fts_keys WHERE uid = old.uid); "
+    "DELETE FROM home_timingtodo_fts_keys WHERE uid = old.uid; END",
+    "CREATE TRIGGER home_timingtodo_fts_au AFTER UPDATE OF note ON home_timingtodo BEGIN "
+    "UPDATE home_timingtodo_fts SET note = new.note "
+    "WHERE rowid = (SELECT id FROM home_timingtodo_fts_keys WHERE uid = new.uid); END",
+    "INSERT INTO home_timingtodo_fts_keys(uid) SELECT uid FROM home_timingtodo",
+    "INSERT INTO home_timingtodo_fts(rowid, note) "
+    "SELECT k.id, c.note FROM home_timingtodo c JOIN home_timingtodo_fts_keys k ON k.uid = c.uid",
+]
+
+EXTERNAL_CONTENT = [
+    "CREATE VIRTUAL TABLE home_todo_fts USING fts5("
+    "todo_title, todo_description, content='home_todo', content_rowid='rowid', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER home_todo_fts_ai AFTER INSERT ON home_todo BEGIN "
+    "INSERT INTO home_todo_fts(rowid, todo_title, todo_description) "
+    "VALUES (new.rowid, new.todo_title, new.todo_description); END",
+    "CREATE TRIGGER home_todo_fts_ad AFTER DELETE ON home_todo BEGIN "
+    "INSERT INTO home_todo_fts(home_todo_fts, rowid, todo_title, todo_description) "
+    "VALUES ('delete', old.rowid, old.todo_title, old.todo_description); END",
+    "CREATE TRIGGER home_todo_fts_au AFTER UPDATE OF todo_title, todo_description ON home_todo BEGIN "
+    "INSERT INTO home_todo_fts(home_todo_fts, rowid, todo_title, todo_description) "
+    "VALUES ('delete', old.rowid, old.todo_title, old.todo_description); "
+    "INSERT INTO home_todo_fts(rowid, todo_title, todo_description) "
+    "VALUES (new.rowid, new.todo_title, new.todo_description); END",
+    "INSERT INTO home_todo_fts(home_todo_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0)')",
+    "INSERT INTO home_todo_fts(home_todo_fts) VALUES ('rebuild')",
+    "CREATE VIRTUAL TABLE home_timingtodo_fts USING fts5("
+    "note, content='home_timingtodo', content_rowid='rowid', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER home_timingtodo_fts_ai AFTER INSERT ON home_timingtodo BEGIN "
+    "INSERT INTO home_timingtodo_fts(rowid, note) VALUES (new.rowid, new.note); END",
+    "CREATE TRIGGER home_timingtodo_fts_ad AFTER DELETE ON home_timingtodo BEGIN "
+    "INSERT INTO home_timingtodo_fts(home_timingtodo_fts, rowid, note) "
+    "VALUES ('delete', old.rowid, old.note); END",
+    "CREATE TRIGGER home_timingtodo_fts_au AFTER UPDATE OF note ON home_timingtodo BEGIN "
+    "INSERT INTO home_timingtodo_fts(home_timingtodo_fts, rowid, note) "
+    "VALUES ('delete', old.rowid, old.note); "
+    "INSERT INTO home_timingtodo_fts(rowid, note) VALUES (new.rowid, new.note); END",
+    "INSERT INTO home_timingtodo_fts(home_timingtodo_fts) VALUES ('rebuild')",
+]
+
+DROP_INDEXES = [
+    "DROP TRIGGER IF EXISTS home_todo_fts_ai",
+    "DROP TRIGGER IF EXISTS home_todo_fts_ad",
+    "DROP TRIGGER IF EXISTS home_todo_fts_au",
+    "DROP TABLE IF EXISTS home_todo_fts",
+    "DROP TRIGGER IF EXISTS home_timingtodo_fts_ai",
+    "DROP TRIGGER IF EXISTS home_timingtodo_fts_ad",
+    "DROP TRIGGER IF EXISTS home_timingtodo_fts_au",
+    "DROP TABLE IF EXISTS home_timingtodo_fts",
+]
+
+DROP_KEYS = [
+    "DROP TABLE IF EXISTS home_todo_fts_keys",
+    "DROP TABLE IF EXISTS home_timingtodo_fts_keys",
+]
+
+
+def run(*statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != "sqlite":
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("home", "0022_reminder_todo_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run(*DROP_INDEXES, *KEYED),
+            run(*DROP_INDEXES, *DROP_KEYS, *EXTERNAL_CONTENT),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.4 on 2026-10-18 18:17
+
+import home.models
+from django.db import migrations
+from django.db.models import F, Value
+from django.db.models.functions import Concat
+
+# The Todo.slug reserved slugs when this migration was written
+RESERVED = ["bulk", "export"]
+
+
+def rename_reserved_slugs(apps, schema_editor):
+    """Existing todos whose slug is a list route get the suffix new ones get."""
+    Todo = apps.get_model("home", "Todo")
+    Todo.objects.filter(slug__in=RESERVED).update(slug=Concat(F("slug"), Value("-1")))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("home", "0023_search_index_keys"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="todo",
+            name="slug",
+            field=home.models.TitleSlugField(
+                blank=True,
+                editable=False,
+                max_length=120,
+                populate_from="todo_title",
+                reserved=("bulk", "export"),
+            ),
+        ),
+        migrations.RunPython(rename_reserved_slugs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.4 on 2026-10-18 18:23
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def give_up_exhausted(apps, schema_editor):
+    """Reminders already out of delivery attempts leave the delivery queue."""
+    Reminder = apps.get_model("home", "Reminder")
+    Reminder.objects.filter(
+        is_sent=False, attempts__gte=settings.REMINDER_DELIVERY_MAX_ATTEMPTS
+    ).update(failed_at=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("home", "0024_reserve_todo_slugs"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="reminder",
+            name="reminder_unsent_idx",
+        ),
+        migrations.AddField(
+            model_name="reminder",
+            name="failed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(give_up_exhausted, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="reminder",
+            index=models.Index(
+                condition=models.Q(("failed_at__isnull", True), ("is_sent", False)),
+                fields=["created_at"],
+                name="reminder_unsent_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,231 @@
+import uuid
+from functools import lru_cache
+from django.conf import settings
+from django.db import transaction
+from django.db.models import prefetch_related_objects
+from django.http import Http404
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+
+def related_lookups(serializer, prefix=""):
+    """
+    Walk the fields of a serializer and collect the relation paths it reads,
+    split into (select_related, prefetch_related) lookups.
+    """
+    select, prefetch = [], []
+    for field in serializer.fields.values():
+        if field.write_only or field.source == '*':
+            continue
+        path = prefix + field.source.replace('.', '__')
+        if isinstance(field, serializers.ListSerializer):
+            # Reverse FK / M2M rendered through a nested serializer
+            prefetch.append(path)
+            child_select, child_prefetch = related_lookups(field.child, path + '__')
+            prefetch.extend(child_select + child_prefetch)
+        elif isinstance(field, serializers.ManyRelatedField):
+            prefetch.append(path)
+        elif isinstance(field, serializers.BaseSerializer):
+            # Forward FK rendered through a nested serializer
+            select.append(path)
+            child_select, child_prefetch = related_lookups(field, path + '__')
+            select.extend(child_select)
+            prefetch.extend(child_prefetch)
+    return select, prefetch
+
+
+def ensure_session_key(request):
+    """The request's session key, creating (and persisting) the session if needed."""
+    if not request.session.session_key:
+        request.session.save()
+    return request.session.session_key
+
+
+class OwnerScopedMixin:
+    """
+    Restricts the queryset to the request's owner: the authenticated user, or
+    the anonymous session. ``owner_lookup`` prefixes the owner fields for
+    models that reach them through a relation.
+
+    With LAZY_ANONYMOUS_SESSIONS, an anonymous request without a session owns
+    nothing yet: reads short-circuit to an empty queryset (no query, no session
+    row) and the session is only created by the first write, in get_owner().
+    """
+    owner_lookup = ''
+
+    def get_owner_queryset(self, queryset):
+        user = self.request.user
+        if user.is_authenticated:
+            return queryset.filter(**{f'{self.owner_lookup}user': user})
+
+        session_key = self.request.session.session_key
+        if not session_key:
+            if settings.LAZY_ANONYMOUS_SESSIONS:
+                return queryset.none()
+            session_key = ensure_session_key(self.request)
+        return queryset.filter(**{f'{self.owner_lookup}session_key': session_key})
+
+    def get_owner(self):
+        """Owner fields for new todos: the user, or the (created on demand) session."""
+        if self.request.user.is_authenticated:
+            return {'user': self.request.user}
+        return {'session_key': ensure_session_key(self.request)}
+
+
+class SlugLookupMixin:
+    """
+    Detail routes accept the object's slug wherever they take its uid. Slugs
+    are not unique: a slug names the oldest of the owner's matching objects.
+    """
+    slug_field = 'slug'
+
+    def filter_lookup(self, queryset, value):
+        lookup_field = self.lookup_field
+        try:
+            uuid.UUID(str(value))
+        except ValueError:
+            lookup_field = self.slug_field
+        return queryset.filter(**{lookup_field: value}).order_by('created_at', 'uid')
+
+    def get_object(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        obj = self.filter_lookup(queryset, self.kwargs[self.lookup_url_kwarg or self.lookup_field]).first()
+        if obj is None:
+            raise Http404(f"No {queryset.model._meta.object_name} matches the given query.")
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+
+@lru_cache(maxsize=None)
+def serializer_lookups(serializer_class):
+    return related_lookups(serializer_class())
+
+
+class SerializerPrefetchMixin:
+    """
+    Adds select_related/prefetch_related to the queryset based on the relations
+    the viewset's serializer renders, so list pages cost a fixed number of queries.
+
+    ``query_budget`` maps an action to the number of queries it may issue against
+    the app tables; it is asserted in the tests.
+    """
+    optimize_actions = ('list', 'retrieve', 'update', 'partial_update')
+    query_budget = {}
+
+    def optimize_queryset(self, queryset):
+        if getattr(self, 'action', None) not in self.optimize_actions:
+            return queryset
+        select, prefetch = serializer_lookups(self.get_serializer_class())
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
+
+
+class BulkActionsMixin:
+    """
+    POST/PATCH/DELETE ``<prefix>/bulk/`` taking a JSON list.
+
+    The whole list is validated with the serializer's BulkListSerializer and
+    written in one transaction, or not at all: on any invalid item the
+    response is a 400 whose ``errors`` list has one entry per item ({} for
+    valid ones). Follow-up work runs once per batch in the perform_bulk_* hooks.
+    """
+
+    def get_bulk_max_items(self):
+        return settings.BULK_MAX_ITEMS
+
+    @action(detail=False, methods=['post', 'patch', 'delete'], url_path='bulk')
+    def bulk(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return Response({
+                'status': False,
+                'message': 'Expected a list of items.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if len(request.data) > self.get_bulk_max_items():
+            return Response({
+                'status': False,
+                'message': f'At most {self.get_bulk_max_items()} items per request.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        if request.method == 'DELETE':
+            return self.bulk_destroy(request)
+
+        if request.method == 'PATCH':
+            uids = [item.get('uid') for item in request.data if isinstance(item, dict)]
+            instances = {str(obj.uid): obj for obj in self.get_queryset().filter(uid__in=valid_uuids(uids))}
+            serializer = self.get_serializer(instances, data=request.data, many=True, partial=True)
+        else:
+            serializer = self.get_serializer(data=request.data, many=True)
+
+        if not serializer.is_valid():
+            return Response({
+                'status': False,
+                'message': 'No items were saved.',
+                'errors': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            if request.method == 'PATCH':
+                self.perform_bulk_update(serializer)
+            else:
+                self.perform_bulk_create(serializer)
+
+        objs = serializer.instance
+        select, prefetch = serializer_lookups(self.get_serializer_class())
+        prefetch_related_objects(objs, *select, *prefetch)
+        created = request.method == 'POST'
+        return Response({
+            'status': True,
+            'message': f'{len(objs)} items {"created" if created else "updated"} successfully.',
+            'data': serializer.data
+        }, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+    def bulk_destroy(self, request):
+        uids = [item.get('uid') if isinstance(item, dict) else item for item in request.data]
+        found = {
+            str(uid) for uid in
+            self.get_queryset().filter(uid__in=valid_uuids(uids)).values_list('uid', flat=True)
+        }
+        errors = [{} if canonical_uid(uid) in found else {'uid': ['Not found.']} for uid in uids]
+        if any(errors):
+            return Response({
+                'status': False,
+                'message': 'No items were deleted.',
+                'errors': errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            self.perform_bulk_destroy(self.get_queryset().filter(uid__in=found))
+        return Response({
+            'status': True,
+            'message': f'{len(found)} items deleted successfully.'
+        }, status=status.HTTP_200_OK)
+
+    def perform_bulk_create(self, serializer):
+        serializer.save()
+
+    def perform_bulk_update(self, serializer):
+        serializer.save()
+
+    def perform_bulk_destroy(self, queryset):
+        queryset.delete()
+
+
+def valid_uuids(values):
+    """Drop values that are not UUIDs, so they show up as "not found"."""
+    uuids = []
+    for value in values:
+        try:
+            uuids.append(uuid.UUID(str(value)))
+        except ValueError:
+            pass
+    return uuids
+
+
+def canonical_uid(value):
+    """The canonical string of the UUID ``value`` (any case, hyphens or not), or None."""
+    uuids = valid_uuids([value])
+    return str(uuids[0]) if uuids else None
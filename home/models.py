@@ -1,6 +1,38 @@
 import uuid
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
+from django.utils.text import slugify
+from .caching import bump_owner_versions, owner_key
+
+class TitleSlugField(models.SlugField):
+    """
+    Slug derived from another field on every save. bulk_create calls pre_save
+    too; bulk_update does not, so bulk writers must call it themselves.
+    Slugs listed in ``reserved`` get a "-1" suffix.
+    """
+    non_db_attrs = models.SlugField.non_db_attrs + ('populate_from', 'reserved')
+
+    def __init__(self, *args, populate_from=None, reserved=(), **kwargs):
+        self.populate_from = populate_from
+        self.reserved = tuple(reserved)
+        kwargs.setdefault('editable', False)
+        kwargs.setdefault('blank', True)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['populate_from'] = self.populate_from
+        if self.reserved:
+            kwargs['reserved'] = self.reserved
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        value = slugify(getattr(model_instance, self.populate_from))[:self.max_length].strip('-')
+        if value in self.reserved:
+            value = f"{value}-1"
+        setattr(model_instance, self.attname, value)
+        return value
+
 
 class BaseModel(models.Model):
     uid = models.UUIDField(primary_key=True, editable=False, default=uuid.uuid4)
@@ -10,28 +42,237 @@ class BaseModel(models.Model):
     class Meta: 
         abstract = True
 
+
+class OwnerVersionedQuerySet(models.QuerySet):
+    """
+    Bulk writes send no signals: bulk_create(), update() (and so bulk_update())
+    and delete() bump the versions of the owners they touch themselves, so the
+    cached list and detail responses (home/caching.py) never outlive them.
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        bump_owner_versions(owner_key(obj.user_id, obj.session_key) for obj in objs)
+        return objs
+
+    def update(self, **kwargs):
+        if {'user', 'user_id', 'session_key'}.isdisjoint(kwargs):
+            owners = self.owners()
+            rows = super().update(**kwargs)
+        else:
+            # The rows may no longer match the filter once their owner changed.
+            with transaction.atomic(using=self.db):
+                pks = list(self.values_list('pk', flat=True))
+                owners = self.owners()
+                rows = super().update(**kwargs)
+                self.owners_changed(pks)
+            owners |= type(self)(self.model, using=self.db).filter(pk__in=pks).owners()
+        if rows:
+            bump_owner_versions(owners)
+        return rows
+
+    def delete(self):
+        owners = self.owners()
+        deleted = super().delete()
+        bump_owner_versions(owners)
+        return deleted
+
+    def owners_changed(self, pks):
+        """Called by update() with the primary keys of the rows given a new owner."""
+
+    def owners(self):
+        return {
+            owner_key(user_id, session_key)
+            for user_id, session_key in self.order_by().values_list('user_id', 'session_key').distinct()
+        }
+
+
+class TodoQuerySet(OwnerVersionedQuerySet):
+    def owners_changed(self, pks):
+        """
+        Timings and reminders follow their todos to a new owner, as they do on
+        save() (home/signals.py).
+        """
+        todo = Todo.objects.filter(uid=models.OuterRef('todo_id'))
+        for model in (TimingTodo, Reminder):
+            model.objects.filter(todo__in=pks).update(
+                user_id=models.Subquery(todo.values('user_id')[:1]),
+                session_key=models.Subquery(todo.values('session_key')[:1]),
+            )
+
+
 class Todo(BaseModel):
     user = models.ForeignKey(User, on_delete=models.CASCADE,null=True, blank=True, related_name='todos')
     session_key = models.CharField(max_length=40, null=True, blank=True)
     todo_title = models.CharField(max_length=100)
+    # Slugs share the detail route with the list routes' url_paths (TodoModelViewSet)
+    slug = TitleSlugField(max_length=120, populate_from='todo_title', reserved=('bulk', 'export'))
     todo_description = models.TextField()
     is_done = models.BooleanField(default=False)
 
+    objects = TodoQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Owner-scoped list: filter by owner, ordered by created_at with uid as
+            # tie-breaker so the keyset pagination walks the index directly
+            models.Index(fields=["user", "created_at", "uid"], name="todo_user_created_uid_idx"),
+            models.Index(fields=["session_key", "created_at", "uid"], name="todo_session_created_uid_idx"),
+            # Slug lookups are owner-scoped too
+            models.Index(fields=["user", "slug"], name="todo_user_slug_idx"),
+            models.Index(fields=["session_key", "slug"], name="todo_session_slug_idx"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Compared on save to carry an owner change over to timings and reminders
+        instance._loaded_owner = (instance.__dict__.get('user_id'), instance.__dict__.get('session_key'))
+        return instance
+
     def __str__(self):
         return f"{self.todo_title} - {self.user or self.session_key}"   
 
-class TimingTodo(BaseModel):
+
+def copy_todo_owners(objs):
+    """
+    Give the objects without an owner the owner of their todo: from the todo
+    when it is loaded, otherwise with one query for all of them.
+    """
+    missing = [obj for obj in objs if obj.user_id is None and obj.session_key is None]
+    unloaded = {obj.todo_id for obj in missing if not type(obj).todo.is_cached(obj)}
+    owners = {}
+    if unloaded:
+        owners = {
+            uid: (user_id, session_key)
+            for uid, user_id, session_key in Todo.objects.filter(uid__in=unloaded).values_list(
+                'uid', 'user_id', 'session_key'
+            )
+        }
+    for obj in missing:
+        if type(obj).todo.is_cached(obj):
+            obj.user_id, obj.session_key = obj.todo.user_id, obj.todo.session_key
+        else:
+            obj.user_id, obj.session_key = owners.get(obj.todo_id, (None, None))
+
+
+class TodoOwnedQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        copy_todo_owners(objs)
+        return super().bulk_create(objs, *args, **kwargs)
+
+
+class TimingTodoQuerySet(OwnerVersionedQuerySet, TodoOwnedQuerySet):
+    pass
+
+
+class TodoOwnedModel(BaseModel):
+    """
+    A row belonging to a todo, with a copy of the todo's owner so that owner
+    scoping and permission checks read this table alone. The owner is copied
+    by save() and bulk_create() when none is set, and follows the todo when
+    its owner changes through save() (home/signals.py) or Todo.objects.update().
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='+',
+                             db_index=False)  # covered by the owner indexes
+    session_key = models.CharField(max_length=40, null=True, blank=True)
+
+    objects = TodoOwnedQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        copy_todo_owners([self])
+        super().save(*args, **kwargs)
+
+
+class TimingTodo(TodoOwnedModel):
     todo = models.ForeignKey(Todo, on_delete=models.CASCADE, related_name='timingtodos')
     schedule_date = models.DateField(help_text="Date on which the todo is scheduled")
     start_time = models.TimeField(null=True, blank=True, help_text="When the task starts")
     end_time = models.TimeField(null=True, blank=True, help_text="When the task ends")
     note = models.TextField(null=True, blank=True, help_text="Optional notes about the timing")
 
-class Reminder(BaseModel):  # inherit BaseModel for UUID + timestamps consistency
-    todo = models.ForeignKey(Todo, on_delete=models.CASCADE, related_name='reminders')
+    objects = TimingTodoQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Timings of a todo filtered by schedule_date (timings list, nested timings)
+            models.Index(fields=["todo", "schedule_date"], name="timing_todo_schedule_idx"),
+            # Due window scan in mark_due_todos: schedule_date + start_time
+            models.Index(fields=["schedule_date", "start_time"], name="timing_due_idx"),
+            # Owner-scoped list, in keyset pagination order
+            models.Index(fields=["user", "created_at", "uid"], name="timing_user_created_uid_idx"),
+            models.Index(fields=["session_key", "created_at", "uid"], name="timing_session_created_uid_idx"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Compared by schedule_timings() to leave timings whose due instant did not change alone
+        instance._loaded_due = (instance.__dict__.get('schedule_date'), instance.__dict__.get('start_time'))
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        bump_owner_versions([owner_key(self.user_id, self.session_key)])
+
+    def delete(self, *args, **kwargs):
+        # An override rather than a post_delete receiver, which would cost the
+        # cascade from Todo its fast delete.
+        deleted = super().delete(*args, **kwargs)
+        bump_owner_versions([owner_key(self.user_id, self.session_key)])
+        return deleted
+
+class Reminder(TodoOwnedModel):  # inherit BaseModel for UUID + timestamps consistency
+    todo = models.ForeignKey(Todo, on_delete=models.CASCADE, related_name='reminders',
+                             db_index=False)  # covered by reminder_todo_created_uid_idx
+    timing = models.ForeignKey(TimingTodo, on_delete=models.CASCADE, null=True, blank=True, related_name='reminders', help_text="Timing this due reminder was created for")
+    due_at = models.DateTimeField(null=True, blank=True, help_text="When the timing is due")
     message = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     is_sent = models.BooleanField(default=False)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    # Delivery bookkeeping (home/delivery.py): a claimed reminder is leased to one
+    # dispatcher until lease_until; a failed one waits there for its retry, until
+    # it is out of attempts and given up at failed_at.
+    attempts = models.PositiveSmallIntegerField(default=0)
+    lease_token = models.CharField(max_length=32, null=True, blank=True)
+    lease_until = models.DateTimeField(null=True, blank=True)
+    failed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            # One due reminder per timing and due instant (mark_due_todos dedup)
+            models.UniqueConstraint(fields=["timing", "due_at"], name="reminder_timing_due_unique"),
+        ]
+        indexes = [
+            # Owner-scoped reads (export), oldest first
+            models.Index(fields=["user", "created_at", "uid"], name="reminder_user_created_uid_idx"),
+            models.Index(fields=["session_key", "created_at", "uid"], name="reminder_sess_created_uid_idx"),
+            # Reminders of a todo, in pagination order
+            models.Index(fields=["todo", "created_at", "uid"], name="reminder_todo_created_uid_idx"),
+            # Delivery queue: unsent reminders still to be attempted, oldest first
+            models.Index(fields=["created_at"], condition=models.Q(is_sent=False, failed_at__isnull=True),
+                         name="reminder_unsent_idx"),
+        ]
 
     def __str__(self):
-        return f"Reminder for {self.todo.todo_title}"        
\ No newline at end of file
+        return f"Reminder for {self.todo.todo_title}"        
+
+
+class DueTiming(models.Model):
+    """
+    Due index (home/scheduling.py): the instant a timing is due, and the
+    minute its due reminder is to be created, for timings still to come.
+    """
+    timing = models.OneToOneField(TimingTodo, on_delete=models.CASCADE, primary_key=True, related_name='due_entry')
+    due_at = models.DateTimeField()
+    bucket = models.DateTimeField(help_text="Minute at which the due reminder is created")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["bucket"], name="due_timing_bucket_idx"),
+        ]
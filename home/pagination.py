@@ -0,0 +1,153 @@
+from base64 import b64decode, b64encode
+from functools import reduce
+import json
+import operator
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Keyset pagination over a unique composite ordering (created_at, uid).
+
+    The cursor carries the full key of the boundary row, so every page is a
+    single indexed range query: no OFFSET and no COUNT(*), whatever the depth.
+    Rows created on the same day are ordered by uid, which keeps pages stable.
+    """
+    ordering = ('created_at', 'uid')
+    page_size = 5
+    page_size_query_param = 'limit'
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        return self.set_page([row async for row in self.page_queryset(queryset, request)])
+
+    def page_queryset(self, queryset, request):
+        """The rows of the requested page, plus one to tell whether there are more."""
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.request = request
+        self.fields = [queryset.model._meta.get_field(name) for name in self.ordering]
+
+        self.position, self.reverse = self.decode_cursor(request)
+        if self.position is not None:
+            queryset = queryset.filter(self.keyset_filter(self.position, self.reverse))
+
+        order = [f'-{name}' if self.reverse else name for name in self.ordering]
+        return queryset.order_by(*order)[:self.page_size + 1]
+
+    def set_page(self, rows):
+        has_more = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        if self.reverse:
+            self.page.reverse()
+
+        # Walking backwards from a cursor, there is always something after it.
+        self.has_next = has_more if not self.reverse else self.position is not None
+        self.has_previous = has_more if self.reverse else self.position is not None
+        return self.page
+
+    def keyset_filter(self, position, reverse):
+        """
+        Lexicographic "row after position" condition:
+        (a > x) OR (a = x AND b > y) for the ordering (a, b).
+        """
+        lookup = 'lt' if reverse else 'gt'
+        clauses = []
+        for i, field in enumerate(self.fields):
+            equal = {f.name: value for f, value in zip(self.fields[:i], position[:i])}
+            clauses.append(Q(**equal, **{f'{field.name}__{lookup}': position[i]}))
+        return reduce(operator.or_, clauses)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, row, reverse):
+        position = [self.position_value(row, field) for field in self.fields]
+        token = json.dumps({'p': position, 'r': int(reverse)}, separators=(',', ':'))
+        encoded = b64encode(token.encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def position_value(self, row, field):
+        """The cursor string of ``field`` for a model instance or a values() row."""
+        if not isinstance(row, dict):
+            return field.value_to_string(row)
+        value = row[field.attname]
+        return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+    def decode_cursor(self, request):
+        """
+        Return (position, reverse); an empty cursor starts from the first page.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            token = json.loads(b64decode(encoded.encode('ascii')).decode('ascii'))
+            position = [field.to_python(value) for field, value in zip(self.fields, token['p'], strict=True)]
+            if None in position:  # the ordering columns are not nullable
+                raise ValueError("Cursor position with a null value")
+            reverse = bool(token.get('r'))
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+
+class CustomPagination(LimitOffsetPagination):
+    """
+    Limit/offset pagination; passing ``?cursor=`` (empty for the first page)
+    switches the request to KeysetPagination instead.
+    """
+    default_limit = 5
+    max_limit = 100
+    cursor_query_param = 'cursor'
+    keyset_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.cursor_query_param in request.query_params:
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset() for async views, with the same page and links."""
+        self.keyset = None
+        if self.cursor_query_param in request.query_params:
+            self.keyset = self.keyset_class()
+            return await self.keyset.apaginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        self.count = await queryset.acount()
+        self.offset = self.get_offset(request)
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+        if self.count == 0 or self.offset > self.count:
+            return []
+        return [row async for row in queryset[self.offset:self.offset + self.limit]]
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def to_html(self):
+        if self.keyset is not None:
+            return self.keyset.to_html()
+        return super().to_html()
@@ -3,17 +3,12 @@ from rest_framework.permissions import BasePermission
 class IsOwnerOrSessionOwner(BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.user.is_authenticated:
-            return obj.user == request.user
+            return obj.user_id == request.user.pk
         session_key = request.session.session_key
-        return obj.session_key == session_key
+        return session_key is not None and obj.session_key == session_key
 
-class IsOwnerOfRelatedTodo(BasePermission):
+class IsOwnerOfRelatedTodo(IsOwnerOrSessionOwner):
     """
-    Allows access only if the request user/session owns the related Todo.
+    Allows access only if the request user/session owns the related Todo,
+    whose owner timings and reminders carry a copy of.
     """
-    def has_object_permission(self, request, view, obj):
-        todo = obj.todo
-        if request.user.is_authenticated:
-            return todo.user == request.user
-        session_key = request.session.session_key
-        return todo.session_key == session_key
\ No newline at end of file
@@ -0,0 +1,124 @@
+"""
+Retention of the Reminder table.
+
+ReminderArchiver moves the reminders matched by a retention policy out of the
+table, into gzip-compressed NDJSON segments under REMINDER_ARCHIVE_DIR:
+
+- sent reminders, REMINDER_RETENTION_SENT_DAYS days after they were sent;
+- any reminder, REMINDER_RETENTION_MAX_DAYS days after it was created (unsent
+  ones included, such as those out of delivery attempts), unless a dispatcher
+  holds its lease.
+
+A policy set to 0 is off. Rows are walked by primary key in chunks of
+REMINDER_RETENTION_BATCH_SIZE, each archived in its own short transaction, so
+writers wait for one chunk at most: the rows of the chunk still matching the
+policy are read under lock (row locks where the database has them, the write
+lock of the IMMEDIATE transaction on SQLite), appended to the run's segment as
+one gzip member, synced to disk, then deleted. A crash before the commit
+leaves the chunk in the table, to be archived again by the next run: readers
+of the archive should keep one line per uid.
+"""
+import gzip
+import json
+import logging
+import os
+import time
+import uuid
+from datetime import timedelta
+from pathlib import Path
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from prometheus_client import Counter
+from .models import Reminder
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FIELDS = (
+    'uid', 'todo_id', 'timing_id', 'user_id', 'session_key', 'message', 'due_at',
+    'created_at', 'is_sent', 'sent_at', 'attempts', 'failed_at',
+)
+
+reminders_archived_total = Counter(
+    "todo_reminders_archived_total",
+    "Reminders moved from the table to the archive by the retention job",
+)
+
+
+class ReminderArchiver:
+    def __init__(self, directory=None, batch_size=None, sent_days=None, max_days=None, pause=None):
+        self.directory = Path(directory or settings.REMINDER_ARCHIVE_DIR)
+        self.batch_size = batch_size or settings.REMINDER_RETENTION_BATCH_SIZE
+        self.sent_days = settings.REMINDER_RETENTION_SENT_DAYS if sent_days is None else sent_days
+        self.max_days = settings.REMINDER_RETENTION_MAX_DAYS if max_days is None else max_days
+        self.pause = settings.REMINDER_RETENTION_PAUSE if pause is None else pause
+        self.segment = None
+        self.archived = 0
+
+    def policy(self, now):
+        """Q matching the reminders to archive at ``now``, or None with every policy off."""
+        policies = []
+        if self.sent_days:
+            policies.append(Q(is_sent=True, sent_at__lt=now - timedelta(days=self.sent_days)))
+        if self.max_days:
+            policies.append(Q(created_at__lt=now - timedelta(days=self.max_days)) & ~Q(lease_until__gt=now))
+        if not policies:
+            return None
+        return policies[0] if len(policies) == 1 else policies[0] | policies[1]
+
+    def run(self, now=None):
+        """Archive every reminder matched at ``now``; returns the number archived and the rate."""
+        now = now or timezone.now()
+        start = time.perf_counter()
+        policy = self.policy(now)
+        if policy is not None:
+            uids = Reminder.objects.filter(policy).order_by('uid').values_list('uid', flat=True)
+            last = None
+            while True:
+                chunk = list((uids if last is None else uids.filter(uid__gt=last))[:self.batch_size])
+                if not chunk:
+                    break
+                self.archive(chunk, policy, now)
+                last = chunk[-1]
+                if self.pause and len(chunk) == self.batch_size:
+                    time.sleep(self.pause)
+        elapsed = time.perf_counter() - start
+        rate = self.archived / elapsed if elapsed else 0.0
+        if self.archived:
+            logger.info(f"{self.archived} reminders archived to {self.segment} in {elapsed:.2f}s "
+                        f"({rate:,.0f} rows/s)")
+        return {"archived": self.archived, "seconds": elapsed, "rows_per_second": rate,
+                "segment": str(self.segment) if self.segment else None}
+
+    def archive(self, uids, policy, now):
+        """Move the reminders of ``uids`` still matching ``policy`` to the segment."""
+        matching = Reminder.objects.filter(policy, uid__in=uids)
+        with transaction.atomic():
+            rows = matching.order_by('uid')
+            if connection.features.has_select_for_update:
+                rows = rows.select_for_update()
+            rows = list(rows.values(*ARCHIVE_FIELDS))
+            if not rows:
+                return
+            if self.segment is None:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                self.segment = self.directory / f"reminders-{now:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}.ndjson.gz"
+            lines = b"".join(json.dumps(row, cls=DjangoJSONEncoder).encode() + b"\n" for row in rows)
+            with open(self.segment, 'ab') as file:
+                with gzip.GzipFile(fileobj=file, mode='ab') as member:
+                    member.write(lines)
+                file.flush()
+                os.fsync(file.fileno())
+            _, deleted = matching.filter(uid__in=[row['uid'] for row in rows]).delete()
+        deleted = deleted.get(Reminder._meta.label, 0)
+        self.archived += deleted
+        reminders_archived_total.inc(deleted)
+
+
+def read_archive(path):
+    """The reminders of an archive segment, as dicts of JSON values."""
+    with gzip.open(path, 'rt', encoding='utf-8') as file:
+        for line in file:
+            yield json.loads(line)
@@ -0,0 +1,70 @@
+"""
+Event-driven scheduling of due reminders.
+
+Writing a timing through the API or the importer records in DueTiming when the
+timing is due and the minute ("bucket") at which its due reminder is to be
+created: REMINDER_LEAD before, or right away when that is already past.
+fire_due_reminders runs every minute and reads only the buckets that are due,
+so a reminder is created within a minute of its time whatever the size of
+TimingTodo. Rescheduling a timing replaces its entry and drops its unsent due
+reminders; deleting it cascades to both.
+
+Writes that bypass these paths (queryset updates, bare bulk_create) are still
+caught by mark_due_todos, kept on beat as a safety net.
+"""
+import datetime
+from django.db import transaction
+from django.utils import timezone
+from .models import DueTiming, Reminder, TimingTodo
+
+# Reminders are created this long before a timing is due
+REMINDER_LEAD = datetime.timedelta(minutes=15)
+
+
+def due_at(schedule_date, start_time, tz=None):
+    """Aware datetime at which a timing is due (schedule_date + start_time, local time)."""
+    return datetime.datetime.combine(schedule_date, start_time, tzinfo=tz or timezone.get_current_timezone())
+
+
+def fire_bucket(due, now):
+    """Minute at which the reminder of a timing due at ``due`` is created."""
+    return max(due - REMINDER_LEAD, now).replace(second=0, microsecond=0)
+
+
+def schedule_timings(timings, now=None):
+    """
+    (Re)schedule the due reminders of ``timings``, just written. Timings read
+    from the database whose date and start time did not change are left alone.
+    """
+    date_field = TimingTodo._meta.get_field('schedule_date')
+    time_field = TimingTodo._meta.get_field('start_time')
+    changed, existing = [], []
+    for timing in timings:
+        due = (date_field.to_python(timing.schedule_date), time_field.to_python(timing.start_time))
+        loaded = getattr(timing, '_loaded_due', None)
+        if loaded == due:
+            continue
+        if loaded is not None:
+            existing.append(timing.pk)
+        timing._loaded_due = due
+        changed.append(timing)
+    if not changed:
+        return
+
+    now = now or timezone.now()
+    tz = timezone.get_current_timezone()
+    entries = []
+    for timing in changed:
+        schedule_date, start_time = timing._loaded_due
+        if start_time is None:
+            continue
+        due = due_at(schedule_date, start_time, tz)
+        if due >= now:
+            entries.append(DueTiming(timing_id=timing.pk, due_at=due, bucket=fire_bucket(due, now)))
+
+    with transaction.atomic():
+        if existing:
+            DueTiming.objects.filter(timing_id__in=existing).delete()
+            # Created for a due instant the timing no longer has
+            Reminder.objects.filter(timing_id__in=existing, is_sent=False).delete()
+        DueTiming.objects.bulk_create(entries)
@@ -0,0 +1,195 @@
+"""
+Full-text search for todos and timings.
+
+On SQLite every searchable table gets an FTS5 index kept in sync by triggers,
+so bulk_create/bulk_update/queryset.update() are indexed too. Other databases
+fall back to DRF's ``SearchFilter`` (icontains).
+"""
+import logging
+from django.db import connections
+from rest_framework import filters
+
+logger = logging.getLogger(__name__)
+
+
+class SearchIndex:
+    """
+    An FTS5 index over some text columns of a content table.
+
+    The index stores its own copy of the text, keyed by a companion table that
+    gives every content row a stable integer id: the implicit rowid of the
+    UUID-keyed content tables is not stable (VACUUM and Django's table rebuilds
+    may renumber it), so the index never refers to it.
+    """
+
+    def __init__(self, content_table, columns, rank=None):
+        self.content_table = content_table
+        self.columns = columns
+        self.rank = rank
+        self.name = f"{content_table}_fts"
+        self.keys = f"{self.name}_keys"
+
+    def triggers(self):
+        cols = ", ".join(self.columns)
+        new = ", ".join(f"new.{col}" for col in self.columns)
+        assign = ", ".join(f"{col} = new.{col}" for col in self.columns)
+        key = f"(SELECT id FROM {self.keys} WHERE uid = %s.uid)"
+        insert = (
+            f"INSERT INTO {self.keys}(uid) VALUES (new.uid); "
+            f"INSERT INTO {self.name}(rowid, {cols}) VALUES ({key % 'new'}, {new});"
+        )
+        delete = (
+            f"DELETE FROM {self.name} WHERE rowid = {key % 'old'}; "
+            f"DELETE FROM {self.keys} WHERE uid = old.uid;"
+        )
+        update = f"UPDATE {self.name} SET {assign} WHERE rowid = {key % 'new'};"
+        return {
+            f"{self.name}_ai": f"AFTER INSERT ON {self.content_table} BEGIN {insert} END",
+            f"{self.name}_ad": f"AFTER DELETE ON {self.content_table} BEGIN {delete} END",
+            f"{self.name}_au": f"AFTER UPDATE OF {cols} ON {self.content_table} BEGIN {update} END",
+        }
+
+    def install(self, cursor):
+        """
+        Create the index and its triggers if missing. Django rebuilds SQLite
+        tables on some schema changes, which drops the triggers, so rows
+        written before they are reinstalled are missing from the index: a
+        missing trigger also triggers a full rebuild.
+        """
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS {self.keys} (id INTEGER PRIMARY KEY, uid TEXT NOT NULL UNIQUE)")
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.name} USING fts5("
+            f"{', '.join(self.columns)}, tokenize='unicode61 remove_diacritics 2')"
+        )
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = %s", [self.content_table]
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        missing = {name: body for name, body in self.triggers().items() if name not in existing}
+        for name, body in missing.items():
+            cursor.execute(f"CREATE TRIGGER {name} {body}")
+        if self.rank:
+            cursor.execute(f"INSERT INTO {self.name}({self.name}, rank) VALUES ('rank', %s)", [self.rank])
+        if missing:
+            self.rebuild(cursor)
+
+    def rebuild(self, cursor):
+        cols = ", ".join(self.columns)
+        cursor.execute(f"DELETE FROM {self.name}")
+        cursor.execute(f"DELETE FROM {self.keys}")
+        cursor.execute(f"INSERT INTO {self.keys}(uid) SELECT uid FROM {self.content_table}")
+        cursor.execute(
+            f"INSERT INTO {self.name}(rowid, {cols}) "
+            f"SELECT k.id, {', '.join(f'c.{col}' for col in self.columns)} "
+            f"FROM {self.content_table} c JOIN {self.keys} k ON k.uid = c.uid"
+        )
+        logger.info(f"Rebuilt search index {self.name}")
+
+    def uninstall(self, cursor):
+        for name in self.triggers():
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute(f"DROP TABLE IF EXISTS {self.name}")
+        cursor.execute(f"DROP TABLE IF EXISTS {self.keys}")
+
+    def search(self, queryset, query):
+        """
+        Narrow ``queryset`` to the rows matching ``query``, annotated with their
+        BM25 ``search_rank`` (lower is better). The index is joined once, so the
+        MATCH runs a single time for the whole query.
+        """
+        return queryset.extra(
+            select={"search_rank": f"{self.name}.rank"},
+            tables=[self.keys, self.name],
+            where=[
+                f"{self.keys}.uid = {self.content_table}.uid",
+                f"{self.name}.rowid = {self.keys}.id",
+                f"{self.name} MATCH %s",
+            ],
+            params=[query],
+        )
+
+
+# Title hits weigh ten times more than description hits.
+SEARCH_INDEXES = {
+    index.content_table: index
+    for index in [
+        SearchIndex("home_todo", ["todo_title", "todo_description"], rank="bm25(10.0, 1.0)"),
+        SearchIndex("home_timingtodo", ["note"]),
+    ]
+}
+
+_available = {}
+
+
+def install_search_indexes(connection):
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for index in SEARCH_INDEXES.values():
+            index.install(cursor)
+    _available.pop(connection.alias, None)
+
+
+def repair_search_indexes(connection):
+    """Reinstall triggers of existing indexes after migrations rebuilt their tables."""
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE %s", ["%_fts%"])
+        existing = {row[0] for row in cursor.fetchall()}
+        for index in SEARCH_INDEXES.values():
+            if {index.name, index.keys} <= existing:
+                index.install(cursor)
+    _available.pop(connection.alias, None)
+
+
+def uninstall_search_indexes(connection):
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for index in SEARCH_INDEXES.values():
+            index.uninstall(cursor)
+    _available.pop(connection.alias, None)
+
+
+def get_search_index(model, using="default"):
+    """The FTS index for ``model`` on the given database, or None if unavailable."""
+    index = SEARCH_INDEXES.get(model._meta.db_table)
+    connection = connections[using]
+    if index is None or connection.vendor != "sqlite":
+        return None
+    if using not in _available:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE %s", ["%_fts%"])
+            _available[using] = {row[0] for row in cursor.fetchall()}
+    return index if {index.name, index.keys} <= _available[using] else None
+
+
+def fts_query(terms):
+    """
+    Quote every term so user input cannot inject FTS5 syntax; each term is a
+    prefix match and all terms must match, like SearchFilter's AND semantics.
+    """
+    return " ".join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    ``?search=`` backed by the FTS5 index, ranked by relevance.
+
+    It only narrows the owner-scoped queryset it is given, so ownership is
+    preserved. Place it after OrderingFilter: results are ranked unless the
+    client asks for an explicit ``?ordering=``.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        index = get_search_index(queryset.model, queryset.db)
+        if not terms or index is None:
+            return super().filter_queryset(request, queryset, view)
+
+        query = fts_query(terms)
+        queryset = index.search(queryset, query)
+        if not request.query_params.get(filters.OrderingFilter.ordering_param):
+            queryset = queryset.order_by("search_rank", *queryset.query.order_by)
+        return queryset
@@ -1,40 +1,91 @@
-from django.template.defaultfilters import slugify
 from django.contrib.auth.models import User
 from rest_framework import serializers
 from .models import Todo, TimingTodo, Reminder
+from .fast_serializers import FastSerializer
+from .mixins import canonical_uid
+from .instrumentation import TimedDataMixin
 import re
 
-class TimingTodoSerializer(serializers.ModelSerializer):
+
+class TimedListSerializer(TimedDataMixin, serializers.ListSerializer):
+    pass
+
+
+class BulkListSerializer(TimedListSerializer):
+    """
+    List serializer writing a whole batch with bulk_create/bulk_update.
+
+    For updates ``instance`` is a dict of uid -> object; each item is validated
+    against the object named by its ``uid``, and unknown uids are reported as
+    item errors alongside the field errors.
+    """
+
+    def run_child_validation(self, data):
+        if self.instance is not None:
+            instance = self.instance.get(canonical_uid(data.get('uid')) if isinstance(data, dict) else None)
+            if instance is None:
+                raise serializers.ValidationError({'uid': ['Not found.']})
+            self.child.instance = instance
+            self.child.initial_data = data
+        return super().run_child_validation(data)
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        objs = [model(**attrs) for attrs in validated_data]
+        return model.objects.bulk_create(objs)
+
+    def update(self, instances, validated_data):
+        model = self.child.Meta.model
+        # Fields whose value pre_save() computes: timestamps and derived slugs
+        computed = [
+            f for f in model._meta.concrete_fields
+            if getattr(f, 'auto_now', False) or getattr(f, 'populate_from', None)
+        ]
+        objs, fields = [], set()
+        for item, attrs in zip(self.initial_data, validated_data):
+            obj = instances[canonical_uid(item['uid'])]
+            for field, value in attrs.items():
+                setattr(obj, field, value)
+            for field in computed:  # bulk_update skips pre_save()
+                field.pre_save(obj, add=False)
+            fields.update(attrs)
+            objs.append(obj)
+        fields.update(f.name for f in computed)
+        if fields:
+            model.objects.bulk_update(objs, fields)
+        return objs
+
+
+class TimingTodoSerializer(TimedDataMixin, serializers.ModelSerializer):
     class Meta:
         model = TimingTodo
-        fields = '__all__'
+        exclude = ['user', 'session_key']  # copied from the todo
+        list_serializer_class = BulkListSerializer
 
     def validate_todo(self, value):
         request = self.context['request']
         if request.user.is_authenticated:
-            if value.user != request.user:
+            if value.user_id != request.user.pk:
                 raise serializers.ValidationError("You do not own this todo.")
         else:
-            session_key = request.session.session_key or request.session.save()
-            if value.session_key != request.session.session_key:
+            # A request without a session cannot own anything: don't create one here
+            session_key = request.session.session_key
+            if not session_key or value.session_key != session_key:
                 raise serializers.ValidationError("You do not own this todo.")
         return value
         
 
-class TodoSerializer(serializers.ModelSerializer):  
+class TodoSerializer(TimedDataMixin, serializers.ModelSerializer):  
     timingtodos = TimingTodoSerializer(many=True, read_only=True)
-    slug = serializers.SerializerMethodField()
 
     class Meta:
         model = Todo
         fields = ['user', 'uid', 'todo_title', 'slug', 'todo_description', 'is_done', 'timingtodos'] # includes some necessary model fields: title, description etc that is required by client or developer.
-        read_only_fields = ['user', 'session_key']
+        read_only_fields = ['user', 'session_key', 'slug']
+        list_serializer_class = BulkListSerializer
 #       exclude = ['created_at'] #when you have more fields supose 100 and one field don't want to show but others want to show than have to use exclude just to write which fields you don't want to show.
 #       fields = '__all__'  # includes all model fields: uid, title, etc.
 
-    def get_slug(self, obj):
-        return slugify(obj.todo_title) # can return anything like a name "proma" or none.
-
     def validate_todo_title(self, data):
         # Check if value exists (can skip this; DRF already handles required=True)
         if data:
@@ -49,7 +100,48 @@ class TodoSerializer(serializers.ModelSerializer):
 
         return data
 
-class ReminderSerializer(serializers.ModelSerializer):
+
+class TimingTodoImportSerializer(TimingTodoSerializer):
+    """A timing nested in an imported todo: its todo is the one being imported."""
+
+    class Meta(TimingTodoSerializer.Meta):
+        exclude = None
+        fields = ['schedule_date', 'start_time', 'end_time', 'note']
+
+
+class TodoImportSerializer(TodoSerializer):
+    """One line of an import file: the fields of a new todo, with optional timings."""
+    timingtodos = TimingTodoImportSerializer(many=True, required=False)
+
+
+class ReminderSerializer(TimedDataMixin, serializers.ModelSerializer):
     class Meta:
         model = Reminder
-        fields = ['uid', 'todo', 'message', 'created_at', 'is_sent']
\ No newline at end of file
+        fields = ['uid', 'todo', 'message', 'created_at', 'is_sent']
+        list_serializer_class = TimedListSerializer
+
+
+class TodoExportSerializer(TodoSerializer):
+    """A todo with its timings and reminders, as written by the export action."""
+    reminders = ReminderSerializer(many=True, read_only=True)
+
+    class Meta(TodoSerializer.Meta):
+        fields = TodoSerializer.Meta.fields + ['reminders']
+
+
+class FastTimingTodoSerializer(FastSerializer):
+    serializer_class = TimingTodoSerializer
+
+
+class FastTodoSerializer(FastSerializer):
+    serializer_class = TodoSerializer
+    nested = {'timingtodos': FastTimingTodoSerializer}
+
+
+class FastReminderSerializer(FastSerializer):
+    serializer_class = ReminderSerializer
+
+
+class FastTodoExportSerializer(FastSerializer):
+    serializer_class = TodoExportSerializer
+    nested = {'timingtodos': FastTimingTodoSerializer, 'reminders': FastReminderSerializer}
@@ -0,0 +1,41 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .caching import bump_owner_versions, owner_key
+from .models import Todo, TimingTodo, Reminder
+from .scheduling import schedule_timings
+
+
+@receiver(post_save, sender=Todo)
+@receiver(post_delete, sender=Todo)
+def bump_todo_owner(sender, instance, **kwargs):
+    """
+    Writes made outside the API and the tasks (admin, shell) still invalidate
+    the owner's cached responses. Timings bump from TimingTodo.save()/delete()
+    instead of receivers, so their cascade deletes keep Django's fast path.
+    """
+    bump_owner_versions([owner_key(instance.user_id, instance.session_key)])
+
+
+@receiver(post_save, sender=Todo)
+def move_todo_children(sender, instance, created, **kwargs):
+    """
+    Timings and reminders follow their todo to a new owner. The owner the todo
+    was loaded (Todo.from_db) or last saved with tells whether it moved; a todo
+    built in memory for an existing row has no known owner and is skipped.
+    Todo.objects.update() moves them too (TodoQuerySet).
+    """
+    loaded = getattr(instance, '_loaded_owner', None)
+    owner = (instance.user_id, instance.session_key)
+    instance._loaded_owner = owner
+    if created or loaded is None or loaded == owner:
+        return
+    for model in (TimingTodo, Reminder):
+        model.objects.filter(todo=instance).update(user_id=instance.user_id, session_key=instance.session_key)
+    bump_owner_versions([owner_key(*loaded)])
+
+
+@receiver(post_save, sender=TimingTodo)
+def schedule_timing(sender, instance, raw=False, **kwargs):
+    """Creating or moving a timing (re)schedules its due reminder."""
+    if not raw:
+        schedule_timings([instance])
@@ -1,8 +1,19 @@
+from functools import reduce
+import operator
 from celery import shared_task
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
 from django.utils import timezone
 from django.apps import apps
 import logging
-from prometheus_client import Counter
+from prometheus_client import Counter, Histogram
+from .batching import ReminderBatcher
+from .caching import bump_owner_versions, owner_key
+from .delivery import ReminderDispatcher
+from .exports import chunked
+from .retention import ReminderArchiver
+from .scheduling import REMINDER_LEAD, due_at
 
 logger = logging.getLogger(__name__)
 
@@ -10,6 +21,12 @@ logger = logging.getLogger(__name__)
 Todo = apps.get_model('home', 'Todo')
 TimingTodo = apps.get_model('home', 'TimingTodo')
 Reminder = apps.get_model('home', 'Reminder')
+DueTiming = apps.get_model('home', 'DueTiming')
+
+BULK_BATCH_SIZE = 1000
+# Due index entries deleted per statement: SQLite caps the depth of an
+# expression at 1000, and each entry adds one OR term.
+DUE_DELETE_CHUNK_SIZE = 100
 
 # Prometheus metrics
 reminders_created_total = Counter(
@@ -27,6 +44,13 @@ new_due_reminders_total = Counter(
     "Total number of new reminders created for due todos"
 )
 
+reminder_batch_size = Histogram(
+    "todo_reminder_batch_size",
+    "Number of items handled by one run of a batch reminder task",
+    ["task"],
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 50000),
+)
+
 
 @shared_task(bind=True, autoretry_for=(Exception,), retry_backoff=True, max_retries=3)
 def create_todo_reminder(self, todo_uid):
@@ -41,6 +65,7 @@ def create_todo_reminder(self, todo_uid):
             message=f"Background reminder: Todo '{todo.todo_title}' created"
         )
         logger.info(f"Reminder created for Todo {todo_uid}: {reminder.message}")
+        bump_owner_versions([owner_key(todo.user_id, todo.session_key)])
 
         # Increment Prometheus metric
         reminders_created_total.inc()
@@ -55,40 +80,212 @@ def create_todo_reminder(self, todo_uid):
         raise  # retried because of autoretry_for
 
 
+@shared_task(bind=True, autoretry_for=(Exception,), retry_backoff=True, max_retries=3)
+def create_todo_reminders(self, todo_uids):
+    """
+    Batch variant of create_todo_reminder: one Todo fetch and one bulk_create
+    for a whole batch of reminder requests. Each requested uid gets its own
+    reminder, like one create_todo_reminder task per uid would.
+    """
+    todos = Todo.objects.filter(uid__in=set(todo_uids)).values('uid', 'todo_title', 'user_id', 'session_key')
+    found = {str(todo['uid']): todo for todo in todos}
+    owners = {owner_key(todo['user_id'], todo['session_key']) for todo in found.values()}
+    reminders = [
+        Reminder(todo_id=uid, user_id=found[uid]['user_id'], session_key=found[uid]['session_key'],
+                 message=f"Background reminder: Todo '{found[uid]['todo_title']}' created")
+        for uid in map(str, todo_uids) if uid in found
+    ]
+    Reminder.objects.bulk_create(reminders, batch_size=BULK_BATCH_SIZE)
+    bump_owner_versions(owners)
+
+    missing = sorted({str(uid) for uid in todo_uids} - found.keys())
+    if missing:
+        logger.warning(f"Todos {missing} not found. Skipping their reminders.")
+    logger.info(f"{len(reminders)} reminders created for a batch of {len(todo_uids)} requests")
+
+    reminders_created_total.inc(len(reminders))
+    reminder_batch_size.labels(task=self.name).observe(len(todo_uids))
+    return {"status": "success", "created_count": len(reminders), "missing": missing}
+
+
+_reminder_batcher = None
+
+
+def enqueue_todo_reminder(todo_uid):
+    """
+    Request a creation reminder for a todo.
+
+    With REMINDER_BATCH_SIZE > 1 requests are buffered and sent as one
+    create_todo_reminders task per batch (by count or REMINDER_BATCH_WINDOW
+    seconds); otherwise each request is its own create_todo_reminder task.
+    """
+    global _reminder_batcher
+    if settings.REMINDER_BATCH_SIZE <= 1:
+        create_todo_reminder.delay(str(todo_uid))
+        return
+    if _reminder_batcher is None:
+        _reminder_batcher = ReminderBatcher(
+            create_todo_reminders.delay,
+            max_size=settings.REMINDER_BATCH_SIZE,
+            max_wait=settings.REMINDER_BATCH_WINDOW,
+        )
+    _reminder_batcher.add(todo_uid)
+
+
+def due_window(window_start, window_end):
+    """
+    Q matching timings whose schedule_date + start_time falls within
+    [window_start, window_end], in the project's local time zone. A window
+    crossing midnight is split per schedule_date, so every branch is a range
+    on the (schedule_date, start_time) index.
+    """
+    start, end = timezone.localtime(window_start), timezone.localtime(window_end)
+    if start.date() == end.date():
+        return Q(schedule_date=start.date(), start_time__gte=start.time(), start_time__lte=end.time())
+    window = Q(schedule_date=start.date(), start_time__gte=start.time())
+    window |= Q(schedule_date__gt=start.date(), schedule_date__lt=end.date(), start_time__isnull=False)
+    window |= Q(schedule_date=end.date(), start_time__lte=end.time())
+    return window
+
+
 @shared_task(bind=True)
 def mark_due_todos(self):
     """
     Periodically check for TimingTodos due in next 15 minutes
     and create reminders for them.
+
+    Safety net for fire_due_reminders, which creates the reminders of the
+    timings written through the API and the importer on time: this scan
+    catches timings written any other way.
+
+    One query selects the due timings with their todo title and whether a
+    reminder already exists for them in this window; the missing reminders
+    are inserted with a single bulk_create. The (timing, due_at) unique
+    constraint makes concurrent runs safe.
     """
-    now = timezone.now()
-    window_start = now
-    window_end = now + timezone.timedelta(minutes=15)
+    window_start = timezone.now()
+    window_end = window_start + REMINDER_LEAD
 
-    upcoming = TimingTodo.objects.filter(
-        start_time__gte=window_start,
-        start_time__lte=window_end
+    already_reminded = Reminder.objects.filter(
+        timing=OuterRef('pk'),
+        due_at__gte=window_start,
+        due_at__lte=window_end,
+    )
+    upcoming = (
+        TimingTodo.objects
+        .filter(due_window(window_start, window_end))
+        .annotate(reminded=Exists(already_reminded))
+        .values('uid', 'todo_id', 'todo__todo_title', 'user_id', 'session_key',
+                'schedule_date', 'start_time', 'reminded')
     )
 
-    # Increment metric for checked todos
-    due_todos_checked_total.inc(upcoming.count())
-
-    logger.info(f"Checking {upcoming.count()} upcoming todos between {window_start} and {window_end}")
+    tz = timezone.get_current_timezone()
+    reminders = []
+    owners = set()
+    checked = 0
+    for timing in upcoming.iterator(chunk_size=BULK_BATCH_SIZE):
+        checked += 1
+        if timing['reminded']:
+            continue
+        owners.add(owner_key(timing['user_id'], timing['session_key']))
+        reminders.append(Reminder(
+            todo_id=timing['todo_id'],
+            timing_id=timing['uid'],
+            user_id=timing['user_id'],
+            session_key=timing['session_key'],
+            due_at=due_at(timing['schedule_date'], timing['start_time'], tz),
+            message=f"Your task '{timing['todo__todo_title']}' is due at {timing['start_time']}",
+        ))
 
-    created_reminders = []
-    for timing in upcoming:
-        reminder, created = Reminder.objects.get_or_create(
-            todo=timing.todo,
-            message=f"Your task '{timing.todo.todo_title}' is due at {timing.start_time}"
+    # ignore_conflicts drops the reminders a concurrent run inserted first and
+    # does not say which, so count the window's reminders around the insert.
+    created = 0
+    if reminders:
+        in_window = Reminder.objects.filter(
+            timing__isnull=False, due_at__gte=window_start, due_at__lte=window_end,
         )
-        if created:
-            created_reminders.append(reminder.uid)
-            # Increment metric for new reminders
-            new_due_reminders_total.inc()
+        before = in_window.count()
+        Reminder.objects.bulk_create(reminders, batch_size=BULK_BATCH_SIZE, ignore_conflicts=True)
+        created = in_window.count() - before
+        bump_owner_versions(owners)
 
-    logger.info(f"{len(created_reminders)} new reminders created.")
+    due_todos_checked_total.inc(checked)
+    reminder_batch_size.labels(task=self.name).observe(checked)
+    new_due_reminders_total.inc(created)
+    logger.info(f"Checked {checked} upcoming todos between {window_start} and {window_end}, "
+                f"{created} new reminders created.")
     return {
         "status": "success",
-        "new_reminders_count": len(created_reminders),
-        "reminder_uids": created_reminders
+        "checked_count": checked,
+        "new_reminders_count": created,
     }
+
+
+@shared_task(bind=True)
+def fire_due_reminders(self):
+    """
+    Create the due reminders of the due index buckets that are due (see
+    home/scheduling.py) and drop their entries. Entries of timings already
+    past due are dropped without a reminder.
+    """
+    now = timezone.now()
+    due = (
+        DueTiming.objects.filter(bucket__lte=now)
+        .order_by('bucket')
+        .values('timing_id', 'due_at', 'bucket', 'timing__todo_id', 'timing__todo__todo_title',
+                'timing__user_id', 'timing__session_key', 'timing__start_time')
+    )
+    fired = created = 0
+    owners = set()
+    while entries := list(due[:BULK_BATCH_SIZE]):
+        reminders = [
+            Reminder(
+                todo_id=entry['timing__todo_id'],
+                timing_id=entry['timing_id'],
+                user_id=entry['timing__user_id'],
+                session_key=entry['timing__session_key'],
+                due_at=entry['due_at'],
+                message=f"Your task '{entry['timing__todo__todo_title']}' is due at {entry['timing__start_time']}",
+            )
+            for entry in entries if entry['due_at'] >= now
+        ]
+        with transaction.atomic():
+            if reminders:
+                # ignore_conflicts does not say which rows it dropped: count around the insert
+                fired_timings = Reminder.objects.filter(timing_id__in=[r.timing_id for r in reminders])
+                before = fired_timings.count()
+                Reminder.objects.bulk_create(reminders, ignore_conflicts=True)
+                created += fired_timings.count() - before
+            # Only the entries as read: those rescheduled meanwhile stay, to fire again
+            for chunk in chunked(entries, DUE_DELETE_CHUNK_SIZE):
+                DueTiming.objects.filter(reduce(operator.or_, (
+                    Q(timing_id=entry['timing_id'], due_at=entry['due_at'], bucket=entry['bucket']) for entry in chunk
+                ))).delete()
+        owners.update(owner_key(r.user_id, r.session_key) for r in reminders)
+        fired += len(entries)
+    bump_owner_versions(owners)
+
+    reminder_batch_size.labels(task=self.name).observe(fired)
+    new_due_reminders_total.inc(created)
+    if fired:
+        logger.info(f"Fired {fired} due index entries, {created} reminders created.")
+    return {"status": "success", "fired_count": fired, "new_reminders_count": created}
+
+
+@shared_task(bind=True)
+def deliver_reminders(self):
+    """
+    Send the unsent reminders through the delivery backend, batch after batch
+    until the queue is drained (see home/delivery.py).
+    """
+    totals = ReminderDispatcher().drain()
+    if totals['sent'] or totals['failed']:
+        logger.info(f"{totals['sent']} reminders delivered, {totals['failed']} failed, "
+                    f"in {totals['batches']} batches.")
+    return {"status": "success", **totals}
+
+
+@shared_task(bind=True)
+def archive_reminders(self):
+    """Move the reminders past their retention to the archive (see home/retention.py)."""
+    return {"status": "success", **ReminderArchiver().run()}
@@ -1,3 +1,1384 @@
-from django.test import TestCase
+import base64
+import datetime
+import csv
+import importlib
+import io
+import json
+import os
+import pstats
+import tempfile
+import time
+import uuid
+from unittest import mock
+from asgiref.sync import sync_to_async
+from celery.app.task import Context
+from django.apps import apps as django_apps
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.cache.backends.redis import RedisCache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Q, Value
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from prometheus_client import REGISTRY
+from rest_framework.authtoken.models import Token
+from rest_framework.throttling import SimpleRateThrottle
+from .models import Todo, TimingTodo, Reminder, DueTiming
+from .batching import ReminderBatcher
+from .metrics import _queue_wait
+from .throttling import RedisBucketStore, bucket_store
+from .instrumentation import REQUEST_DB_QUERIES
+from .delivery import ReminderDispatcher
+from .retention import ReminderArchiver, read_archive
+from .tasks import (
+    archive_reminders, mark_due_todos, create_todo_reminders, deliver_reminders, enqueue_todo_reminder,
+    fire_due_reminders, reminders_created_total,
+)
+from .serializers import (
+    TodoSerializer, TimingTodoSerializer, TodoExportSerializer, FastTodoSerializer, FastTimingTodoSerializer,
+)
+from .views import TodoModelViewSet, TimingsModelViewSet, todo_detail_cache
 
-# Create your tests here.
+
+def explain(sql):
+    """Return the EXPLAIN QUERY PLAN detail lines for a captured SQL statement."""
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def app_queries(queries):
+    """Captured queries that touch the app tables (auth/session lookups are excluded)."""
+    return [q["sql"] for q in queries if "home_" in q["sql"]]
+
+
+class QueryBudgetMixin:
+    """
+    Test helper asserting that an action stays within the ``query_budget``
+    declared on its viewset, whatever the size of the page.
+    """
+
+    def assertQueryBudget(self, viewset, action, url, method="get", **kwargs):
+        budget = viewset.query_budget[action]
+        cache.clear()  # budgets are for a cold cache: new owner versions miss every cached response
+        with CaptureQueriesContext(connection) as ctx:
+            response = getattr(self.client, method)(url, **kwargs)
+        self.assertLess(response.status_code, 400, response.content)
+        queries = app_queries(ctx.captured_queries)
+        self.assertEqual(
+            len(queries), budget,
+            f"{viewset.__name__}.{action} issued {len(queries)} queries (budget {budget}):\n"
+            + "\n".join(queries),
+        )
+        return response
+
+
+class QueryPlanTests(TestCase):
+    """
+    Every query issued against the app tables by the listed endpoints must be
+    served by an index: no full table scans, no temp b-tree sort for the todo list.
+    """
+
+    def setUp(self):
+        cache.clear()  # throttling buckets live in the default cache
+        self.user = User.objects.create_user(username="planner", password="secret")
+        today = timezone.localdate()
+        for i in range(20):
+            todo = Todo.objects.create(
+                user=self.user if i % 2 else None,
+                session_key=None if i % 2 else f"session-{i}",
+                todo_title=f"Todo number {i}",
+                todo_description="Plan me",
+            )
+            TimingTodo.objects.create(
+                todo=todo,
+                schedule_date=today,
+                start_time=datetime.time(hour=i % 24),
+            )
+
+    def assertIndexedQueries(self, queries, allow_temp_sort=False):
+        app_queries = [q["sql"] for q in queries if "home_" in q["sql"] and q["sql"].startswith("SELECT")]
+        self.assertTrue(app_queries, "endpoint issued no queries against the app tables")
+        for sql in app_queries:
+            for detail in explain(sql):
+                self.assertFalse(detail.startswith("SCAN"), f"full scan: {detail}\n{sql}")
+                if not allow_temp_sort:
+                    self.assertNotIn("TEMP B-TREE", detail, f"unindexed sort: {detail}\n{sql}")
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return ctx.captured_queries
+
+    def test_todo_list_authenticated(self):
+        self.client.force_login(self.user)
+        self.assertIndexedQueries(self.get("/api/v1/todos/"))
+        self.assertIndexedQueries(self.get("/api/v1/todos/?is_done=false"))
+
+    def test_todo_list_cursor(self):
+        self.client.force_login(self.user)
+        queries = self.get("/api/v1/todos/?cursor=&limit=3")
+        self.assertIndexedQueries(queries)
+        self.assertFalse(any("COUNT(" in sql for sql in app_queries(queries)))
+
+    def anonymous_session(self):
+        """Give the client a session owning a todo, as if it had written before."""
+        session_key = self.client.session.session_key
+        todo = Todo.objects.create(session_key=session_key, todo_title="Anonymous", todo_description="x")
+        TimingTodo.objects.create(todo=todo, schedule_date=timezone.localdate(), start_time=datetime.time(9))
+
+    def test_todo_list_anonymous(self):
+        self.anonymous_session()
+        self.assertIndexedQueries(self.get("/api/v1/todos/"))
+
+    def test_todo_retrieve_by_slug(self):
+        self.client.force_login(self.user)
+        # Several todos can share a slug: the oldest is picked with a small sort
+        self.assertIndexedQueries(self.get("/api/v1/todos/todo-number-1/"), allow_temp_sort=True)
+
+    def test_timings_list(self):
+        self.client.force_login(self.user)
+        self.assertIndexedQueries(self.get("/api/v1/timings/"))
+        date = timezone.localdate().isoformat()
+        self.assertIndexedQueries(self.get(f"/api/v1/timings/?schedule_date={date}"))
+
+    def test_timings_list_anonymous(self):
+        self.anonymous_session()
+        self.assertIndexedQueries(self.get("/api/v1/timings/"))
+
+    def test_mark_due_todos(self):
+        with CaptureQueriesContext(connection) as ctx:
+            mark_due_todos.apply()
+        self.assertIndexedQueries(ctx.captured_queries, allow_temp_sort=True)
+
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="budget", password="secret")
+        self.client.force_login(self.user)
+
+    def make_todos(self, count, timings=3):
+        todos = []
+        for i in range(count):
+            todo = Todo.objects.create(user=self.user, todo_title=f"Budget {i}", todo_description="x")
+            for hour in range(timings):
+                TimingTodo.objects.create(todo=todo, schedule_date=timezone.localdate(), start_time=datetime.time(hour))
+            Reminder.objects.create(todo=todo, message="hello")
+            todos.append(todo)
+        return todos
+
+    def test_todo_actions_do_not_grow_with_page_size(self):
+        for count in (1, 30):
+            todos = self.make_todos(count)
+            todo = todos[0]
+            response = self.assertQueryBudget(TodoModelViewSet, "list", "/api/v1/todos/?limit=100")
+            self.assertTrue(all(len(item["timingtodos"]) == 3 for item in response.json()["results"]))
+            self.assertQueryBudget(TodoModelViewSet, "retrieve", f"/api/v1/todos/{todo.uid}/")
+            self.assertQueryBudget(TodoModelViewSet, "list_reminders", f"/api/v1/todos/{todo.uid}/reminders/")
+            self.assertQueryBudget(TodoModelViewSet, "handle_specific_todo_timings", f"/api/v1/todos/{todo.uid}/timings/")
+
+    def test_timing_actions_do_not_grow_with_page_size(self):
+        for count in (1, 30):
+            timing = self.make_todos(count)[0].timingtodos.first()
+            self.assertQueryBudget(TimingsModelViewSet, "list", "/api/v1/timings/?limit=100")
+            self.assertQueryBudget(TimingsModelViewSet, "retrieve", f"/api/v1/timings/{timing.uid}/")
+            self.assertQueryBudget(TimingsModelViewSet, "list_reminders", f"/api/v1/timings/{timing.uid}/reminders/")
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="pager", password="secret")
+        self.client.force_login(self.user)
+        # All rows share created_at (DateField), so uid alone must keep pages stable
+        self.todos = [
+            Todo.objects.create(user=self.user, todo_title=f"Paged {i}", todo_description="x")
+            for i in range(7)
+        ]
+        self.expected = sorted(str(todo.uid) for todo in self.todos)
+
+    def walk(self, url, link):
+        pages = []
+        while url:
+            body = self.client.get(url).json()
+            self.assertNotIn("count", body)
+            pages.append([item["uid"] for item in body["results"]])
+            url = body[link]
+        return pages
+
+    def test_forward_and_backward_walks_are_stable(self):
+        forward = self.walk("/api/v1/todos/?cursor=&limit=3", "next")
+        self.assertEqual([len(page) for page in forward], [3, 3, 1])
+        self.assertEqual(sum(forward, []), self.expected)
+
+        last_page = self.client.get("/api/v1/todos/?cursor=&limit=3").json()
+        last_page = self.client.get(last_page["next"]).json()
+        last_page = self.client.get(last_page["next"]).json()
+        self.assertIsNone(last_page["next"])
+        backward = self.walk(last_page["previous"], "previous")
+        self.assertEqual(sum(reversed(backward), []), self.expected[:6])
+
+    def test_offset_mode_is_unchanged(self):
+        body = self.client.get("/api/v1/todos/?limit=3&offset=3").json()
+        self.assertEqual(body["count"], 7)
+        self.assertEqual(len(body["results"]), 3)
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get("/api/v1/todos/?cursor=garbage").status_code, 404)
+        null_position = base64.b64encode(b'{"p":[null,null],"r":0}').decode()
+        for url in ["/api/v1/todos/", "/api/v1/timings/"]:
+            self.assertEqual(self.client.get(f"{url}?cursor={null_position}").status_code, 404)
+
+
+class FullTextSearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="searcher", password="secret")
+        self.other = User.objects.create_user(username="other", password="secret")
+        self.client.force_login(self.user)
+
+    def search(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [item["todo_title"] if "todo_title" in item else item["note"] for item in response.json()["results"]]
+
+    def test_ranks_title_hits_first_and_respects_owner(self):
+        Todo.objects.create(user=self.user, todo_title="Groceries", todo_description="buy milk and bread")
+        Todo.objects.create(user=self.user, todo_title="Milk the cows", todo_description="early")
+        Todo.objects.create(user=self.user, todo_title="Laundry", todo_description="nothing here")
+        Todo.objects.create(user=self.other, todo_title="Milk for other", todo_description="milk")
+        self.assertEqual(self.search("/api/v1/todos/?search=milk"), ["Milk the cows", "Groceries"])
+
+    def test_prefix_terms_and_quotes(self):
+        Todo.objects.create(user=self.user, todo_title="Write report", todo_description="quarterly numbers")
+        self.assertEqual(self.search("/api/v1/todos/?search=quarter"), ["Write report"])
+        self.assertEqual(self.search("/api/v1/todos/?search=quarter+missing"), [])
+        self.assertEqual(self.search('/api/v1/todos/?search="report'), ["Write report"])
+
+    def test_index_follows_writes(self):
+        todo = Todo.objects.create(user=self.user, todo_title="Old title", todo_description="x")
+        Todo.objects.filter(uid=todo.uid).update(todo_title="Fresh title")
+        self.assertEqual(self.search("/api/v1/todos/?search=old"), [])
+        self.assertEqual(self.search("/api/v1/todos/?search=fresh"), ["Fresh title"])
+        Todo.objects.bulk_create([Todo(user=self.user, todo_title="Bulk fresh", todo_description="x")])
+        self.assertEqual(len(self.search("/api/v1/todos/?search=fresh")), 2)
+        todo.delete()
+        self.assertEqual(self.search("/api/v1/todos/?search=fresh"), ["Bulk fresh"])
+
+    def test_index_is_joined_once(self):
+        for i in range(3):
+            Todo.objects.create(user=self.user, todo_title=f"Milk {i}", todo_description="milk")
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(len(self.search("/api/v1/todos/?search=milk")), 3)
+        self.assertEqual([query["sql"].count(" MATCH ") for query in ctx if "MATCH" in query["sql"]], [1, 1])
+
+    def test_timing_note_search(self):
+        todo = Todo.objects.create(user=self.user, todo_title="Gym", todo_description="x")
+        TimingTodo.objects.create(todo=todo, schedule_date=timezone.localdate(), note="leg day")
+        TimingTodo.objects.create(todo=todo, schedule_date=timezone.localdate(), note="arm day")
+        TimingTodo.objects.create(todo=todo, schedule_date=timezone.localdate())
+        self.assertEqual(self.search("/api/v1/timings/?search=legs"), [])
+        self.assertEqual(self.search("/api/v1/timings/?search=leg"), ["leg day"])
+
+
+class CeleryMetricsTests(TestCase):
+    def sample(self, name, task, **labels):
+        return REGISTRY.get_sample_value(name, {"task": task, **labels}) or 0
+
+    def test_task_metrics(self):
+        todo = Todo.objects.create(session_key="metrics", todo_title="Measure me", todo_description="x")
+        task = create_todo_reminders.name
+        before = {
+            name: self.sample(name, task)
+            for name in ["celery_task_runtime_seconds_count", "celery_task_queue_wait_seconds_sum",
+                         "celery_task_db_queries_sum", "celery_tasks_succeeded_total",
+                         "todo_reminder_batch_size_sum"]
+        }
+        create_todo_reminders.apply(args=[[str(todo.uid)] * 3], headers={"enqueued_at": time.time() - 2})
+
+        after = {name: self.sample(name, task) - value for name, value in before.items()}
+        self.assertEqual(after["celery_task_runtime_seconds_count"], 1)
+        self.assertGreaterEqual(after["celery_task_queue_wait_seconds_sum"], 2)
+        self.assertGreaterEqual(after["celery_task_db_queries_sum"], 2)  # todo fetch, reminder insert
+        self.assertEqual(after["celery_tasks_succeeded_total"], 1)
+        self.assertEqual(after["todo_reminder_batch_size_sum"], 3)
+
+    def test_failure_is_not_a_success(self):
+        task = mark_due_todos.name
+        failed, succeeded = self.sample("celery_tasks_failed_total", task), self.sample("celery_tasks_succeeded_total", task)
+        with mock.patch("home.tasks.Reminder.objects.bulk_create", side_effect=RuntimeError("boom")):
+            TimingTodo.objects.create(
+                todo=Todo.objects.create(session_key="metrics", todo_title="Due soon", todo_description="x"),
+                schedule_date=timezone.localdate(),
+                start_time=(timezone.localtime() + datetime.timedelta(minutes=5)).time(),
+            )
+            with self.assertLogs("celery.app.trace", "ERROR"):
+                mark_due_todos.apply()
+        self.assertEqual(self.sample("celery_tasks_failed_total", task), failed + 1)
+        self.assertEqual(self.sample("celery_tasks_succeeded_total", task), succeeded)
+
+    def test_queue_wait_counts_from_eta(self):
+        now = time.time()
+        request = Context(enqueued_at=now - 60, eta=datetime.datetime.fromtimestamp(now - 5, datetime.timezone.utc).isoformat())
+        self.assertAlmostEqual(_queue_wait(request, now), 5, places=3)
+        self.assertIsNone(_queue_wait(Context(), now))
+
+
+class MarkDueTodosTests(TestCase):
+    def setUp(self):
+        self.todo = Todo.objects.create(todo_title="Due soon", todo_description="x", session_key="s")
+
+    def run_at(self, now):
+        with mock.patch("django.utils.timezone.now", return_value=now):
+            return mark_due_todos.apply().get()
+
+    def timing(self, when):
+        return TimingTodo.objects.create(todo=self.todo, schedule_date=when.date(), start_time=when.time())
+
+    def test_creates_one_reminder_per_due_timing(self):
+        now = timezone.make_aware(datetime.datetime(2026, 5, 1, 12, 0))
+        due = self.timing(now + datetime.timedelta(minutes=10))
+        self.timing(now + datetime.timedelta(minutes=30))  # outside the window
+        self.timing(now - datetime.timedelta(days=1, minutes=-5))  # same time, other day
+        result = self.run_at(now)
+        self.assertEqual(result["checked_count"], 1)
+        self.assertEqual(result["new_reminders_count"], 1)
+        reminder = Reminder.objects.get()
+        self.assertEqual(reminder.timing, due)
+        self.assertEqual(reminder.due_at, now + datetime.timedelta(minutes=10))
+        self.assertEqual(reminder.message, "Your task 'Due soon' is due at 12:10:00")
+
+        result = self.run_at(now + datetime.timedelta(minutes=2))
+        self.assertEqual(result, {"status": "success", "checked_count": 1, "new_reminders_count": 0})
+        self.assertEqual(Reminder.objects.count(), 1)
+
+    def test_counts_only_inserted_reminders(self):
+        now = timezone.make_aware(datetime.datetime(2026, 5, 1, 12, 0))
+        self.timing(now + datetime.timedelta(minutes=10))
+        self.assertEqual(self.run_at(now)["new_reminders_count"], 1)
+        # As seen by a concurrent run that read the timing before the reminder was written.
+        with mock.patch("home.tasks.Exists", return_value=Value(False)):
+            result = self.run_at(now)
+        self.assertEqual(result, {"status": "success", "checked_count": 1, "new_reminders_count": 0})
+        self.assertEqual(Reminder.objects.count(), 1)
+
+    def test_window_crossing_midnight(self):
+        now = timezone.make_aware(datetime.datetime(2026, 5, 1, 23, 55))
+        self.timing(now + datetime.timedelta(minutes=3))
+        self.timing(now + datetime.timedelta(minutes=10))
+        self.timing(now + datetime.timedelta(minutes=20))
+        self.assertEqual(self.run_at(now)["new_reminders_count"], 2)
+
+
+class DueSchedulingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="scheduler", password="secret")
+        self.client.force_login(self.user)
+        self.todo = Todo.objects.create(user=self.user, todo_title="Due later", todo_description="x")
+        self.now = timezone.now().replace(microsecond=0)
+
+    def create(self, delta):
+        when = timezone.localtime(self.now + delta)
+        response = self.client.post(f"/api/v1/todos/{self.todo.uid}/timings/",
+                                    {"schedule_date": str(when.date()), "start_time": str(when.time())},
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json()["data"]["uid"], when
+
+    def fire_at(self, now):
+        with mock.patch("django.utils.timezone.now", return_value=now):
+            return fire_due_reminders.apply().get()
+
+    def test_fires_bucket_when_due(self):
+        uid, when = self.create(datetime.timedelta(minutes=30))
+        entry = DueTiming.objects.get(timing_id=uid)
+        self.assertEqual(entry.due_at, when)
+        self.assertEqual(entry.bucket, (when - datetime.timedelta(minutes=15)).replace(second=0))
+        self.create(datetime.timedelta(minutes=-30))  # past: not indexed
+        self.assertEqual(DueTiming.objects.count(), 1)
+
+        self.assertEqual(self.fire_at(self.now)["fired_count"], 0)
+        result = self.fire_at(entry.bucket)
+        self.assertEqual(result, {"status": "success", "fired_count": 1, "new_reminders_count": 1})
+        reminder = Reminder.objects.get(timing_id=uid)
+        self.assertEqual((reminder.due_at, reminder.user), (when, self.user))
+        self.assertEqual(reminder.message, f"Your task 'Due later' is due at {when.time()}")
+        self.assertFalse(DueTiming.objects.exists())
+
+        # The safety net finds the reminder already there
+        with mock.patch("django.utils.timezone.now", return_value=entry.bucket):
+            self.assertEqual(mark_due_todos.apply().get()["new_reminders_count"], 0)
+
+    def test_entries_rescheduled_while_firing_stay(self):
+        uid, when = self.create(datetime.timedelta(minutes=30))
+        bucket = DueTiming.objects.get(timing_id=uid).bucket
+        moved = when + datetime.timedelta(minutes=1)
+        bulk_create = Reminder.objects.bulk_create
+
+        def reschedule_meanwhile(*args, **kwargs):
+            DueTiming.objects.filter(timing_id=uid).update(due_at=moved, bucket=bucket - datetime.timedelta(minutes=1))
+            return bulk_create(*args, **kwargs)
+
+        # The moved entry is still due: the same run fires it again
+        with mock.patch.object(Reminder.objects, "bulk_create", side_effect=reschedule_meanwhile):
+            self.assertEqual(self.fire_at(bucket)["new_reminders_count"], 2)
+        self.assertEqual(sorted(Reminder.objects.values_list("due_at", flat=True)), [when, moved])
+        self.assertFalse(DueTiming.objects.exists())
+
+    def test_fires_more_than_a_batch_and_counts_inserted_reminders(self):
+        when = timezone.localtime(self.now + datetime.timedelta(minutes=15))
+        timings = TimingTodo.objects.bulk_create([
+            TimingTodo(todo=self.todo, schedule_date=when.date(), start_time=when.time()) for _ in range(1001)
+        ])
+        bucket = when.replace(second=0) - datetime.timedelta(minutes=15)
+        DueTiming.objects.bulk_create([DueTiming(timing=timing, due_at=when, bucket=bucket) for timing in timings])
+        Reminder.objects.create(todo=self.todo, timing=timings[0], due_at=when, message="already there")
+
+        result = self.fire_at(self.now)
+        self.assertEqual(result, {"status": "success", "fired_count": 1001, "new_reminders_count": 1000})
+        self.assertEqual(Reminder.objects.count(), 1001)
+        self.assertFalse(DueTiming.objects.exists())
+
+    def test_due_within_lead_fires_next_minute(self):
+        uid, _ = self.create(datetime.timedelta(minutes=5))
+        bucket = DueTiming.objects.get(timing_id=uid).bucket
+        self.assertGreaterEqual(bucket, self.now.replace(second=0))
+        self.assertLessEqual(bucket, timezone.now())
+        self.assertEqual(self.fire_at(timezone.now())["new_reminders_count"], 1)
+
+    def test_patch_and_delete_reschedule(self):
+        uid, _ = self.create(datetime.timedelta(minutes=5))
+        self.fire_at(timezone.now())
+        url = f"/api/v1/todos/{self.todo.uid}/timings/{uid}/"
+
+        self.client.patch(url, {"note": "same time"}, content_type="application/json")
+        self.assertEqual(Reminder.objects.filter(timing_id=uid).count(), 1)
+        self.assertFalse(DueTiming.objects.exists())
+
+        later = timezone.localtime(self.now + datetime.timedelta(hours=2))
+        self.client.patch(url, {"schedule_date": str(later.date()), "start_time": str(later.time())},
+                          content_type="application/json")
+        self.assertFalse(Reminder.objects.filter(timing_id=uid).exists())
+        self.assertEqual(DueTiming.objects.get(timing_id=uid).due_at, later)
+
+        self.client.delete(url)
+        self.assertFalse(DueTiming.objects.exists())
+
+    def test_bulk_writes_schedule(self):
+        when = timezone.localtime(self.now + datetime.timedelta(hours=1))
+        response = self.client.post("/api/v1/timings/bulk/", [
+            {"todo": str(self.todo.uid), "schedule_date": str(when.date()), "start_time": str(when.time())},
+        ], content_type="application/json")
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(DueTiming.objects.get().due_at, when)
+
+
+class FlakyBackend:
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.sent = []
+
+    def send(self, reminder):
+        if reminder["message"] in self.failing:
+            raise ConnectionError("unreachable")
+        self.sent.append(reminder["message"])
+
+
+class ReminderDeliveryTests(TestCase):
+    def setUp(self):
+        self.todo = Todo.objects.create(todo_title="Deliver me", todo_description="x", session_key="s")
+        for i in range(3):
+            Reminder.objects.create(todo=self.todo, message=f"m{i}")
+
+    def delivered(self, outcome):
+        return REGISTRY.get_sample_value(
+            "todo_reminders_delivered_total", {"backend": "FlakyBackend", "outcome": outcome}
+        ) or 0
+
+    def test_drain_marks_sent(self):
+        backend = FlakyBackend()
+        sent = self.delivered("sent")
+        totals = ReminderDispatcher(backend, batch_size=2).drain()
+        self.assertEqual(totals, {"batches": 2, "sent": 3, "failed": 0})
+        self.assertEqual(sorted(backend.sent), ["m0", "m1", "m2"])
+        self.assertEqual(self.delivered("sent"), sent + 3)
+        self.assertFalse(Reminder.objects.filter(Q(is_sent=False) | Q(sent_at=None) | ~Q(lease_token=None)).exists())
+        self.assertEqual(ReminderDispatcher(backend).drain()["sent"], 0)
+
+    def test_claims_do_not_overlap(self):
+        first_token, first = ReminderDispatcher(FlakyBackend(), batch_size=2).claim()
+        _, second = ReminderDispatcher(FlakyBackend(), batch_size=2).claim()
+        self.assertEqual(([r["message"] for r in first], [r["message"] for r in second]), (["m0", "m1"], ["m2"]))
+        self.assertEqual(ReminderDispatcher(FlakyBackend()).claim()[1], [])
+
+        # The lease of a dispatcher that died expires
+        Reminder.objects.filter(message="m0").update(lease_until=timezone.now() - datetime.timedelta(seconds=1))
+        token, reclaimed = ReminderDispatcher(FlakyBackend()).claim()
+        self.assertEqual([r["message"] for r in reclaimed], ["m0"])
+
+        # The first dispatcher, late, only marks the rows it still holds
+        ReminderDispatcher(FlakyBackend()).mark(first_token, first, [r["uid"] for r in first], [])
+        self.assertEqual(
+            list(Reminder.objects.filter(message__in=["m0", "m1"]).order_by("message").values_list("is_sent", "lease_token")),
+            [(False, token), (True, None)],
+        )
+
+    @override_settings(REMINDER_DELIVERY_MAX_ATTEMPTS=2)
+    def test_failures_are_retried_later(self):
+        backend = FlakyBackend(failing={"m1"})
+        self.assertEqual(ReminderDispatcher(backend).drain(), {"batches": 1, "sent": 2, "failed": 1})
+        failed = Reminder.objects.get(message="m1")
+        self.assertEqual((failed.is_sent, failed.attempts), (False, 1))
+        self.assertGreater(failed.lease_until, timezone.now())
+        self.assertEqual(ReminderDispatcher(backend).drain()["failed"], 0)  # waiting for its retry
+
+        for _ in range(3):
+            Reminder.objects.filter(message="m1").update(lease_until=None)
+            ReminderDispatcher(backend).drain()
+        failed = Reminder.objects.get(message="m1")
+        self.assertEqual((failed.attempts, failed.lease_until), (2, None))
+        self.assertIsNotNone(failed.failed_at)
+
+    def test_task_with_file_backend(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "reminders.ndjson")
+            with override_settings(REMINDER_DELIVERY_BACKEND="home.delivery.FileBackend", REMINDER_DELIVERY_FILE=path):
+                result = deliver_reminders.apply().get()
+            with open(path) as file:
+                lines = [json.loads(line) for line in file]
+        self.assertEqual(result, {"status": "success", "batches": 1, "sent": 3, "failed": 0})
+        self.assertEqual(sorted(line["message"] for line in lines), ["m0", "m1", "m2"])
+        self.assertEqual(lines[0]["todo_id"], str(self.todo.uid))
+
+
+class ReminderRetentionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="keeper", password="secret")
+        self.todo = Todo.objects.create(user=self.user, todo_title="Keep me", todo_description="x")
+        now = timezone.now()
+        days = datetime.timedelta(days=1)
+        self.reminders = {}
+        for name, fields in [
+            ("sent long ago", {"is_sent": True, "sent_at": now - 10 * days}),
+            ("sent yesterday", {"is_sent": True, "sent_at": now - days}),
+            ("unsent", {}),
+            ("old", {"created_at": now - 100 * days}),
+            ("old, being delivered", {"created_at": now - 100 * days, "lease_until": now + days}),
+        ]:
+            reminder = Reminder.objects.create(todo=self.todo, message=name)
+            Reminder.objects.filter(pk=reminder.pk).update(**fields)
+            self.reminders[name] = str(reminder.pk)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_archives_by_policy_in_chunks(self):
+        archived = REGISTRY.get_sample_value("todo_reminders_archived_total") or 0
+        result = ReminderArchiver(self.tmp.name, batch_size=1, sent_days=7, max_days=90).run()
+        self.assertEqual(result["archived"], 2)
+        self.assertEqual(REGISTRY.get_sample_value("todo_reminders_archived_total"), archived + 2)
+        self.assertEqual(set(Reminder.objects.values_list("message", flat=True)),
+                         {"sent yesterday", "unsent", "old, being delivered"})
+
+        lines = list(read_archive(result["segment"]))
+        self.assertEqual({line["uid"] for line in lines},
+                         {self.reminders["sent long ago"], self.reminders["old"]})
+        self.assertEqual({line["todo_id"] for line in lines}, {str(self.todo.uid)})
+        self.assertEqual(ReminderArchiver(self.tmp.name, sent_days=7, max_days=90).run()["archived"], 0)
+
+    def test_rows_leaving_the_policy_are_kept(self):
+        archive = ReminderArchiver.archive
+
+        def lease_meanwhile(archiver, uids, policy, now):
+            Reminder.objects.filter(message="old").update(lease_until=now + datetime.timedelta(days=1))
+            return archive(archiver, uids, policy, now)
+
+        with mock.patch.object(ReminderArchiver, "archive", lease_meanwhile):
+            result = ReminderArchiver(self.tmp.name, sent_days=7, max_days=90).run()
+        self.assertEqual(result["archived"], 1)
+        self.assertTrue(Reminder.objects.filter(message="old").exists())
+        self.assertEqual([line["uid"] for line in read_archive(result["segment"])], [self.reminders["sent long ago"]])
+
+    def test_policies_can_be_turned_off(self):
+        result = ReminderArchiver(self.tmp.name, sent_days=0, max_days=0).run()
+        self.assertEqual((result["archived"], result["segment"]), (0, None))
+        self.assertEqual(ReminderArchiver(self.tmp.name, sent_days=0, max_days=90).run()["archived"], 1)
+
+    def test_task_and_command(self):
+        with override_settings(REMINDER_ARCHIVE_DIR=self.tmp.name, REMINDER_RETENTION_SENT_DAYS=0):
+            self.assertEqual(archive_reminders.apply().get()["archived"], 1)
+            out = io.StringIO()
+            call_command("archive_reminders", "--sent-days", "7", stdout=out)
+        self.assertRegex(out.getvalue(), r"^Archived 1 reminders to .*\.ndjson\.gz in .*rows/s")
+        self.assertEqual(len(os.listdir(self.tmp.name)), 2)
+
+    def test_list_reminders_is_paginated(self):
+        self.client.force_login(self.user)
+        response = self.client.get(f"/api/v1/todos/{self.todo.uid}/reminders/?limit=2&offset=2")
+        body = response.json()
+        self.assertEqual((body["count"], len(body["results"])), (5, 2))
+        expected = list(Reminder.objects.order_by("created_at", "uid").values_list("message", flat=True))[2:4]
+        self.assertEqual([item["message"] for item in body["results"]], expected)
+        self.assertIsNotNone(body["next"])
+
+
+class ReminderBatchingTests(TestCase):
+    def test_batcher_flushes_by_count_and_by_time(self):
+        sent = []
+        batcher = ReminderBatcher(sent.append, max_size=3, max_wait=0.05)
+        for uid in ("a", "b", "c", "d"):
+            batcher.add(uid)
+        self.assertEqual(sent, [["a", "b", "c"]])
+        batcher._timer.join()
+        self.assertEqual(sent, [["a", "b", "c"], ["d"]])
+        batcher.flush()
+        self.assertEqual(len(sent), 2)
+
+    def test_create_todo_reminders_is_one_fetch_and_one_insert(self):
+        todos = [Todo.objects.create(session_key="s", todo_title=f"Batch {i}", todo_description="x") for i in range(5)]
+        uids = [str(todo.uid) for todo in todos] + [str(todos[0].uid), "00000000-0000-0000-0000-000000000000"]
+        before = reminders_created_total._value.get()
+        with self.assertNumQueries(2):
+            result = create_todo_reminders.apply(args=[uids]).get()
+        self.assertEqual(result["created_count"], 6)
+        self.assertEqual(result["missing"], ["00000000-0000-0000-0000-000000000000"])
+        self.assertEqual(Reminder.objects.filter(todo=todos[0]).count(), 2)
+        self.assertEqual(reminders_created_total._value.get() - before, 6)
+
+    @override_settings(REMINDER_BATCH_SIZE=1)
+    def test_unbatched_mode_sends_one_task_per_todo(self):
+        with mock.patch("home.tasks.create_todo_reminder.delay") as delay:
+            enqueue_todo_reminder("some-uid")
+        delay.assert_called_once_with("some-uid")
+
+
+class BulkEndpointTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="bulk", password="secret")
+        self.client.force_login(self.user)
+
+    def send(self, method, url, data):
+        with mock.patch("home.views.create_todo_reminders.delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = getattr(self.client, method)(url, data, content_type="application/json")
+        return response, delay
+
+    def test_bulk_create_todos(self):
+        items = [{"todo_title": f"Synced todo {i}", "todo_description": "x"} for i in range(50)]
+        with CaptureQueriesContext(connection) as ctx:
+            response, delay = self.send("post", "/api/v1/todos/bulk/", items)
+        self.assertEqual(len(app_queries(ctx.captured_queries)), 2)  # bulk insert, timings prefetch
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(len(response.json()["data"]), 50)
+        self.assertEqual(Todo.objects.filter(user=self.user).count(), 50)
+        delay.assert_called_once()
+        self.assertEqual(len(delay.call_args.args[0]), 50)
+
+    def test_bulk_create_is_all_or_nothing_with_item_errors(self):
+        items = [{"todo_title": "Fine title", "todo_description": "x"}, {"todo_title": "no!", "todo_description": "x"}]
+        response, delay = self.send("post", "/api/v1/todos/bulk/", items)
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()["errors"]
+        self.assertEqual(errors[0], {})
+        self.assertIn("todo_title", errors[1])
+        self.assertFalse(Todo.objects.exists())
+        delay.assert_not_called()
+
+    def test_bulk_update_and_delete_todos(self):
+        mine = [Todo.objects.create(user=self.user, todo_title=f"Mine {i}", todo_description="x") for i in range(3)]
+        theirs = Todo.objects.create(session_key="someone-else", todo_title="Theirs", todo_description="x")
+
+        items = [{"uid": str(todo.uid), "is_done": True} for todo in mine] + [{"uid": str(theirs.uid), "is_done": True}]
+        response, _ = self.send("patch", "/api/v1/todos/bulk/", items)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["errors"][3], {"uid": ["Not found."]})
+
+        response, _ = self.send("patch", "/api/v1/todos/bulk/", items[:3])
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(Todo.objects.filter(is_done=True).count(), 3)
+
+        response, _ = self.send("delete", "/api/v1/todos/bulk/", [str(theirs.uid), "not-a-uuid"])
+        self.assertEqual(response.status_code, 400)
+        response, _ = self.send("delete", "/api/v1/todos/bulk/", [str(todo.uid) for todo in mine])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(Todo.objects.all()), [theirs])
+
+    def test_bulk_routes_accept_non_canonical_uids(self):
+        todos = [Todo.objects.create(user=self.user, todo_title=f"Mine {i}", todo_description="x") for i in range(2)]
+        uids = [todos[0].uid.hex, str(todos[1].uid).upper()]
+        response, _ = self.send("patch", "/api/v1/todos/bulk/", [{"uid": uid, "is_done": True} for uid in uids])
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(Todo.objects.filter(is_done=True).count(), 2)
+        response, _ = self.send("delete", "/api/v1/todos/bulk/", [{"uid": uids[0]}, uids[1]])
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertFalse(Todo.objects.exists())
+
+    def test_bulk_create_timings(self):
+        todo = Todo.objects.create(user=self.user, todo_title="Has timings", todo_description="x")
+        theirs = Todo.objects.create(session_key="someone-else", todo_title="Theirs", todo_description="x")
+        items = [{"todo": str(todo.uid), "schedule_date": "2026-01-0%d" % day} for day in range(1, 4)]
+        response, _ = self.send("post", "/api/v1/timings/bulk/", items + [{"todo": str(theirs.uid), "schedule_date": "2026-01-01"}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["errors"][3], {"todo": ["You do not own this todo."]})
+        response, delay = self.send("post", "/api/v1/timings/bulk/", items)
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(todo.timingtodos.count(), 3)
+        self.assertEqual(delay.call_args.args[0], [str(todo.uid)] * 3)
+
+    def test_rejects_non_lists_and_oversized_batches(self):
+        response, _ = self.send("post", "/api/v1/todos/bulk/", {"todo_title": "Single"})
+        self.assertEqual(response.status_code, 400)
+        with override_settings(BULK_MAX_ITEMS=2):
+            response, _ = self.send("post", "/api/v1/todos/bulk/", [{}, {}, {}])
+        self.assertEqual(response.status_code, 400)
+
+
+class VersionedListCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="poller", password="secret")
+        self.client.force_login(self.user)
+        self.todo = Todo.objects.create(user=self.user, todo_title="Poll me", todo_description="x")
+
+    def get(self, url="/api/v1/todos/", **headers):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, headers=headers)
+        return response, len(app_queries(ctx.captured_queries))
+
+    def test_etag_and_response_cache(self):
+        first, queries = self.get()
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(queries, 3)
+        etag = first["ETag"]
+
+        cached, queries = self.get()
+        self.assertEqual((cached.status_code, queries), (200, 0))
+        self.assertEqual(cached.content, first.content)
+        self.assertEqual(cached["ETag"], etag)
+
+        not_modified, queries = self.get(If_None_Match=etag)
+        self.assertEqual((not_modified.status_code, queries), (304, 0))
+        self.assertEqual(not_modified.content, b"")
+
+        other_query, _ = self.get("/api/v1/todos/?is_done=true", If_None_Match=etag)
+        self.assertEqual(other_query.status_code, 200)
+
+    def test_writes_invalidate(self):
+        etag = self.get()[0]["ETag"]
+        response = self.client.patch(f"/api/v1/todos/{self.todo.uid}/", {"is_done": True}, content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        fresh, queries = self.get(If_None_Match=etag)
+        self.assertEqual(fresh.status_code, 200)
+        self.assertGreater(queries, 0)
+        self.assertTrue(fresh.json()["results"][0]["is_done"])
+        self.assertNotEqual(fresh["ETag"], etag)
+
+        etag = fresh["ETag"]
+        create_todo_reminders.apply(args=[[str(self.todo.uid)]])
+        self.assertEqual(self.get(If_None_Match=etag)[0].status_code, 200)
+
+    def test_writes_outside_the_api_invalidate(self):
+        writes = [
+            lambda: Todo.objects.filter(uid=self.todo.uid).update(is_done=True),
+            lambda: Todo.objects.bulk_create([Todo(user=self.user, todo_title="Bulk", todo_description="x")]),
+            lambda: Todo.objects.filter(todo_title="Bulk").delete(),
+            lambda: TimingTodo.objects.create(todo=self.todo, schedule_date=timezone.localdate()),
+            lambda: TimingTodo.objects.update(note="noted"),
+            lambda: TimingTodo.objects.get().delete(),
+        ]
+        urls = ["/api/v1/todos/", "/api/v1/timings/"]
+        for write in writes:
+            etags = [self.get(url)[0]["ETag"] for url in urls]
+            write()
+            for url, etag in zip(urls, etags):
+                self.assertEqual(self.get(url, If_None_Match=etag)[0].status_code, 200)
+
+    def test_last_modified(self):
+        self.client.patch(f"/api/v1/todos/{self.todo.uid}/", {"is_done": True}, content_type="application/json")
+        response, _ = self.get("/api/v1/timings/")
+        self.assertEqual(self.get("/api/v1/timings/", If_Modified_Since=response["Last-Modified"])[0].status_code, 304)
+        self.client.patch(f"/api/v1/todos/{self.todo.uid}/", {"is_done": False}, content_type="application/json")
+        self.assertEqual(self.get("/api/v1/timings/", If_Modified_Since=response["Last-Modified"])[0].status_code, 200)
+
+    def test_owners_are_isolated(self):
+        etag = self.get()[0]["ETag"]
+        self.client.logout()
+        other = User.objects.create_user(username="other", password="secret")
+        self.client.force_login(other)
+        response, _ = self.get(If_None_Match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["results"], [])
+
+
+class TodoDetailCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        todo_detail_cache.local.clear()
+        self.user = User.objects.create_user(username="reader", password="secret")
+        self.client.force_login(self.user)
+        self.todo = Todo.objects.create(user=self.user, todo_title="Read me", todo_description="x")
+        self.timing = TimingTodo.objects.create(todo=self.todo, schedule_date=datetime.date(2026, 1, 2))
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json(), len(app_queries(ctx.captured_queries))
+
+    def counter(self, name, **labels):
+        return REGISTRY.get_sample_value(name, {"cache": "todo_detail", **labels}) or 0
+
+    def test_tiers(self):
+        url = f"/api/v1/todos/{self.todo.uid}/"
+        misses = self.counter("object_cache_misses_total")
+        local = self.counter("object_cache_hits_total", tier="local")
+        shared = self.counter("object_cache_hits_total", tier="shared")
+
+        first, queries = self.get(url)
+        self.assertGreater(queries, 0)
+        self.assertEqual(first["timingtodos"][0]["uid"], str(self.timing.uid))
+        self.assertEqual(self.counter("object_cache_misses_total"), misses + 1)
+
+        self.assertEqual(self.get(url), (first, 0))
+        timings, queries = self.get(f"{url}timings/")
+        self.assertEqual((timings["data"], queries), (first["timingtodos"], 0))
+        timing, queries = self.get(f"{url}timings/{str(self.timing.uid).upper()}/")
+        self.assertEqual((timing["data"], queries), (first["timingtodos"][0], 0))
+        self.assertEqual(self.counter("object_cache_hits_total", tier="local"), local + 3)
+
+        todo_detail_cache.local.clear()  # another process
+        self.assertEqual(self.get(url), (first, 0))
+        self.assertEqual(self.counter("object_cache_hits_total", tier="shared"), shared + 1)
+
+    def test_filtered_lookups_bypass_the_cache(self):
+        url = f"/api/v1/todos/{self.todo.uid}/"
+        for path in ["", "timings/", f"timings/{self.timing.uid}/"]:
+            with self.subTest(path=path):
+                self.assertEqual(self.client.get(f"{url}{path}?is_done=true").status_code, 404)
+                self.get(f"{url}{path}")
+                self.assertEqual(self.client.get(f"{url}{path}?is_done=true").status_code, 404)
+                self.assertEqual(self.client.get(f"{url}{path}?search=missing").status_code, 404)
+                self.assertGreater(self.get(f"{url}{path}?is_done=false")[1], 0)
+
+    def test_unknown_timing(self):
+        self.get(f"/api/v1/todos/{self.todo.uid}/")
+        for uid in (uuid.uuid4(), "not-a-uid"):
+            response = self.client.get(f"/api/v1/todos/{self.todo.uid}/timings/{uid}/")
+            self.assertEqual(response.status_code, 404)
+            self.assertEqual(response.json(), {"status": False, "message": "TimingTodo not found."})
+
+    def test_writes_invalidate(self):
+        url = f"/api/v1/todos/{self.todo.uid}/"
+        self.get(url)
+        self.client.patch(url, {"is_done": True}, content_type="application/json")
+        self.assertTrue(self.get(url)[0]["is_done"])
+
+        self.client.post(f"{url}timings/", {"schedule_date": "2026-01-03"}, content_type="application/json")
+        self.assertEqual(len(self.get(f"{url}timings/")[0]["data"]), 2)
+
+        self.client.delete(f"{url}timings/{self.timing.uid}/")
+        self.assertEqual(len(self.get(url)[0]["timingtodos"]), 1)
+
+        Todo.objects.get(pk=self.todo.pk).save()  # outside the API: the signals bump
+        self.assertGreater(self.get(url)[1], 0)
+
+    @override_settings(OBJECT_CACHE_LOCAL_ENTRIES=1)
+    def test_local_tier_is_bounded(self):
+        other = Todo.objects.create(user=self.user, todo_title="Read me too", todo_description="x")
+        evictions = self.counter("object_cache_evictions_total")
+        self.get(f"/api/v1/todos/{self.todo.uid}/")
+        self.get(f"/api/v1/todos/{other.uid}/")
+        self.assertEqual(len(todo_detail_cache.local), 1)
+        self.assertEqual(self.counter("object_cache_evictions_total"), evictions + 1)
+
+    def test_owners_are_isolated(self):
+        self.get(f"/api/v1/todos/{self.todo.uid}/")
+        self.client.logout()
+        self.client.force_login(User.objects.create_user(username="intruder", password="secret"))
+        self.assertEqual(self.client.get(f"/api/v1/todos/{self.todo.uid}/").status_code, 404)
+        self.assertEqual(self.client.get(f"/api/v1/todos/{self.todo.uid}/timings/").status_code, 404)
+
+
+class LazySessionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def writes(self, method, url, data=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = getattr(self.client, method)(url, data, content_type="application/json")
+        sql = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith(("INSERT", "UPDATE", "DELETE"))]
+        return response, sql
+
+    def test_cookieless_reads_write_nothing(self):
+        for url in ["/api/v1/todos/", "/api/v1/timings/", "/api/v1/todos/?search=milk"]:
+            response, sql = self.writes("get", url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["results"], [])
+            self.assertEqual(sql, [])
+            self.assertNotIn("sessionid", response.cookies)
+        response, sql = self.writes("get", f"/api/v1/todos/{uuid.uuid4()}/")
+        self.assertEqual((response.status_code, sql), (404, []))
+        self.assertEqual(Session.objects.count(), 0)
+
+    @mock.patch("home.tasks.create_todo_reminder.delay")
+    def test_first_write_creates_the_session(self, delay):
+        response, sql = self.writes("post", "/api/v1/todos/", {"todo_title": "Milk", "todo_description": "x"})
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(any("django_session" in q for q in sql))
+        self.assertEqual(Session.objects.count(), 1)
+
+        response = self.client.get("/api/v1/todos/")
+        self.assertEqual([todo["todo_title"] for todo in response.json()["results"]], ["Milk"])
+        self.assertEqual(Session.objects.count(), 1)
+
+    def test_timing_without_session_is_rejected(self):
+        todo = Todo.objects.create(session_key="someone-else", todo_title="Theirs", todo_description="x")
+        response, _ = self.writes("post", "/api/v1/timings/", {
+            "todo": str(todo.uid), "schedule_date": timezone.localdate().isoformat(), "start_time": "09:00",
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("todo", response.json())
+
+    @override_settings(LAZY_ANONYMOUS_SESSIONS=False)
+    def test_eager_mode(self):
+        response, sql = self.writes("get", "/api/v1/todos/")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(any("django_session" in q for q in sql))
+
+
+class AsyncReadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="async", password="secret")
+        self.todos = [
+            Todo.objects.create(user=self.user, todo_title=f"Async todo {i}", todo_description="x")
+            for i in range(7)
+        ]
+        for todo in self.todos:
+            TimingTodo.objects.create(todo=todo, schedule_date=timezone.localdate(), start_time=datetime.time(9))
+            Reminder.objects.create(todo=todo, message="hello")
+        self.timing = self.todos[0].timingtodos.get()
+        self.other = Todo.objects.create(session_key="someone-else", todo_title="Theirs", todo_description="x")
+
+    async def assertSameResponse(self, path):
+        cache.clear()  # compare with an uncached sync response
+        sync = await sync_to_async(self.client.get)(f"/api/v1/{path}", HTTP_ACCEPT="application/json")
+        response = await self.async_client.get(f"/api/v1/async/{path}")
+        self.assertEqual(response.status_code, sync.status_code)
+        # Pagination links point back to the endpoint that served the page
+        self.assertEqual(response.content.replace(b"/async/", b"/"), sync.content)
+        return response
+
+    async def test_matches_sync_endpoints(self):
+        await sync_to_async(self.client.force_login)(self.user)
+        await self.async_client.aforce_login(self.user)
+        for path in [
+            "todos/", "todos/?limit=3&offset=3", "todos/?is_done=false&ordering=-todo_title",
+            "todos/?cursor=&limit=2", "todos/?search=async",
+            f"todos/{self.todos[0].uid}/", f"todos/{self.todos[0].uid}/reminders/",
+            "timings/", f"timings/{self.timing.uid}/reminders/",
+            f"todos/{self.other.uid}/", "todos/not-a-uuid/",
+        ]:
+            with self.subTest(path=path):
+                await self.assertSameResponse(path)
+
+    async def test_checks_view_permissions(self):
+        await sync_to_async(self.client.force_login)(self.user)
+        await self.async_client.aforce_login(self.user)
+        with mock.patch("home.permissions.IsOwnerOrSessionOwner.has_permission", return_value=False):
+            for path in ["todos/", f"todos/{self.todos[0].uid}/", "timings/"]:
+                with self.subTest(path=path):
+                    self.assertEqual((await self.assertSameResponse(path)).status_code, 403)
+
+    async def test_token_authentication(self):
+        token = await sync_to_async(Token.objects.create)(user=self.user)
+        response = await self.async_client.get("/api/v1/async/todos/", headers={"Authorization": f"Token {token.key}"})
+        self.assertEqual(response.json()["count"], 7)
+        response = await self.async_client.get("/api/v1/async/todos/", headers={"Authorization": "Token nope"})
+        self.assertEqual(response.status_code, 401)
+
+    async def test_anonymous_without_session(self):
+        response = await self.async_client.get("/api/v1/async/timings/")
+        self.assertEqual(response.json()["results"], [])
+        response = await self.async_client.get(f"/api/v1/async/todos/{self.other.uid}/reminders/")
+        self.assertEqual(response.status_code, 404)
+
+
+class FastSerializationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="fast", password="secret")
+        self.client.force_login(self.user)
+        for i in range(6):
+            todo = Todo.objects.create(
+                user=self.user, todo_title=f"Fäst tödo {i}!", todo_description="x", is_done=bool(i % 2),
+            )
+            for hour in range(i % 3):
+                TimingTodo.objects.create(
+                    todo=todo, schedule_date=timezone.localdate(),
+                    start_time=datetime.time(hour, 30) if hour else None, note="n" if hour else None,
+                )
+
+    def test_same_data_as_drf(self):
+        todos = Todo.objects.prefetch_related("timingtodos")
+        fast = FastTodoSerializer()
+        self.assertEqual(fast.serialize(fast.values(todos)), TodoSerializer(todos, many=True).data)
+        timings = TimingTodo.objects.all()
+        fast = FastTimingTodoSerializer()
+        self.assertEqual(fast.serialize(fast.values(timings)), TimingTodoSerializer(timings, many=True).data)
+
+    def test_list_responses_are_identical(self):
+        for url in [
+            "/api/v1/todos/?limit=4", "/api/v1/todos/?ordering=-todo_title", "/api/v1/todos/?is_done=true",
+            "/api/v1/todos/?search=tödo", "/api/v1/todos/?cursor=&limit=2", "/api/v1/timings/",
+        ]:
+            with self.subTest(url=url):
+                responses = []
+                for fast in (True, False):
+                    cache.clear()
+                    with override_settings(FAST_LIST_SERIALIZATION=fast):
+                        responses.append(self.client.get(url, HTTP_ACCEPT="application/json"))
+                self.assertEqual(responses[0].status_code, 200)
+                self.assertEqual(responses[0].content, responses[1].content)
+                next_link = responses[0].json()["next"]
+                if "cursor=" in url and next_link:
+                    self.assertEqual(len(self.client.get(next_link).json()["results"]), 2)
+
+
+class TodoSlugTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="slugger", password="secret")
+        self.client.force_login(self.user)
+
+    def test_slug_is_maintained_on_writes(self):
+        with mock.patch("home.tasks.create_todo_reminder.delay"):
+            response = self.client.post("/api/v1/todos/", {"todo_title": "Buy Milk", "todo_description": "x"})
+        self.assertEqual(response.json()["slug"], "buy-milk")
+        uid = response.json()["uid"]
+        self.client.patch(f"/api/v1/todos/{uid}/", {"todo_title": "Buy Oat Milk"}, content_type="application/json")
+        self.assertEqual(Todo.objects.get(uid=uid).slug, "buy-oat-milk")
+
+        with mock.patch("home.tasks.create_todo_reminders.delay"), self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post("/api/v1/todos/bulk/", [{"todo_title": "Água Fresca", "todo_description": "x"}],
+                                        content_type="application/json")
+        uid = response.json()["data"][0]["uid"]
+        self.assertEqual(Todo.objects.get(uid=uid).slug, "agua-fresca")
+        self.client.patch("/api/v1/todos/bulk/", [{"uid": uid, "todo_title": "Iced Tea"}], content_type="application/json")
+        self.assertEqual(Todo.objects.get(uid=uid).slug, "iced-tea")
+
+    def test_lookup_by_slug(self):
+        # created_at is a date: on the same day the uid decides which one is the oldest
+        first = Todo.objects.create(uid=uuid.UUID(int=1), user=self.user, todo_title="Same title", todo_description="x")
+        Todo.objects.create(user=self.user, todo_title="Same title", todo_description="y")
+        Todo.objects.create(session_key="other", todo_title="Mine alone", todo_description="x")
+
+        response = self.client.get("/api/v1/todos/same-title/")
+        self.assertEqual(response.json()["uid"], str(first.uid))
+        self.assertEqual(self.client.get("/api/v1/todos/same-title/reminders/").status_code, 200)
+        self.assertEqual(self.client.get(f"/api/v1/todos/{first.uid}/").json()["slug"], "same-title")
+        self.assertEqual(self.client.get("/api/v1/todos/mine-alone/").status_code, 404)
+        self.assertEqual(self.client.get("/api/v1/async/todos/same-title/").json()["uid"], str(first.uid))
+
+    def test_list_routes_are_reserved(self):
+        reserved = Todo._meta.get_field("slug").reserved
+        for extra_action in TodoModelViewSet.get_extra_actions():
+            if not extra_action.detail:
+                self.assertIn(extra_action.url_path, reserved)
+
+        todo = Todo.objects.create(user=self.user, todo_title="Export", todo_description="x")
+        self.assertEqual(todo.slug, "export-1")
+        self.assertEqual(self.client.get("/api/v1/todos/export-1/").json()["uid"], str(todo.uid))
+        self.assertEqual(self.client.get("/api/v1/todos/export/").status_code, 200)  # still the export
+        Todo.objects.filter(uid=todo.uid).update(slug="bulk")
+        importlib.import_module("home.migrations.0024_reserve_todo_slugs").rename_reserved_slugs(django_apps, None)
+        self.assertEqual(Todo.objects.get(uid=todo.uid).slug, "bulk-1")
+
+    def test_backfill_migration(self):
+        backfill = importlib.import_module("home.migrations.0016_backfill_todo_slug")
+        todos = [Todo.objects.create(session_key="s", todo_title=f"Old Todo {i}", todo_description="x") for i in range(5)]
+        Todo.objects.update(slug="")
+        with mock.patch.object(backfill, "BATCH_SIZE", 2):
+            backfill.backfill_slugs(django_apps, None)
+        self.assertEqual(
+            sorted(Todo.objects.values_list("slug", flat=True)), [f"old-todo-{i}" for i in range(5)]
+        )
+
+
+class NestedTimingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="nested", password="secret")
+        self.client.force_login(self.user)
+        self.todo = Todo.objects.create(user=self.user, todo_title="Nested timings", todo_description="x")
+
+    def test_create_and_update_timing_of_todo(self):
+        response = self.client.post(f"/api/v1/todos/{self.todo.uid}/timings/",
+                                    {"schedule_date": "2026-01-02", "note": "n"}, content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+        uid = response.json()["data"]["uid"]
+        response = self.client.patch(f"/api/v1/todos/{self.todo.uid}/timings/{uid}/",
+                                     {"todo": str(self.todo.uid), "note": "m"}, content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(TimingTodo.objects.get(uid=uid).note, "m")
+
+
+class RequestInstrumentationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="instrumented", password="secret")
+        self.client.force_login(self.user)
+        for i in range(3):
+            Todo.objects.create(user=self.user, todo_title=f"Instrumented {i}", todo_description="x")
+
+    def sample(self, metric, suffix, view, action):
+        labels = {"view": view, "action": action}
+        return REGISTRY.get_sample_value(f"{metric}_{suffix}", labels) or 0
+
+    def test_request_breakdown(self):
+        stages = ["api_request_db_queries", "api_request_db_seconds",
+                  "api_request_serializer_seconds", "api_request_render_seconds"]
+        for view, action, url in [
+            ("TodoModelViewSet", "list", "/api/v1/todos/"),
+            ("TodoModelViewSet", "list_reminders", f"/api/v1/todos/{Todo.objects.first().uid}/reminders/"),
+            ("TimingsModelViewSet", "async_list", "/api/v1/async/timings/"),
+        ]:
+            with self.subTest(url=url):
+                before = {metric: self.sample(metric, "sum", view, action) for metric in stages}
+                counts = self.sample("api_request_db_queries", "count", view, action)
+                with CaptureQueriesContext(connection) as queries:
+                    self.assertEqual(self.client.get(url).status_code, 200)
+                self.assertEqual(self.sample("api_request_db_queries", "count", view, action), counts + 1)
+                after = {metric: self.sample(metric, "sum", view, action) for metric in stages}
+                self.assertEqual(after["api_request_db_queries"] - before["api_request_db_queries"], len(queries))
+                for metric in stages[1:]:
+                    self.assertGreater(after[metric], before[metric], metric)
+
+    def test_unrouted_requests_are_not_observed(self):
+        samples = len(list(REQUEST_DB_QUERIES.collect()[0].samples))
+        self.client.get("/no-such-page/")
+        self.assertEqual(len(list(REQUEST_DB_QUERIES.collect()[0].samples)), samples)
+
+    def test_sampled_profiles_keep_the_slowest(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(REQUEST_PROFILING_SAMPLE_RATE=1, REQUEST_PROFILING_MIN_SECONDS=0,
+                                   REQUEST_PROFILING_DIR=directory, REQUEST_PROFILING_KEEP=2):
+                for _ in range(3):
+                    self.client.get("/api/v1/todos/")
+            with override_settings(REQUEST_PROFILING_DIR=directory):
+                self.client.get("/api/v1/todos/")
+            profiles = sorted(os.listdir(directory))
+            self.assertEqual(len(profiles), 2)
+            self.assertIn("-TodoModelViewSet-list-", profiles[0])
+            self.assertGreater(pstats.Stats(os.path.join(directory, profiles[0])).total_calls, 0)
+
+
+class TodoOwnerCopyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="copied", password="secret")
+        self.client.force_login(self.user)
+        self.todo = Todo.objects.create(user=self.user, todo_title="Owned todo", todo_description="x")
+        self.timing = TimingTodo.objects.create(todo=self.todo, schedule_date=timezone.localdate())
+
+    def test_owner_is_copied_on_create(self):
+        self.assertEqual((self.timing.user_id, self.timing.session_key), (self.user.pk, None))
+        other = Todo.objects.create(session_key="anon", todo_title="Anonymous todo", todo_description="x")
+        with CaptureQueriesContext(connection) as queries:
+            reminders = Reminder.objects.bulk_create(
+                [Reminder(todo_id=self.todo.uid, message="a"), Reminder(todo_id=other.uid, message="b")]
+            )
+        self.assertEqual(len(queries), 2)  # one owner lookup for the batch, one insert
+        self.assertEqual([(r.user_id, r.session_key) for r in reminders], [(self.user.pk, None), (None, "anon")])
+
+    def test_owner_follows_the_todo(self):
+        Reminder.objects.create(todo=self.todo, message="r")
+        todo = Todo.objects.get(uid=self.todo.uid)
+        todo.user, todo.session_key = None, "moved"
+        todo.save()
+        self.assertEqual(set(TimingTodo.objects.values_list("user_id", "session_key")), {(None, "moved")})
+        self.assertEqual(set(Reminder.objects.values_list("user_id", "session_key")), {(None, "moved")})
+
+        self.todo.user, self.todo.session_key = None, "created then moved"  # never loaded from the database
+        self.todo.save()
+        self.assertEqual(set(TimingTodo.objects.values_list("session_key", flat=True)), {"created then moved"})
+
+        Todo.objects.filter(uid=self.todo.uid).update(user=self.user, session_key=None)
+        self.assertEqual(set(TimingTodo.objects.values_list("user_id", "session_key")), {(self.user.pk, None)})
+        self.assertEqual(set(Reminder.objects.values_list("user_id", "session_key")), {(self.user.pk, None)})
+
+    def test_timing_reads_do_not_touch_todos_or_users(self):
+        self.client.get("/api/v1/todos/")  # session and auth lookups warmed up alike for every URL
+        for url in ["/api/v1/timings/", f"/api/v1/timings/{self.timing.uid}/",
+                    f"/api/v1/timings/{self.timing.uid}/reminders/", f"/api/v1/todos/{self.todo.uid}/"]:
+            with self.subTest(url=url):
+                cache.clear()
+                with CaptureQueriesContext(connection) as queries:
+                    self.assertEqual(self.client.get(url).status_code, 200)
+                sql = [q["sql"] for q in queries]
+                # Before the owner copy: a join on home_todo, and one auth_user load in the permission check
+                self.assertFalse([q for q in sql if 'JOIN "home_todo"' in q], sql)
+                self.assertEqual(len([q for q in sql if 'FROM "auth_user"' in q]), 1, sql)
+
+    def test_backfill_migration(self):
+        backfill = importlib.import_module("home.migrations.0018_backfill_timing_reminder_owner")
+        Reminder.objects.create(todo=self.todo, message="r")
+        for i in range(4):
+            TimingTodo.objects.create(todo=self.todo, schedule_date=timezone.localdate())
+        TimingTodo.objects.update(user=None)
+        Reminder.objects.update(user=None)
+        with mock.patch.object(backfill, "BATCH_SIZE", 2):
+            backfill.backfill_owners(django_apps, None)
+        self.assertEqual(set(TimingTodo.objects.values_list("user_id", flat=True)), {self.user.pk})
+        self.assertEqual(set(Reminder.objects.values_list("user_id", flat=True)), {self.user.pk})
+
+
+@mock.patch.object(SimpleRateThrottle, "THROTTLE_RATES", {"anon": "3/min", "user": "5/min"})
+class TokenBucketThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.now = time.time()
+        patcher = mock.patch("home.throttling.time.time", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_bucket_limits_and_refills(self):
+        statuses = [self.client.get("/api/v1/todos/").status_code for _ in range(4)]
+        self.assertEqual(statuses, [200, 200, 200, 429])
+        response = self.client.get("/api/v1/async/todos/")
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "20")  # one token every 20 seconds
+
+        self.now += 20
+        self.assertEqual(self.client.get("/api/v1/todos/").status_code, 200)
+        self.assertEqual(self.client.get("/api/v1/todos/").status_code, 429)
+        self.now += 600  # an idle client gets the full burst back, no more
+        self.assertEqual([self.client.get("/api/v1/todos/").status_code for _ in range(4)], [200, 200, 200, 429])
+
+        # Users have their own buckets and rate
+        self.client.force_login(User.objects.create_user(username="throttled"))
+        self.assertEqual([self.client.get("/api/v1/todos/").status_code for _ in range(6)], [200] * 5 + [429])
+
+    def test_state_is_constant_size(self):
+        for _ in range(3):
+            self.client.get("/api/v1/todos/")
+        tokens, updated = cache.get("bucket_anon_127.0.0.1")
+        self.assertEqual((tokens, updated), (0, self.now))
+
+    def test_redis_takes_one_script_call(self):
+        store = bucket_store(RedisCache("redis://localhost:6379/0", {}))
+        self.assertIsInstance(store, RedisBucketStore)
+        with mock.patch.object(store, "script", return_value=[0, b"0.25"]) as script:
+            self.assertEqual(store.take("bucket_anon_x", 3, 0.05), (False, 0.25))
+        script.assert_called_once_with(keys=[":1:bucket_anon_x"], args=[3, 0.05, 60])
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="exporter", password="secret")
+        self.client.force_login(self.user)
+        for i in range(5):
+            todo = Todo.objects.create(user=self.user, todo_title=f"Export, \"{i}\"", todo_description="x")
+            for hour in range(i % 3):
+                timing = TimingTodo.objects.create(todo=todo, schedule_date=timezone.localdate(),
+                                                   start_time=datetime.time(hour))
+                Reminder.objects.create(todo=todo, timing=timing, message=f"Reminder {i}")
+        other = Todo.objects.create(session_key="other", todo_title="Not mine", todo_description="x")
+        Reminder.objects.create(todo=other, message="Not mine")
+
+    def export(self, query):
+        response = self.client.get(f"/api/v1/todos/export/?{query}")
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode()
+
+    def test_ndjson_matches_serializer(self):
+        todos = Todo.objects.filter(user=self.user).order_by("created_at", "uid").prefetch_related(
+            "timingtodos", "reminders"
+        )
+        expected = [dict(item) for item in TodoExportSerializer(todos, many=True).data]
+        self.assertEqual([json.loads(line) for line in self.export("").splitlines()],
+                         json.loads(json.dumps(expected, default=str)))
+        self.assertEqual(len(self.export("search=not")), 0)
+
+    def test_csv_tables(self):
+        rows = list(csv.reader(io.StringIO(self.export("export_format=csv"))))
+        self.assertEqual(rows[0], ["user", "uid", "todo_title", "slug", "todo_description", "is_done"])
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(sorted(row[2] for row in rows[1:]), [f'Export, "{i}"' for i in range(5)])
+
+        rows = list(csv.DictReader(io.StringIO(self.export("export_format=csv&table=reminders"))))
+        self.assertEqual(sorted(row["message"] for row in rows), ["Reminder 1", "Reminder 2", "Reminder 2", "Reminder 4"])
+        self.assertEqual(len(list(csv.DictReader(io.StringIO(self.export("export_format=csv&table=timings"))))), 4)
+
+        response = self.client.get("/api/v1/todos/export/?export_format=xml")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.json()["status"])
+
+    def test_chunks_give_the_same_output(self):
+        whole = self.export("")
+        with override_settings(EXPORT_CHUNK_SIZE=2), CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.export(""), whole)
+        app_queries = [q for q in queries if '"home_' in q["sql"]]
+        # each chunk of todos fetches its timings and reminders once
+        self.assertEqual(len(app_queries), 1 + 3 * 2)
+
+
+class ImportTodosTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="importer", password="secret")
+
+    def import_lines(self, lines, *args):
+        with tempfile.NamedTemporaryFile("w", suffix=".ndjson") as f:
+            f.write("\n".join(lines) + "\n")
+            f.flush()
+            out, err = io.StringIO(), io.StringIO()
+            with mock.patch("home.tasks.create_todo_reminders.delay") as delay, self.captureOnCommitCallbacks(execute=True):
+                call_command("import_todos", f.name, *args, stdout=out, stderr=err)
+        return delay, out.getvalue(), err.getvalue()
+
+    def test_import_validates_and_batches(self):
+        lines = [json.dumps({"todo_title": f"Imported todo {i}", "todo_description": "x", "is_done": i == 0,
+                             "timingtodos": [{"schedule_date": "2026-01-02", "start_time": "09:30"}]})
+                 for i in range(5)]
+        lines[1:1] = [
+            json.dumps({"todo_title": "abc", "todo_description": "x"}),
+            json.dumps({"todo_title": "Bad #title", "todo_description": "x"}),
+            "{not json", "",
+            json.dumps({"todo_title": "Bad timing", "todo_description": "x", "timingtodos": [{"note": "n"}]}),
+        ]
+        delay, out, err = self.import_lines(lines, "--user", "importer", "--batch-size", "2")
+
+        todos = Todo.objects.filter(user=self.user)
+        self.assertEqual(sorted(todos.values_list("slug", flat=True)), [f"imported-todo-{i}" for i in range(5)])
+        self.assertEqual(TimingTodo.objects.filter(todo__user=self.user).count(), 5)
+        self.assertEqual(todos.filter(is_done=True).count(), 1)
+        self.assertIn("Imported 5 todos and 5 timings", out)
+        self.assertIn("rejected 4 lines", out)
+        self.assertIn("line 2: ", err)
+        self.assertIn("line 4: {\"non_field_errors\": [\"Invalid JSON.\"]}", err)
+        self.assertIn("line 6: {\"timingtodos\": [{\"schedule_date\"", err)
+        # reminders are requested per batch, once it is committed
+        self.assertIn("sent 3 reminder tasks", out)
+        self.assertEqual([len(call.args[0]) for call in delay.call_args_list], [2, 2, 1])
+        self.assertEqual(sorted(uid for call in delay.call_args_list for uid in call.args[0]),
+                         sorted(str(uid) for uid in todos.values_list("uid", flat=True)))
+
+    def test_export_round_trip(self):
+        Todo.objects.create(session_key="source", todo_title="Round trip", todo_description="x")
+        TimingTodo.objects.create(todo=Todo.objects.get(), schedule_date=timezone.localdate(), note="n")
+        session = self.client.session
+        session.save()
+        Todo.objects.update(session_key=session.session_key)
+        exported = b"".join(self.client.get("/api/v1/todos/export/").streaming_content).decode()
+
+        delay, out, _ = self.import_lines(exported.splitlines(), "--session-key", "target", "--no-reminders")
+        imported = Todo.objects.get(session_key="target")
+        self.assertEqual((imported.todo_title, imported.timingtodos.get().note), ("Round trip", "n"))
+        delay.assert_not_called()
@@ -0,0 +1,123 @@
+"""
+Token-bucket throttling with its state in the shared cache.
+
+DRF's SimpleRateThrottle keeps a list of request timestamps per client, read,
+trimmed and written back by every request: the list grows with the rate, and
+with a per-process cache each worker counts alone. Here a client's state is a
+bucket of ``num_requests`` tokens refilled at ``num_requests / duration`` per
+second: two numbers whatever the rate. On Redis a request costs one script
+call, which refills, takes a token and stores the bucket atomically with the
+server's clock. Other caches (local memory in development and tests) run the
+same steps in the process under a lock.
+
+The configured rates keep their meaning on average, and a client that has
+been idle may burst up to the full ``num_requests``.
+"""
+import math
+import threading
+import time
+import weakref
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from rest_framework.throttling import AnonRateThrottle, SimpleRateThrottle, UserRateThrottle
+
+# KEYS[1]: bucket; ARGV: capacity, refill rate (tokens/s), ttl (s).
+# Returns {1 if a token was taken else 0, tokens left as a string}.
+TAKE_TOKEN_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or capacity
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local taken = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    taken = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[3]))
+return {taken, tostring(tokens)}
+"""
+
+
+def bucket_ttl(capacity, rate):
+    """Seconds for an empty bucket to fill up, after which it equals a missing one."""
+    return max(1, math.ceil(capacity / rate))
+
+
+class RedisBucketStore:
+    def __init__(self, cache):
+        self.cache = cache
+        # Django's Redis cache does not expose scripting; its client does
+        self.script = cache._cache.get_client(write=True).register_script(TAKE_TOKEN_SCRIPT)
+
+    def take(self, key, capacity, rate):
+        """(whether a token was taken, tokens left)."""
+        taken, tokens = self.script(
+            keys=[self.cache.make_and_validate_key(key)], args=[capacity, rate, bucket_ttl(capacity, rate)]
+        )
+        return bool(taken), float(tokens)
+
+
+class LocalBucketStore:
+    """Same steps as the script, atomic within one process only."""
+    lock = threading.Lock()
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def take(self, key, capacity, rate):
+        with self.lock:
+            now = time.time()
+            tokens, updated = self.cache.get(key) or (capacity, now)
+            tokens = min(capacity, tokens + max(0.0, now - updated) * rate)
+            taken = tokens >= 1
+            if taken:
+                tokens -= 1
+            self.cache.set(key, (tokens, now), bucket_ttl(capacity, rate))
+        return taken, tokens
+
+
+_stores = weakref.WeakKeyDictionary()
+
+
+def bucket_store(cache):
+    """The bucket store of a cache connection (caches are per thread)."""
+    store = _stores.get(cache)
+    if store is None:
+        store = _stores[cache] = (RedisBucketStore if isinstance(cache, RedisCache) else LocalBucketStore)(cache)
+    return store
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    SimpleRateThrottle with a token bucket per client instead of a request
+    history: same scopes, rates and cache keys (under another prefix).
+    """
+    cache_format = 'bucket_%(scope)s_%(ident)s'
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        rate = self.num_requests / self.duration
+        # caches[...] rather than self.cache, a proxy hiding the backend class
+        taken, tokens = bucket_store(caches['default']).take(self.key, self.num_requests, rate)
+        self.wait_seconds = None if taken else (1 - tokens) / rate
+        return taken
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle, UserRateThrottle):
+    pass
+
+
+class AnonTokenBucketThrottle(TokenBucketThrottle, AnonRateThrottle):
+    pass
@@ -1,6 +1,7 @@
 from rest_framework.routers import DefaultRouter
-from django.urls import path, include
+from django.urls import path, include, re_path
 from .views import *
+from . import async_views
 
 router = DefaultRouter()
 router.register(r'todos', TodoModelViewSet)
@@ -16,5 +17,12 @@ urlpatterns = [
 #    path('todos/', TodoListCreateView.as_view(), name='todo-list-create'),
 #    path('todos/<uuid:uid>/', TodoUpdateView.as_view(), name='todo-update'),
 
+    # Async (ASGI) read paths
+    path('async/todos/', async_views.todo_list, name='async-todo-list'),
+    re_path(r'^async/todos/(?P<uid>[^/.]+)/$', async_views.todo_detail, name='async-todo-detail'),
+    re_path(r'^async/todos/(?P<uid>[^/.]+)/reminders/$', async_views.todo_reminders, name='async-todo-reminders'),
+    path('async/timings/', async_views.timing_list, name='async-timing-list'),
+    re_path(r'^async/timings/(?P<uid>[^/.]+)/reminders/$', async_views.timing_reminders, name='async-timing-reminders'),
+
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -1,71 +1,140 @@
 import logging
-from .serializers import TodoSerializer, TimingTodoSerializer, ReminderSerializer
+from .serializers import (
+    TodoSerializer, TimingTodoSerializer, ReminderSerializer, FastTodoSerializer, FastTimingTodoSerializer,
+    FastReminderSerializer, FastTodoExportSerializer,
+)
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.pagination import LimitOffsetPagination
 from rest_framework import status, viewsets, filters
 from .permissions import IsOwnerOrSessionOwner, IsOwnerOfRelatedTodo
+from .mixins import BulkActionsMixin, OwnerScopedMixin, SerializerPrefetchMixin, SlugLookupMixin, valid_uuids
+from .caching import TwoTierCache, VersionedListCacheMixin, get_owner_version, request_owner_key
+from .exports import csv_lines, ndjson_lines
+from .fast_serializers import FastListMixin
+from .pagination import CustomPagination
+from .search import FullTextSearchFilter
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.conf import settings
+from django.db import transaction
+from django.http import StreamingHttpResponse
 from .models import Todo, TimingTodo, Reminder
-from .tasks import create_todo_reminder
+from .scheduling import schedule_timings
+from .tasks import enqueue_todo_reminder, create_todo_reminders
 
 logger = logging.getLogger(__name__)
 
-class CustomPagination(LimitOffsetPagination):
-    default_limit = 5
-    max_limit = 100
+# Serialized todos with their timings, for the todo detail routes
+todo_detail_cache = TwoTierCache('todo_detail')
 
-class TodoModelViewSet(viewsets.ModelViewSet):
+class TodoModelViewSet(VersionedListCacheMixin, FastListMixin, BulkActionsMixin, OwnerScopedMixin, SlugLookupMixin,
+                       SerializerPrefetchMixin, viewsets.ModelViewSet):
     """
     A viewset for viewing and editing Todo instances.
     """
     queryset = Todo.objects.all()
     serializer_class = TodoSerializer
+    fast_serializer_class = FastTodoSerializer
     pagination_class = CustomPagination
     permission_classes = [IsOwnerOrSessionOwner]
-    lookup_field = 'uid'  # Important: use 'uid' (UUIDField) instead of default 'pk'
+    lookup_field = 'uid'  # Important: use 'uid' (UUIDField) instead of default 'pk'; the slug works too
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter, 
-        filters.OrderingFilter
+        filters.OrderingFilter,
+        FullTextSearchFilter,  # after OrderingFilter so results stay ranked
     ]
     filterset_fields = ['is_done']
     search_fields = ['todo_title', 'todo_description']
     ordering_fields = ['created_at', 'todo_title']
     ordering = ['created_at']
+    query_budget = {
+        'list': 3,  # count, page, prefetched timings
+        'retrieve': 2,  # todo, prefetched timings
+        'list_reminders': 3,  # object, count, page
+        'handle_specific_todo_timings': 2,
+    }
 
     def get_queryset(self):
-        user = self.request.user
-        session_key = self.request.session.session_key
-        if not session_key:
-            self.request.session.save()
-            session_key = self.request.session.session_key
+        queryset = self.get_owner_queryset(Todo.objects.all())
+        return self.optimize_queryset(queryset)
+
+    def get_cached_todo(self):
+        """
+        The serialized todo of the detail route, timings included, read through
+        todo_detail_cache: a hit in this process costs no query at all.
+        get_object() applies the list filters, so filtered lookups bypass it.
+        """
+        def serialize():
+            return dict(self.get_serializer(self.get_object()).data)
+
+        owner = request_owner_key(self.request)
+        filter_params = {*self.filterset_fields, filters.SearchFilter.search_param,
+                         filters.OrderingFilter.ordering_param}
+        if owner is None or not filter_params.isdisjoint(self.request.query_params):
+            return serialize()
+        lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        return todo_detail_cache.get_or_set(f"{owner}:{get_owner_version(owner)}:{lookup}", serialize)
 
-        if user.is_authenticated:
-            return Todo.objects.filter(user=user)
-        return Todo.objects.filter(session_key=session_key)
+    def retrieve(self, request, *args, **kwargs):
+        return Response(self.get_cached_todo())
 
     def perform_create(self, serializer):
-        user = self.request.user
-        session_key = self.request.session.session_key
-        if not session_key:
-            self.request.session.save()
-            session_key = self.request.session.session_key
-
-        if user.is_authenticated:
-            todo = serializer.save(user=user)
-        else:
-            todo = serializer.save(session_key=session_key)
+        todo = serializer.save(**self.get_owner())
 
         # Trigger background reminder creation
-        create_todo_reminder.delay(todo.uid)  
+        enqueue_todo_reminder(todo.uid)
+
+    def perform_bulk_create(self, serializer):
+        todos = serializer.save(**self.get_owner())
+        uids = [str(todo.uid) for todo in todos]
+        # One reminder task for the whole batch
+        transaction.on_commit(lambda: create_todo_reminders.delay(uids))
+
+    export_tables = {
+        'todos': FastTodoExportSerializer,
+        'timings': FastTimingTodoSerializer,
+        'reminders': FastReminderSerializer,
+    }
+    export_formats = {
+        'ndjson': (ndjson_lines, 'application/x-ndjson'),
+        'csv': (csv_lines, 'text/csv'),
+    }
+
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request):
+        """
+        Stream all of the owner's rows of ``?table=`` (todos, with their timings
+        and reminders nested in NDJSON; timings; reminders) as ``?export_format=``
+        ndjson or csv. Todos honour the list filters, search and ordering.
+        """
+        table = request.query_params.get('table', 'todos')
+        export_format = request.query_params.get('export_format', 'ndjson')
+        if table not in self.export_tables or export_format not in self.export_formats:
+            return Response({
+                'status': False,
+                'message': f"table must be one of {', '.join(self.export_tables)} "
+                           f"and export_format one of {', '.join(self.export_formats)}."
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        fast_class = self.export_tables[table]
+        if table == 'todos':
+            queryset = self.filter_queryset(self.get_queryset())
+            queryset = queryset.order_by(*queryset.query.order_by, 'uid')  # a stable order across chunks
+        else:
+            model = fast_class.serializer_class.Meta.model
+            queryset = self.get_owner_queryset(model.objects.all()).order_by('created_at', 'uid')
+        lines, content_type = self.export_formats[export_format]
+        fast = fast_class(context=self.get_serializer_context())
+        response = StreamingHttpResponse(lines(fast, queryset, settings.EXPORT_CHUNK_SIZE), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{table}.{export_format}"'
+        return response
 
     @action(detail=True, methods=['get'], url_path='reminders')
     def list_reminders(self, request, uid=None):
         todo = self.get_object()
-        reminders = Reminder.objects.filter(todo=todo)
-        serializer = ReminderSerializer(reminders, many=True)
-        return Response(serializer.data)
+        reminders = Reminder.objects.filter(todo=todo).order_by('created_at', 'uid')
+        page = self.paginate_queryset(reminders)
+        serializer = ReminderSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
     @action(detail=True, methods=['get', 'post'], url_path='timings')
     def handle_specific_todo_timings(self, request, uid=None):
@@ -73,20 +142,18 @@ class TodoModelViewSet(viewsets.ModelViewSet):
         POST /{uid}/timings/
         Create a TimingTodo for a specific Todo.
         """
-        todo = self.get_object()
         if request.method == 'GET':
-            timing_todo = TimingTodo.objects.filter(todo=todo)
-            serializer = TimingTodoSerializer(timing_todo, many=True)
             return Response({
                 'status': True,
                 'message': f'Detail of TimingTodo',
-                'data': serializer.data
+                'data': self.get_cached_todo()['timingtodos']
             }, status=status.HTTP_200_OK)
 
         elif request.method == 'POST':
+            todo = self.get_object()
             data = request.data.copy()
             data['todo'] = str(todo.uid)
-            serializer = TimingTodoSerializer(data=data)
+            serializer = TimingTodoSerializer(data=data, context=self.get_serializer_context())
 
             if serializer.is_valid():
                 serializer.save()
@@ -109,25 +176,27 @@ class TodoModelViewSet(viewsets.ModelViewSet):
         PATCH: Partially update a TimingTodo.
         DELETE: Delete a TimingTodo.
         """
-        todo = self.get_object()    
-        try:
-            timing = TimingTodo.objects.get(uid=timing_uid, todo=todo)
-        except TimingTodo.DoesNotExist:
+        if request.method == 'GET':
+            uids = [str(uid) for uid in valid_uuids([timing_uid])]
+            timing = next((t for t in self.get_cached_todo()['timingtodos'] if t['uid'] in uids), None)
+        else:
+            timing = TimingTodo.objects.filter(uid__in=valid_uuids([timing_uid]), todo=self.get_object()).first()
+        if timing is None:
             return Response({
                 'status': False,
                 'message': 'TimingTodo not found.'
             }, status=status.HTTP_404_NOT_FOUND)
 
         if request.method == 'GET':
-            serializer = TimingTodoSerializer(timing)
             return Response({
                 'status': True,
                 'message': f'Detail of TimingTodo {timing_uid}',
-                'data': serializer.data
+                'data': timing
             }, status=status.HTTP_200_OK)
 
         elif request.method == 'PATCH':
-            serializer = TimingTodoSerializer(timing, data=request.data, partial=True)
+            serializer = TimingTodoSerializer(timing, data=request.data, partial=True,
+                                              context=self.get_serializer_context())
             if serializer.is_valid():
                 serializer.save()
                 return Response({
@@ -147,20 +216,21 @@ class TodoModelViewSet(viewsets.ModelViewSet):
                 'message': f'TimingTodo {timing_uid} deleted successfully.'
             }, status=status.HTTP_204_NO_CONTENT)
 
-class TimingsModelViewSet(viewsets.ModelViewSet):
+class TimingsModelViewSet(VersionedListCacheMixin, FastListMixin, BulkActionsMixin, OwnerScopedMixin, SerializerPrefetchMixin, viewsets.ModelViewSet):
     """
     A viewset for viewing and editing TimingTodo instances.
     Only allows access to related todos owned by the current user/session.
     """
     queryset = TimingTodo.objects.all()
     serializer_class = TimingTodoSerializer
+    fast_serializer_class = FastTimingTodoSerializer
     permission_classes = [IsOwnerOfRelatedTodo]
     pagination_class = CustomPagination
     lookup_field = 'uid'  # Important: use 'uid' (UUIDField) instead of default 'pk'
     filter_backends = [
-        DjangoFilterBackend, 
-        filters.SearchFilter, 
-        filters.OrderingFilter
+        DjangoFilterBackend,
+        filters.OrderingFilter,
+        FullTextSearchFilter,
     ]
 
     # Exact match filtering
@@ -172,27 +242,34 @@ class TimingsModelViewSet(viewsets.ModelViewSet):
     # Allow ordering
     ordering_fields = ['schedule_date']
 
+    query_budget = {
+        'list': 2,  # count, page
+        'retrieve': 1,
+        'list_reminders': 3,  # object, count, page
+    }
+
     def get_queryset(self):
-        user = self.request.user
-        session_key = self.request.session.session_key
-        if not session_key:
-            self.request.session.save()
-            session_key = self.request.session.session_key
-
-        if user.is_authenticated:
-            return TimingTodo.objects.filter(todo__user=user)
-        return TimingTodo.objects.filter(todo__session_key=session_key)
-    
-    from .tasks import create_todo_reminder
+        queryset = self.get_owner_queryset(TimingTodo.objects.all())
+        return self.optimize_queryset(queryset)
 
     def perform_create(self, serializer):
         timing_todo = serializer.save()
         # Trigger async reminder creation
-        create_todo_reminder.delay(str(timing_todo.todo.uid))
+        enqueue_todo_reminder(timing_todo.todo_id)
+
+    def perform_bulk_create(self, serializer):
+        timings = serializer.save()
+        schedule_timings(timings)  # bulk_create sends no post_save
+        uids = [str(timing.todo_id) for timing in timings]
+        transaction.on_commit(lambda: create_todo_reminders.delay(uids))
+
+    def perform_bulk_update(self, serializer):
+        schedule_timings(serializer.save())
         
     @action(detail=True, methods=['get'], url_path='reminders')
     def list_reminders(self, request, uid=None):
         timing = self.get_object()
-        reminders = Reminder.objects.filter(todo=timing.todo)
-        serializer = ReminderSerializer(reminders, many=True)
-        return Response(serializer.data)
+        reminders = Reminder.objects.filter(todo_id=timing.todo_id).order_by('created_at', 'uid')
+        page = self.paginate_queryset(reminders)
+        serializer = ReminderSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)